@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Measure headless self-play throughput (games/sec and actions/sec)."""
+
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from headless import run_games
+from selfplay import build_deck, deck_list, run_batch
+
+
+def build_decks():
+    """The green/red and blue/red preset decks."""
+    return build_deck(deck_list("green_red")), build_deck(deck_list("blue_red"))
+
+
+def main(games=200):
+    deck1, deck2 = build_decks()
+    result = run_games(deck1, deck2, games=games)
+    print(f"{result['games']} games, {result['turns']} turns, {result['actions']} actions "
+          f"in {result['seconds']:.2f} s")
+    print(f"{result['games_per_sec']:,.0f} games/sec, {result['actions_per_sec']:,.0f} actions/sec")
+    print(f"wins: {result['wins']}")
+
+    stats = run_batch("green_red", "blue_red", games=games * 4, workers=os.cpu_count())
+    print(f"process pool, {os.cpu_count()} workers: {stats!r}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Compare the binary snapshot codec against the JSON game state format."""
+
+import sys
+import os
+import json
+import time
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from modules.snapshot import encode_state, decode_state
+
+DEFAULT_STATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db', 'game_state.json')
+
+
+def time_call(func, arg, repeat):
+    """Return the mean time of func(arg) in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(path=DEFAULT_STATE, repeat=200):
+    with open(path, "r") as f:
+        game_state = json.load(f)
+
+    snapshot = encode_state(game_state)
+    assert decode_state(snapshot) == game_state, "snapshot round trip failed"
+
+    pretty = json.dumps(game_state, indent=4)
+    compact = json.dumps(game_state, separators=(",", ":"))
+
+    formats = [
+        ("json indent=4", len(pretty.encode()),
+         time_call(lambda s: json.dumps(s, indent=4), game_state, repeat),
+         time_call(json.loads, pretty, repeat)),
+        ("json compact", len(compact.encode()),
+         time_call(lambda s: json.dumps(s, separators=(",", ":")), game_state, repeat),
+         time_call(json.loads, compact, repeat)),
+        ("binary snapshot", len(snapshot),
+         time_call(encode_state, game_state, repeat),
+         time_call(decode_state, snapshot, repeat)),
+    ]
+
+    print(f"State: {path}")
+    print(f"{'format':<18}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+    for name, size, encode_us, decode_us in formats:
+        print(f"{name:<18}{size:>10}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+    return formats
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Measure cold start: eager card_index import and parse vs the precompiled
+card catalog, the time to import the engine (what every headless worker
+pays), and a python -X importtime breakdown of "import game".
+"""
+
+import sys
+import os
+import subprocess
+import statistics
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Each snippet runs in a fresh interpreter and prints its own wall time in ms
+SNIPPETS = {
+    "card_index + parse effects": (
+        "import time; t = time.perf_counter()\n"
+        "import card_index\n"
+        "from modules.parser import effect_cache\n"
+        "for card in card_index.CARD_DEFINITIONS.values(): effect_cache.get(card.effect)\n"
+        "print((time.perf_counter() - t) * 1e3)"
+    ),
+    "card catalog (cached)": (
+        "import time; t = time.perf_counter()\n"
+        "from modules.catalog import load_catalog\n"
+        "load_catalog()\n"
+        "print((time.perf_counter() - t) * 1e3)"
+    ),
+    "import game (worker start)": (
+        "import time; t = time.perf_counter()\n"
+        "import game\n"
+        "print((time.perf_counter() - t) * 1e3)"
+    ),
+}
+
+# Modules that should only be imported when a game actually needs them
+DEFERRED = ("PIL", "sqlite3", "numpy", "card_index")
+
+
+def cold_start(snippet, runs):
+    """Median wall time of snippet in ms over runs fresh interpreters."""
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", snippet], cwd=SRC_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def _importtime(statement):
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=SRC_DIR,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # name keeps its indentation, nested imports are indented
+        rows.append((int(cumulative_us), int(self_us), name[1:]))
+    return rows
+
+
+def import_report(statement="import game", top=10):
+    """
+    Run statement under python -X importtime and print the slowest imports
+    (leaving out what the interpreter imports at startup anyway).
+    Returns the set of top-level packages it imported.
+    """
+    startup = {name.strip() for _, _, name in _importtime("pass")}
+    rows = [row for row in _importtime(statement) if row[2].strip() not in startup]
+
+    total = sum(cumulative for cumulative, _, name in rows if not name.startswith(" "))
+    print(f"\n{statement}: {len(rows)} modules, {total / 1e3:.2f} ms")
+    print(f"  {'cumulative':>10s} {'self':>8s}  module")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative / 1e3:8.2f}ms {self_us / 1e3:6.2f}ms  {name.strip()}")
+    return {name.strip().split(".")[0] for _, _, name in rows}
+
+
+def main(runs=15):
+    # Measure warm caches: bytecode compiled and the catalog built
+    subprocess.run([sys.executable, "-m", "compileall", "-q", "."], cwd=SRC_DIR, capture_output=True, check=True)
+    subprocess.run([sys.executable, "-m", "modules.catalog"], cwd=SRC_DIR, capture_output=True, check=True)
+    for name, snippet in SNIPPETS.items():
+        print(f"{name:28s} {cold_start(snippet, runs):7.2f} ms")
+
+    imported = import_report()
+    eager = [name for name in DEFERRED if name in imported]
+    print(f"\ndeferred modules imported eagerly: {', '.join(eager) if eager else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Measure trigger resolution speed on a board full of triggered creatures."""
+
+import sys
+import os
+import io
+import contextlib
+import random
+import tempfile
+import time
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from game import GameEngine
+import card_index
+
+
+class _NullWriter(io.TextIOBase):
+    def write(self, text):
+        return len(text)
+
+
+TRIGGER_POOL = [card_index.fire_elemental, card_index.berserker, card_index.skeleton, card_index.vine_elemental]
+
+
+def build_board(creatures=20, pool=TRIGGER_POOL):
+    """Game where both players have creatures from pool (by default all with triggers) in play."""
+    random.seed(0)
+    deck = [pool[i % len(pool)] for i in range(creatures + 10)]
+
+    game_file = os.path.join(tempfile.mkdtemp(), "bench_state.json")
+    game = GameEngine("P1", "P2", list(deck), list(deck), game_file=game_file)
+    with contextlib.redirect_stdout(_NullWriter()):
+        game.ready()
+        for _ in range(creatures):
+            game.draw_card("P1")
+            game.draw_card("P2")
+        state = game.get_game_state()
+        for player in ("P1", "P2"):
+            for card_id in list(state[player]["hand"]):
+                game.play_creature(player, card_id)
+    return game
+
+
+def bench_enter_dispatch(board_sizes=(10, 100, 500), rounds=200):
+    """Time enter? dispatch on boards of vanilla creatures with a couple of enter? subscribers."""
+    for size in board_sizes:
+        pool = [card_index.vine_elemental] + [card_index.forest_bear] * (size - 1)
+        game = build_board(size, pool)
+        state = game.get_game_state()
+        entering = next(iter(state["P1"]["creatures"]))
+        subscribers = sum(1 for player in ("P1", "P2") for entry in state[player]["creatures"].values()
+                          if "enter?" in entry["card"]["effect"])
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(_NullWriter()):
+            for _ in range(rounds):
+                game.check_enter_triggers("P1", entering)
+        elapsed = time.perf_counter() - start
+        print(f"enter? dispatch, {size * 2:4d} creatures, {subscribers} subscribers: "
+              f"{elapsed / rounds * 1e6:8.1f} us per creature entering")
+
+
+def main(creatures=20, rounds=200):
+    game = build_board(creatures)
+    state = game.get_game_state()
+    attackers = list(state["P1"]["creatures"])
+    blockers = list(state["P2"]["creatures"])
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(_NullWriter()):
+        for _ in range(rounds):
+            game.check_attack_triggers("P1", attackers)
+            game.check_block_triggers("P2", blockers)
+    elapsed = time.perf_counter() - start
+
+    checks = rounds * (len(attackers) + len(blockers))
+    print(f"{len(attackers)} attackers, {len(blockers)} blockers, {rounds} rounds")
+    print(f"{checks / elapsed:,.0f} trigger checks/sec ({elapsed * 1e3:.1f} ms total)")
+    bench_enter_dispatch()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""Play headless games in bulk, see src/selfplay.py for the options."""
+
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from selfplay import main
+
+if __name__ == "__main__":
+    main()
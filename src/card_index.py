@@ -1,8 +1,3 @@
-try:
-    from modules.cards import *
-except:
-    from .modules.cards import *
-
 """
 Effects parser
 
@@ -50,6 +45,10 @@ entertap; tap? gen green/blue      - Enters tapped, tap for green or blue mana
 vigilant                           - Doesn't tap when attacking
 haste; flying                      - Can attack immediately and can only be blocked by flying creatures
 """
+if __package__:
+    from .modules.cards import SummonCard, LandCards
+else:
+    from modules.cards import SummonCard, LandCards
 
 # TODO: finish this file
 
@@ -95,4 +94,7 @@ berserker = SummonCard(name="Berserker", generic_mana=2, sp_mana="red", descript
 
 _universal_cards = [slime, bigger_slime, forest_bear, vine_elemental, alpha_wolf, skeleton, skeleton_army, phantom_warrior, sea_serpent, arcane_scholar,
                     vergil, goblin_raider, fire_elemental, dragon_whelp, berserker]
-_land_cards = [forest, island, mountain, tropical_grove, volcanic_peak, wild_highlands]
\ No newline at end of file
+_land_cards = [forest, island, mountain, tropical_grove, volcanic_peak, wild_highlands]
+
+# Definition registry, keyed by the def_id every copy of a card refers to
+CARD_DEFINITIONS = {card.def_id: card for card in _universal_cards + _land_cards}
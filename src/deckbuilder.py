@@ -0,0 +1,506 @@
+"""
+Genetic deck optimizer.
+
+    python src/deckbuilder.py --generations 10 --population 16 --colors green red
+
+Evolves decks ({card_index name: copies}, the format of selfplay.DECKS)
+built from the creatures and lands in the card catalog. Every
+candidate is kept legal by DeckRules: deck size, colors, copies per
+card, the share of lands, the mana curve and enough mana sources for
+each color played.
+
+A deck's fitness is its win rate in seeded self-play against a gauntlet
+of benchmark decks (the DECKS presets by default), playing both seats.
+Every candidate plays the same seeds, so fitnesses are comparable and
+reproducible, and they are cached by deck_key(), the hash of the sorted
+deck list: a deck that comes back in a later generation costs nothing.
+The games of all new candidates of a generation go to one process pool.
+"""
+if __package__:
+    from .headless import HeadlessGame, MAX_TURNS
+    from .selfplay import DECKS, deck_list, build_deck
+    from .modules.ai import AGENTS
+    from .modules.catalog import get_catalog
+    from .modules.keywords import mask_enters_tapped
+    from .modules.mana import LAND_COLORS
+else:
+    from headless import HeadlessGame, MAX_TURNS
+    from selfplay import DECKS, deck_list, build_deck
+    from modules.ai import AGENTS
+    from modules.catalog import get_catalog
+    from modules.keywords import mask_enters_tapped
+    from modules.mana import LAND_COLORS
+
+import argparse
+import hashlib
+import math
+import multiprocessing
+import os
+import random
+import time
+
+
+# ===================
+# CARD POOL
+# ===================
+
+class PoolCard:
+    """What the deck rules need to know about a card."""
+    __slots__ = ("name", "type", "colors", "cost", "basic")
+
+    def __init__(self, name, type, colors, cost, basic):
+        self.name = name
+        self.type = type
+        # Colors a creature costs or a land can make
+        self.colors = colors
+        self.cost = cost
+        # Basic lands (one color, untapped) are not limited by max_copies
+        self.basic = basic
+
+    def __repr__(self):
+        return f"PoolCard({self.name!r})"
+
+
+def card_pool():
+    """{name: PoolCard} for every creature and land in the card catalog."""
+    catalog = get_catalog()
+    pool = {}
+    for def_id, definition in catalog.definitions.items():
+        if definition["type"] == "Creature":
+            colors = (definition["sp_mana"],) if definition["sp_mana"] else ()
+            pool[def_id] = PoolCard(def_id, "Creature", colors, definition["generic_mana"] + len(colors), False)
+        elif definition["type"] == "Land":
+            # Mana colors and keywords were worked out when the catalog was built
+            effect = catalog.effect_data(def_id)
+            colors = tuple(effect["colors"])
+            pool[def_id] = PoolCard(def_id, "Land", colors, 0, len(colors) == 1 and not mask_enters_tapped(effect["keywords"]))
+    return pool
+
+
+def deck_key(deck):
+    """Canonical hash of a deck, the same for any order or spelling of the same list."""
+    cards = sorted((name, copies) for name, copies in deck.items() if copies > 0)
+    return hashlib.blake2b(repr(cards).encode(), digest_size=12).hexdigest()
+
+
+def deck_size(deck):
+    return sum(deck.values())
+
+
+# ===================
+# RULES
+# ===================
+
+class DeckRules:
+    """
+    Constraints every evolved deck satisfies.
+
+    size         (min, max) cards
+    colors       colors the deck plays, None to let evolution pick up to max_colors
+    max_copies   copies of each creature and non-basic land
+    lands        (min, max) share of lands in the deck
+    curve        {mana value: most creatures of that mana value}
+    min_sources  lands that make each color played
+    """
+
+    def __init__(self, size=(20, 40), colors=None, max_colors=2, max_copies=3, lands=(0.35, 0.5),
+                 curve=None, min_sources=4):
+        if size[0] > size[1] or lands[0] > lands[1]:
+            raise ValueError("size and lands are (min, max) ranges")
+        self.size = size
+        self.colors = tuple(colors) if colors else None
+        self.max_colors = len(self.colors) if self.colors else max_colors
+        self.max_copies = max_copies
+        self.lands = lands
+        self.curve = curve if curve is not None else {4: 6, 5: 3, 6: 2}
+        self.min_sources = min_sources
+
+    def land_range(self, size):
+        """(min, max) lands in a deck of size cards."""
+        return math.ceil(self.lands[0] * size), math.floor(self.lands[1] * size)
+
+    def copy_limit(self, card):
+        return None if card.basic else self.max_copies
+
+    def deck_colors(self, deck, pool):
+        """Colors of the creatures in a deck."""
+        return {color for name, copies in deck.items() if copies and pool[name].type == "Creature"
+                for color in pool[name].colors}
+
+    def check(self, deck, pool):
+        """Rule violations of a deck, as messages (empty if it is legal)."""
+        problems = []
+        size = deck_size(deck)
+        if not self.size[0] <= size <= self.size[1]:
+            problems.append(f"{size} cards, needs {self.size[0]}-{self.size[1]}")
+
+        colors = self.deck_colors(deck, pool)
+        if self.colors and not colors <= set(self.colors):
+            problems.append(f"colors {sorted(colors)} outside {list(self.colors)}")
+        if len(colors) > self.max_colors:
+            problems.append(f"{len(colors)} colors, at most {self.max_colors}")
+
+        lands = sum(copies for name, copies in deck.items() if pool[name].type == "Land")
+        low, high = self.land_range(size)
+        if not low <= lands <= high:
+            problems.append(f"{lands} lands, needs {low}-{high}")
+
+        costs = {}
+        for name, copies in deck.items():
+            card = pool[name]
+            limit = self.copy_limit(card)
+            if limit is not None and copies > limit:
+                problems.append(f"{copies} copies of {name}, at most {limit}")
+            if card.type == "Creature":
+                costs[card.cost] = costs.get(card.cost, 0) + copies
+        for cost, limit in self.curve.items():
+            if costs.get(cost, 0) > limit:
+                problems.append(f"{costs[cost]} creatures of mana value {cost}, at most {limit}")
+
+        for color in colors:
+            sources = sum(copies for name, copies in deck.items() if pool[name].type == "Land" and color in pool[name].colors)
+            if sources < self.min_sources:
+                problems.append(f"{sources} {color} sources, needs {self.min_sources}")
+        return problems
+
+
+# ===================
+# WORKERS
+# ===================
+
+def _play_pairing(task):
+    """Play one gauntlet game. Returns (candidate index, candidate's score: 1 win, 0.5 draw, 0 loss)."""
+    index, candidate, opponent, number, seed, agents, max_turns = task
+    deck1, deck2 = build_deck(candidate), build_deck(opponent)
+    # The candidate takes the first seat in even games
+    if number % 2 == 0:
+        game = HeadlessGame(deck1, deck2, seed=seed, agents=agents)
+        seat = game.player1
+    else:
+        game = HeadlessGame(deck2, deck1, seed=seed, agents=(agents[1], agents[0]))
+        seat = game.player2
+    game.play_game(max_turns)
+    winner = game.result()["winner"]
+    return index, 0.5 if winner is None else float(winner == seat)
+
+
+# ===================
+# OPTIMIZER
+# ===================
+
+class DeckOptimizer:
+    """
+    Evolves decks under rules against a gauntlet of decks (anything
+    deck_list() takes). Each fitness evaluation plays games games against
+    every gauntlet deck, with agents[0] piloting the candidate. cache is a
+    {deck_key: fitness} dict, pass one in to share it between runs with
+    the same gauntlet, games and agents.
+    """
+
+    def __init__(self, rules=None, gauntlet=None, games=20, agents=("greedy", "greedy"), population=16,
+                 elite=2, tournament=3, mutation_rate=0.8, seed=0, workers=None, max_turns=MAX_TURNS, cache=None):
+        for agent in agents:
+            if isinstance(agent, str) and agent not in AGENTS:
+                raise ValueError(f"Unknown agent {agent!r}, choose from {sorted(AGENTS)}")
+        self.rules = rules or DeckRules()
+        self.pool = card_pool()
+        self.gauntlet = [deck_list(deck) for deck in (gauntlet or sorted(DECKS))]
+        self.games = games
+        self.agents = tuple(agents)
+        self.population = population
+        self.elite = elite
+        self.tournament = tournament
+        self.mutation_rate = mutation_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_turns = max_turns
+        self.cache = cache if cache is not None else {}
+        # Games played for fitness so far (cache misses only)
+        self.games_played = 0
+
+    # ===================
+    # DECKS
+    # ===================
+
+    def _colors(self, deck):
+        """Colors a deck is repaired towards: the fixed colors, or its most played creature colors first."""
+        if self.rules.colors:
+            return list(self.rules.colors)
+        weight = {}
+        for name, copies in deck.items():
+            card = self.pool[name]
+            if card.type == "Creature":
+                for color in card.colors:
+                    weight[color] = weight.get(color, 0) + copies
+        colors = sorted(weight, key=lambda color: (-weight[color], color))[:self.rules.max_colors]
+        # Room for more colors is filled at random, so there are always enough creatures to pick from
+        others = [color for color in LAND_COLORS if color not in colors]
+        return colors + self.rng.sample(others, min(len(others), self.rules.max_colors - len(colors)))
+
+    def _can_add(self, deck, card, costs):
+        limit = self.rules.copy_limit(card)
+        if limit is not None and deck.get(card.name, 0) >= limit:
+            return False
+        if card.type == "Creature":
+            return costs.get(card.cost, 0) < self.rules.curve.get(card.cost, len(self.pool) * 99)
+        return True
+
+    def repair(self, deck, size=None):
+        """
+        Legal deck closest to deck: off-color cards and excess copies are
+        dropped, then lands and creatures are added or removed (at random)
+        until the size, land share, curve and color sources fit. size is
+        the number of cards aimed for, by default the deck's own size.
+        """
+        rules, pool, rng = self.rules, self.pool, self.rng
+        colors = self._colors(deck)
+        deck = {name: copies for name, copies in deck.items() if copies > 0}
+
+        # Off-color cards and excess copies
+        for name in list(deck):
+            card = pool[name]
+            allowed = (set(card.colors) <= set(colors)) if card.type == "Creature" else bool(set(card.colors) & set(colors))
+            limit = rules.copy_limit(card)
+            if not allowed:
+                del deck[name]
+            elif limit is not None and deck[name] > limit:
+                deck[name] = limit
+
+        # Curve
+        costs = {}
+        for name, copies in deck.items():
+            if pool[name].type == "Creature":
+                costs[pool[name].cost] = costs.get(pool[name].cost, 0) + copies
+        for cost, limit in rules.curve.items():
+            while costs.get(cost, 0) > limit:
+                name = rng.choice(sorted(name for name in deck if pool[name].type == "Creature" and pool[name].cost == cost))
+                self._remove(deck, name)
+                costs[cost] -= 1
+
+        size = min(max(size or deck_size(deck), rules.size[0]), rules.size[1])
+        low, high = rules.land_range(size)
+        lands = sum(copies for name, copies in deck.items() if pool[name].type == "Land")
+        target_lands = min(max(lands, low), high)
+
+        # Lands, sources for each color first
+        land_options = sorted(name for name, card in pool.items() if card.type == "Land" and set(card.colors) & set(colors))
+        while lands > target_lands:
+            self._remove(deck, rng.choice(sorted(name for name in deck if pool[name].type == "Land")))
+            lands -= 1
+        for color in colors:
+            basic = next((name for name, card in pool.items() if card.basic and card.colors == (color,)), None)
+            while basic is not None and self._sources(deck, color) < rules.min_sources:
+                if lands >= high:
+                    # Trade a land of a color with sources to spare for a basic of this one
+                    swappable = sorted(name for name in deck if pool[name].type == "Land" and color not in pool[name].colors
+                                       and all(self._sources(deck, other) > rules.min_sources for other in pool[name].colors))
+                    if not swappable:
+                        break
+                    self._remove(deck, rng.choice(swappable))
+                    lands -= 1
+                deck[basic] = deck.get(basic, 0) + 1
+                lands += 1
+            target_lands = max(target_lands, lands)
+        while lands < target_lands:
+            options = [name for name in land_options if self._can_add(deck, pool[name], costs)]
+            if not options:
+                break
+            name = rng.choice(options)
+            deck[name] = deck.get(name, 0) + 1
+            lands += 1
+
+        # Creatures
+        creatures = sum(copies for name, copies in deck.items() if pool[name].type == "Creature")
+        while creatures > size - lands:
+            name = rng.choice(sorted(name for name in deck if pool[name].type == "Creature"))
+            costs[pool[name].cost] -= 1
+            self._remove(deck, name)
+            creatures -= 1
+        creature_options = sorted(name for name, card in pool.items() if card.type == "Creature" and set(card.colors) <= set(colors))
+        while creatures < size - lands:
+            options = [name for name in creature_options if self._can_add(deck, pool[name], costs)]
+            if not options:
+                break
+            name = rng.choice(options)
+            deck[name] = deck.get(name, 0) + 1
+            costs[pool[name].cost] = costs.get(pool[name].cost, 0) + 1
+            creatures += 1
+        # Out of creatures in these colors, lands fill up what the land share allows
+        while creatures + lands < size and lands < high:
+            options = [name for name in land_options if self._can_add(deck, pool[name], costs)]
+            if not options:
+                break
+            name = rng.choice(options)
+            deck[name] = deck.get(name, 0) + 1
+            lands += 1
+
+        problems = rules.check(deck, pool)
+        if problems:
+            raise ValueError(f"No legal deck under these rules ({'; '.join(problems)})")
+        return deck
+
+    def _remove(self, deck, name):
+        deck[name] -= 1
+        if not deck[name]:
+            del deck[name]
+
+    def _sources(self, deck, color):
+        return sum(copies for name, copies in deck.items() if self.pool[name].type == "Land" and color in self.pool[name].colors)
+
+    def random_deck(self):
+        """A random legal deck."""
+        colors = list(self.rules.colors) if self.rules.colors else self.rng.sample(LAND_COLORS, self.rules.max_colors)
+        seed_cards = [name for name, card in self.pool.items() if card.type == "Creature" and card.colors
+                      and card.colors[0] in colors]
+        deck = {name: 1 for name in self.rng.sample(sorted(seed_cards), min(len(colors), len(seed_cards)))}
+        return self.repair(deck, self.rng.randint(*self.rules.size))
+
+    def mutate(self, deck):
+        """Swap, add or remove a card, then repair."""
+        rng = self.rng
+        deck = dict(deck)
+        names = sorted(deck)
+        kind = rng.choice(("swap", "swap", "add", "remove"))
+        if kind in ("swap", "remove"):
+            self._remove(deck, rng.choice(names))
+        if kind in ("swap", "add"):
+            name = rng.choice(sorted(self.pool))
+            deck[name] = deck.get(name, 0) + 1
+        size = deck_size(deck)
+        return self.repair(deck, size)
+
+    def crossover(self, first, second):
+        """Each card's copies from one parent or the other, then repair."""
+        child = {}
+        for name in sorted(set(first) | set(second)):
+            copies = (first if self.rng.random() < 0.5 else second).get(name, 0)
+            if copies:
+                child[name] = copies
+        return self.repair(child, self.rng.choice((deck_size(first), deck_size(second))))
+
+    # ===================
+    # FITNESS
+    # ===================
+
+    def evaluate(self, decks, pool=None):
+        """Fitness (gauntlet win rate) of each deck, playing only the ones not cached."""
+        keys = [deck_key(deck) for deck in decks]
+        pending = {}
+        for key, deck in zip(keys, decks):
+            if key not in self.cache and key not in pending:
+                pending[key] = deck
+        if pending:
+            order = list(pending)
+            tasks = [(index, deck_list(pending[key]), opponent, number, self.seed + number, self.agents, self.max_turns)
+                     for index, key in enumerate(order)
+                     for opponent in self.gauntlet
+                     for number in range(self.games)]
+            if pool is None:
+                results = map(_play_pairing, tasks)
+            else:
+                chunksize = max(1, len(tasks) // (self.workers * 8))
+                results = pool.imap_unordered(_play_pairing, tasks, chunksize)
+            scores = [0.0] * len(order)
+            for index, score in results:
+                scores[index] += score
+            games = self.games * len(self.gauntlet)
+            for index, key in enumerate(order):
+                self.cache[key] = scores[index] / games
+            self.games_played += len(tasks)
+        return [self.cache[key] for key in keys]
+
+    # ===================
+    # EVOLUTION
+    # ===================
+
+    def _select(self, ranked):
+        """Tournament selection from (fitness, deck) pairs."""
+        return max(self.rng.sample(ranked, min(self.tournament, len(ranked))), key=lambda pair: pair[0])[1]
+
+    def evolve(self, generations=10, initial=(), on_generation=None):
+        """
+        Run the genetic algorithm, starting from initial decks (repaired)
+        filled up with random ones. on_generation(generation, ranked) gets
+        each generation's (fitness, deck) pairs, best first.
+        Returns the best (fitness, deck) found.
+        """
+        population = [self.repair(dict(deck)) for deck in initial][:self.population]
+        while len(population) < self.population:
+            population.append(self.random_deck())
+
+        best = None
+        # Workers load the card catalog once when they start
+        pool = multiprocessing.Pool(self.workers, initializer=get_catalog) if self.workers > 1 else None
+        try:
+            for generation in range(generations):
+                fitness = self.evaluate(population, pool)
+                ranked = sorted(zip(fitness, population), key=lambda pair: (-pair[0], deck_key(pair[1])))
+                if best is None or ranked[0][0] > best[0]:
+                    best = ranked[0]
+                if on_generation is not None:
+                    on_generation(generation, ranked)
+                if generation == generations - 1:
+                    break
+
+                # Elites carry over, children fill the rest without duplicates
+                population = [deck for _, deck in ranked[:self.elite]]
+                seen = {deck_key(deck) for deck in population}
+                attempts = 0
+                while len(population) < self.population:
+                    attempts += 1
+                    child = self.crossover(self._select(ranked), self._select(ranked))
+                    if self.rng.random() < self.mutation_rate:
+                        child = self.mutate(child)
+                    key = deck_key(child)
+                    if key in seen and attempts < self.population * 10:
+                        continue
+                    seen.add(key)
+                    population.append(child)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        return best
+
+
+def format_deck(deck, pool):
+    """Deck list as lines of "copies name", creatures by mana value, then lands."""
+    order = sorted(deck, key=lambda name: (pool[name].type == "Land", pool[name].cost, name))
+    return [f"{deck[name]} {name}" for name in order]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evolve decks against a gauntlet of benchmark decks.")
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--games", type=int, default=20, help="games per gauntlet deck")
+    parser.add_argument("--colors", nargs="+", choices=LAND_COLORS, default=None)
+    parser.add_argument("--min-size", type=int, default=20)
+    parser.add_argument("--max-size", type=int, default=40)
+    parser.add_argument("--gauntlet", nargs="+", choices=sorted(DECKS), default=None)
+    parser.add_argument("--agents", nargs=2, default=["greedy", "greedy"], choices=sorted(AGENTS), metavar="AGENT")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rules = DeckRules(size=(args.min_size, args.max_size), colors=args.colors)
+    optimizer = DeckOptimizer(rules, gauntlet=args.gauntlet, games=args.games, agents=args.agents,
+                              population=args.population, seed=args.seed, workers=args.workers)
+    start = time.perf_counter()
+
+    def report(generation, ranked):
+        fitness, deck = ranked[0]
+        print(f"generation {generation + 1}: best {fitness:.1%} ({deck_size(deck)} cards), "
+              f"mean {sum(f for f, _ in ranked) / len(ranked):.1%}, {optimizer.games_played} games, "
+              f"{len(optimizer.cache)} decks cached, {time.perf_counter() - start:.1f} s")
+
+    fitness, deck = optimizer.evolve(args.generations, on_generation=report)
+    print(f"\nbest deck, {fitness:.1%} against the gauntlet:")
+    for line in format_deck(deck, optimizer.pool):
+        print(f"  {line}")
+    return fitness, deck
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,91 @@
-try:
+if __package__:
     from .modules.cards import Cards, SummonCard, SpellCard, LandCards
-    from .modules.utils import execute_card, enters_tapped, card_has_trigger, get_all_keywords
-    from .card_index import *
-except:
+    from .modules.utils import execute_card, enters_tapped, can_attack_immediately, get_all_keywords
+    from .modules.keywords import can_block_keywords, is_vigilant
+    from .modules.storage import GameSession, DEFAULT_FILES, make_store
+    from .modules.zones import PlayerZones, StateWatchers
+    from .modules.zobrist import StateHash
+    from .modules.evaluation import Evaluation
+    from .modules.parser import effect_cache
+    from .modules.effects import run as run_effect
+    from .modules.catalog import get_catalog
+    from .modules import moves, combat, mana
+else:
     from modules.cards import Cards, SummonCard, SpellCard, LandCards
-    from modules.utils import execute_card, enters_tapped, card_has_trigger, get_all_keywords
-    from card_index import *
+    from modules.utils import execute_card, enters_tapped, can_attack_immediately, get_all_keywords
+    from modules.keywords import can_block_keywords, is_vigilant
+    from modules.storage import GameSession, DEFAULT_FILES, make_store
+    from modules.zones import PlayerZones, StateWatchers
+    from modules.zobrist import StateHash
+    from modules.evaluation import Evaluation
+    from modules.parser import effect_cache
+    from modules.effects import run as run_effect
+    from modules.catalog import get_catalog
+    import modules.moves as moves
+    import modules.combat as combat
+    import modules.mana as mana
 
 import random
-import json
 import time
 import datetime
+import contextlib
+import functools
+import io
 import os
+import struct
+
+
+# Per-copy fields of a card record, everything else lives in its definition
+CARD_RECORD_FIELDS = ("id", "def_id", "tapped", "status", "attack", "defence")
+
+
+def rules_action(method):
+    """Run an engine action as a single session transaction (and journal record)."""
+    name = method.__name__
+
+    # session.transaction() spelled out, this runs for every action
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        session = self.session
+        outermost = session.begin()
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException:
+            session.abort(outermost)
+            raise
+        session.end(outermost, name, args, kwargs)
+        return result
+    return wrapper
+
+
+def rng_action(method):
+    """
+    A rules action that draws from the game's RNG. Its journal record
+    also carries the RNG state the action started from, so replaying it
+    gives the same draws whatever else used the RNG since the snapshot.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        session = self.session
+        outermost = session.begin()
+        rng = self._rng_state() if outermost else None
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException:
+            session.abort(outermost)
+            raise
+        session.end(outermost, name, args, kwargs, rng=rng)
+        return result
+    return wrapper
 
 
 class GameEngine:
-    def __init__(self, player1, player2, deck1, deck2):
+    # Log lines are only formatted and written while this is set
+    logging = True
+
+    def __init__(self, player1, player2, deck1, deck2, durable=False, store=None, game_file=None, seed=None):
         self.player1 = player1
         self.player2 = player2
 
@@ -23,26 +93,96 @@ class GameEngine:
         self.deck2 = deck2
 
         self.battlefield = {}
-        # Set path to db folder at same level as src folder
-        src_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(src_dir)
-        self.game_file = os.path.join(project_root, "db", "game_state.json")
+        # store is a store object or the name of one in storage.STORES
+        # ("json", "snapshot", "journal", "sqlite", ...), named stores keep their file in the db
+        # folder at same level as src folder unless given game_file
+        if store is None:
+            store = "json"
+        if game_file is None:
+            src_dir = os.path.dirname(os.path.abspath(__file__))
+            project_root = os.path.dirname(src_dir)
+            file_name = DEFAULT_FILES[store] if isinstance(store, str) and store in DEFAULT_FILES else "game_state.json"
+            game_file = os.path.join(project_root, "db", file_name)
+        self.game_file = game_file
         self.turn = 0
         self.card_id_counter = 1
+        # Random source for shuffles, mulligans and anything else left to chance.
+        # Seeded per game (a fresh seed if none is given), the seed and the
+        # generator's state are saved with the game
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        
+        # def_id -> card built from the definitions of the loaded state
+        self._prototypes = {}
+        self._prototype_source = None
+        # Last formatted log timestamp
+        self._stamp_second = None
+        self._stamp = ""
+        
+        # player -> zone views over the loaded state
+        self._zone_cache = {}
+        self._zone_source = None
+        
+        # Data kept current with the loaded state (state hash, evaluation),
+        # each built the first time it is asked for
+        self._watchers = None
+        self._watch_source = None
+
+        # State is kept in memory and written at commit points,
+        # durable=True writes the store after every action instead
+        if isinstance(store, str):
+            store = make_store(store, self.game_file)
+        self.session = GameSession(store, durable=durable)
+        self.session.replayer = self._replay
+        self.session.before_commit = self._flush_zones
+        self.session.after_load = self._restore_rng
 
     def _timestamp(self):
-        """Get current timestamp string."""
-        return datetime.datetime.now().strftime('%H:%M:%S')
+        """Get current timestamp string (formatted once per second)."""
+        second = int(time.time())
+        if second != self._stamp_second:
+            self._stamp_second = second
+            self._stamp = datetime.datetime.fromtimestamp(second).strftime('%H:%M:%S')
+        return self._stamp
+    
+    def _log(self, message):
+        """
+        Write an engine log line when logging is on. Callers check
+        self.logging too, so nothing is formatted with logging off: one
+        guard over each run of log lines.
+        """
+        if self.logging:
+            print(message)
     
     def _load_state(self):
-        """Load and return the current game state from JSON."""
-        with open(self.game_file, "r") as f:
-            return json.load(f)
+        """Load and return the current game state from the session."""
+        game_state = self.session.load()
+        if game_state and "definitions" not in game_state:
+            # Saved before card definitions were split out of the card copies
+            self._compact_state(game_state)
+        return game_state
     
     def _save_state(self, game_state):
-        """Save the game state to JSON."""
-        with open(self.game_file, "w") as f:
-            json.dump(game_state, f, indent=4)
+        """Save the game state to the session (written to disk on commit)."""
+        self.session.save(game_state)
+    
+    def commit(self):
+        """Write the in-memory game state to disk."""
+        return self.session.commit()
+    
+    flush = commit
+    
+    def _replay(self, records):
+        """Re-run journaled actions on top of a loaded snapshot."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            for record in records:
+                if "rng" in record:
+                    # RNG-drawing action, start from the state it had when it ran
+                    self._set_rng_state(record["rng"])
+                getattr(self, record["action"])(*record.get("args", []), **record.get("kwargs", {}))
+        self._flush_zones()
     
     def count(self, target: Cards, deck):
         """Counts the number of target cards in a given deck."""
@@ -58,58 +198,220 @@ class GameEngine:
             card.id = self.card_id_counter
             self.card_id_counter += 1
     
+    # ===================
+    # CARD DEFINITIONS
+    # ===================
+    
+    def _register_definition(self, definitions, card):
+        """Add a card's shared fields to the definitions registry and return its def_id."""
+        def_id = card.def_id
+        catalog = get_catalog()
+        prototype = catalog.get(def_id)
+        if prototype is not None and prototype.definition is card.definition:
+            # Copies of catalog cards (selfplay decks) take the precompiled definition
+            definition = dict(catalog.definitions[def_id])
+        else:
+            definition = card.definition_to_dict()
+        suffix = 1
+        # Same def_id but different card (e.g. a custom card named like an indexed one)
+        while def_id in definitions and definitions[def_id] != definition:
+            suffix += 1
+            def_id = f"{card.def_id}_{suffix}"
+        definitions[def_id] = definition
+        return def_id
+    
+    def _card_record(self, definitions, card):
+        """Convert a card object into a per-copy record for the game state."""
+        return card.to_record(self._register_definition(definitions, card))
+    
+    def _compact_card(self, definitions, card_dict):
+        """Turn a full card dict (old saves, CLI edits) back into a card record."""
+        if card_dict.get("def_id") in definitions:
+            return {key: card_dict[key] for key in CARD_RECORD_FIELDS if key in card_dict}
+        
+        card = self._reconstruct_card(card_dict)
+        # Prefer the catalog definition so base stats aren't taken from a modified copy
+        prototype = get_catalog().get(card.def_id)
+        if prototype is None or prototype.type != card.type or getattr(prototype, "effect", "") != card_dict.get("effect"):
+            prototype = card
+        return card.to_record(self._register_definition(definitions, prototype))
+    
+    def _compact_state(self, game_state):
+        """Store every card in game_state as a record pointing into the definitions registry."""
+        definitions = game_state.setdefault("definitions", {})
+        
+        for player in [self.player1, self.player2]:
+            player_data = game_state.get(player)
+            if not isinstance(player_data, dict):
+                continue
+            
+            player_data["deck"] = [self._compact_card(definitions, c) for c in player_data["deck"]]
+            player_data["hand"] = {cid: self._compact_card(definitions, c) for cid, c in player_data["hand"].items()}
+            player_data["graveyard"] = [self._compact_card(definitions, c) for c in player_data["graveyard"]]
+            for zone in ("creatures", "lands"):
+                for entry in player_data[zone].values():
+                    entry["card"] = self._compact_card(definitions, entry["card"])
+        
+        return game_state
+    
+    def _expand_card(self, definitions, card_dict):
+        """Merge a card record with its definition into a full card dict."""
+        card = dict(definitions.get(card_dict.get("def_id"), {}))
+        card.update(card_dict)
+        return card
+    
+    def _card_name(self, game_state, card_dict):
+        """Look up a card record's name in the definitions registry."""
+        return game_state["definitions"][card_dict["def_id"]]["name"]
+    
+    def _card_definition(self, game_state, card_dict):
+        """Return the shared definition of a card record."""
+        return game_state["definitions"][card_dict["def_id"]]
+    
+    # ===================
+    # ZONES
+    # ===================
+    
+    def _zones(self, game_state, player):
+        """Zone views (with name counters) over a player's part of game_state."""
+        # Built once per state dict, a replaced or reloaded state gets new views
+        if self._zone_source is not game_state:
+            self._flush_zones()
+            self._zone_source = game_state
+            self._zone_cache = {}
+        zones = self._zone_cache.get(player)
+        if zones is None:
+            zones = self._zone_cache[player] = PlayerZones(game_state[player], game_state["definitions"])
+            if self._watch_source is game_state:
+                zones.watch(self._watchers, player)
+        return zones
+    
+    def _flush_zones(self):
+        """Write pending deck draws back into the game state lists."""
+        for zones in self._zone_cache.values():
+            zones.flush()
+    
+    # ===================
+    # STATE WATCHERS
+    # ===================
+    
+    def _watcher(self, name, build):
+        """
+        The named watcher of the loaded state, built by build(game_state)
+        on first use and told about every change after that.
+        """
+        game_state = self._load_state()
+        if self._watch_source is not game_state:
+            self._watchers = StateWatchers()
+            self._watch_source = game_state
+            if self._zone_source is game_state:
+                for player, zones in self._zone_cache.items():
+                    zones.watch(self._watchers, player)
+        watcher = self._watchers.get(name)
+        if watcher is None:
+            self._flush_zones()
+            watcher = build(game_state)
+            self._watchers.add(name, watcher)
+        return watcher
+    
+    def state_hash(self):
+        """64-bit Zobrist hash of the current position (see modules/zobrist.py)."""
+        return self._watcher("hash", lambda game_state: StateHash(game_state, (self.player1, self.player2))).value
+    
+    def evaluation(self):
+        """Board evaluation terms of both players (see modules/evaluation.py)."""
+        return self._watcher("evaluation", lambda game_state: Evaluation(game_state, (self.player1, self.player2)))
+    
+    def evaluate(self, player, weights=None):
+        """Evaluation score of the position for player, positive when player is ahead."""
+        return self.evaluation().score(player, weights)
+    
+    def _changed_card(self, game_state, player, zone, card_id):
+        """Tell the watchers about a permanent changed in place."""
+        if self._watch_source is game_state:
+            self._watchers.card(player, zone, card_id, game_state[player][zone].get(card_id))
+    
+    def _changed_field(self, game_state, player, field):
+        """Tell the watchers about a changed player field (player None for a game field)."""
+        if self._watch_source is game_state:
+            self._watchers.scalar(player, field, game_state[field] if player is None else game_state[player][field])
+    
     def shuffle_deck(self, deck):
-        new_deck = []
-        while len(deck) > 0:
-            to_pop = random.randint(0, len(deck)-1)
-            item = deck.pop(to_pop)
-            new_deck.append(item)
-        return new_deck
+        """Shuffle a list in place with the game's RNG (Fisher-Yates) and return it."""
+        rng = self.rng
+        for i in range(len(deck) - 1, 0, -1):
+            j = rng.randrange(i + 1)
+            deck[i], deck[j] = deck[j], deck[i]
+        return deck
+    
+    def _rng_state(self):
+        """The seed and the RNG's state as plain JSON data."""
+        version, internal, gauss_next = self.rng.getstate()
+        return {
+            "seed": self.seed,
+            "version": version,
+            # Mersenne Twister words (and position) as one hex string instead of 625 JSON numbers
+            "state": struct.pack(f"<{len(internal)}I", *internal).hex(),
+            "gauss_next": gauss_next
+        }
+    
+    def _set_rng_state(self, saved):
+        """Continue with an RNG state from _rng_state()."""
+        words = bytes.fromhex(saved["state"])
+        internal = struct.unpack(f"<{len(words) // 4}I", words)
+        self.seed = saved["seed"]
+        self.rng.setstate((saved["version"], internal, saved["gauss_next"]))
     
+    def _save_rng(self, game_state):
+        """Record the seed and the RNG's state in the game state, after the engine draws from it."""
+        game_state["rng"] = self._rng_state()
+    
+    def _restore_rng(self, game_state):
+        """Continue with the RNG saved in a game state read from the store."""
+        saved = game_state.get("rng")
+        if saved:
+            self._set_rng_state(saved)
+    
+    @rules_action
     def play_creature(self, player, card_id):
         """
         Play a creature from player's hand to the battlefield.
         """
         # Load current game state
-        with open(self.game_file, "r") as f:
-            game_state = json.load(f)
+        game_state = self._load_state()
         
         # Check if player exists
         if player not in game_state:
-            print(f"[{self._timestamp()}] Error: Player '{player}' not found in game state")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Player '{player}' not found in game state")
             return False
         
-        player_data = game_state[player]
+        zones = self._zones(game_state, player)
         
         # Find card in player's hand by ID
-        card_dict = None
-        if isinstance(player_data["hand"], dict):
-            card_dict = player_data["hand"].get(str(card_id))
-        elif isinstance(player_data["hand"], list):
-            for c in player_data["hand"]:
-                if c.get("id") == card_id:
-                    card_dict = c
-                    player_data["hand"].remove(c)
-                    break
+        card_dict = zones.hand.get(card_id)
         
         if not card_dict:
-            print(f"[{self._timestamp()}] Error: Card with ID {card_id} not found in {player}'s hand")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Card with ID {card_id} not found in {player}'s hand")
             return False
         
         # Reconstruct card object from dictionary
-        card = self._reconstruct_card(card_dict)
+        card = self._reconstruct_card(card_dict, game_state["definitions"])
         
         if not card:
-            print(f"[{self._timestamp()}] Error: Could not reconstruct card from data")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Could not reconstruct card from data")
             return False
         
         # Check if it's a creature card
         if not isinstance(card, SummonCard):
-            print(f"[{self._timestamp()}] Error: Card '{card.name}' is not a creature")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Card '{card.name}' is not a creature")
             return False
         
-        # Execute card effects
-        executed_card = execute_card(card, game_state)
+        # Execute card effects, counting expressions read this player's zones
+        executed_card = execute_card(card, zones)
         
         # Check if card enters tapped
         if enters_tapped(executed_card):
@@ -121,25 +423,20 @@ class GameEngine:
         
         # Add to battlefield
         battlefield_entry = {
-            "card": executed_card.to_dict(),
+            "card": executed_card.to_record(card_dict["def_id"]),
             "action": "attack",  # Default action
-            "summoning_sickness": not card_has_trigger(executed_card, "haste")
+            "summoning_sickness": not can_attack_immediately(executed_card)
         }
         
         # Add to player's creatures on battlefield
-        if str(card_id) in player_data["hand"]:
-            del player_data["hand"][str(card_id)]
-        
-        player_data["creatures"][str(card_id)] = battlefield_entry
-        
-        # Update battlefield state
-        game_state[player] = player_data
+        zones.hand.remove(card_id)
+        zones.creatures.add(card_id, battlefield_entry)
         
         # Save updated game state
-        with open(self.game_file, "w") as f:
-            json.dump(game_state, f, indent=4)
+        self._save_state(game_state)
         
-        print(f"[{self._timestamp()}] {player} played {executed_card.name} (ID: {card_id}) - {executed_card.attack}/{executed_card.defence}")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] {player} played {executed_card.name} (ID: {card_id}) - {executed_card.attack}/{executed_card.defence}")
         
         # Check for enter? triggers from other creatures
         self.check_enter_triggers(player, card_id)
@@ -150,31 +447,70 @@ class GameEngine:
     # CORE GAME LOOP
     # ===================
     
+    @rules_action
     def draw_card(self, player):
         """Move top card from deck to hand."""
         game_state = self._load_state()
         
         if player not in game_state:
-            print(f"[{self._timestamp()}] Error: Player '{player}' not found")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Player '{player}' not found")
             return False
         
-        player_data = game_state[player]
+        zones = self._zones(game_state, player)
         
         # Check if deck is empty
-        if not player_data["deck"]:
-            print(f"[{self._timestamp()}] {player} cannot draw - deck is empty!")
+        if not zones.deck:
+            if self.logging:
+                self._log(f"[{self._timestamp()}] {player} cannot draw - deck is empty!")
             return False
         
         # Draw top card
-        card = player_data["deck"].pop(0)
+        card = zones.deck.draw()
         card_id = str(card["id"])
-        player_data["hand"][card_id] = card
+        zones.hand.add(card_id, card)
+        
+        if self.logging:
+            self._log(f"[{self._timestamp()}] {player} draws: {self._card_name(game_state, card)} (ID: {card_id})")
+        
+        self._save_state(game_state)
+        return True
+    
+    @rng_action
+    def mulligan(self, player, hand_size=None):
+        """
+        Shuffle player's hand into the deck with the game's RNG and draw a
+        new hand of hand_size cards (default: as many as were in hand).
+        """
+        game_state = self._load_state()
+        
+        if player not in game_state:
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Player '{player}' not found")
+            return False
+        
+        zones = self._zones(game_state, player)
+        returned = [zones.hand.remove(card_id) for card_id in list(zones.hand)]
+        if hand_size is None:
+            hand_size = len(returned)
+        
+        deck = list(zones.deck.records()) + returned
+        zones.deck.replace(self.shuffle_deck(deck))
+        self._save_rng(game_state)
         
-        print(f"[{self._timestamp()}] {player} draws: {card['name']} (ID: {card_id})")
+        for _ in range(hand_size):
+            card = zones.deck.draw()
+            if card is None:
+                break
+            zones.hand.add(str(card["id"]), card)
+        
+        if self.logging:
+            self._log(f"[{self._timestamp()}] {player} mulligans into {len(zones.hand)} cards")
         
         self._save_state(game_state)
         return True
     
+    @rules_action
     def start_turn(self, player):
         """Initialize turn, increment counter, set active player."""
         game_state = self._load_state()
@@ -183,11 +519,16 @@ class GameEngine:
         game_state["current_player"] = player
         game_state["phase"] = "untap"
         game_state["lands_played_this_turn"] = 0
+        for field in ("current_player", "phase", "lands_played_this_turn"):
+            self._changed_field(game_state, None, field)
         
-        print(f"\n[{self._timestamp()}] === TURN {game_state['turn_number']}: {player} ===\n")
+        if self.logging:
+            self._log(f"\n[{self._timestamp()}] === TURN {game_state['turn_number']}: {player} ===\n")
         
         self._save_state(game_state)
+        self.commit()
     
+    @rules_action
     def untap_step(self, player):
         """Untap all creatures and lands."""
         game_state = self._load_state()
@@ -195,50 +536,68 @@ class GameEngine:
         if player not in game_state:
             return
         
-        print(f"[{self._timestamp()}] UNTAP STEP:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] UNTAP STEP:")
         player_data = game_state[player]
         
         # Untap creatures and clear summoning sickness
         for creature_id, creature_data in player_data["creatures"].items():
+            changed = creature_data.get("summoning_sickness", False)
+            
             # Untap
             if creature_data["card"]["tapped"] == 1:
                 creature_data["card"]["tapped"] = 0
-                print(f"  [{self._timestamp()}] {creature_data['card']['name']} untaps")
+                changed = True
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, creature_data['card'])} untaps")
             
             # Clear summoning sickness (affects both tapped and untapped creatures)
             creature_data["summoning_sickness"] = False
+            if changed:
+                self._changed_card(game_state, player, "creatures", creature_id)
         
         # Untap lands
         for land_id, land_data in player_data["lands"].items():
             if land_data["card"]["tapped"] == 1:
                 land_data["card"]["tapped"] = 0
-                print(f"  [{self._timestamp()}] {land_data['card']['name']} untaps")
+                self._changed_card(game_state, player, "lands", land_id)
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, land_data['card'])} untaps")
         
         game_state["phase"] = "upkeep"
+        self._changed_field(game_state, None, "phase")
         self._save_state(game_state)
+        self.commit()
     
+    @rules_action
     def draw_step(self, player):
         """Draw 1 card (skip turn 1 for starting player)."""
         game_state = self._load_state()
         turn_number = game_state.get("turn_number", 1)
         
-        print(f"\n[{self._timestamp()}] DRAW STEP:")
+        if self.logging:
+            self._log(f"\n[{self._timestamp()}] DRAW STEP:")
         
         # Skip first draw for starting player on turn 1
         if turn_number == 1 and player == self.player1:
-            print(f"  [{self._timestamp()}] {player} skips draw (turn 1)")
+            if self.logging:
+                self._log(f"  [{self._timestamp()}] {player} skips draw (turn 1)")
         else:
             self.draw_card(player)
         
         game_state = self._load_state()
         game_state["phase"] = "main_pre"
+        self._changed_field(game_state, None, "phase")
         self._save_state(game_state)
+        self.commit()
     
+    @rules_action
     def end_turn(self, player):
         """Run cleanup, clear mana pool, shift to opponent."""
         game_state = self._load_state()
         
-        print(f"\n[{self._timestamp()}] END PHASE:")
+        if self.logging:
+            self._log(f"\n[{self._timestamp()}] END PHASE:")
         
         # Clear mana pool
         self.clear_mana_pool(player)
@@ -246,11 +605,16 @@ class GameEngine:
         game_state = self._load_state()
         game_state["phase"] = "end"
         game_state["lands_played_this_turn"] = 0
+        self._changed_field(game_state, None, "phase")
+        self._changed_field(game_state, None, "lands_played_this_turn")
         
-        print(f"  [{self._timestamp()}] {player}'s turn ends\n")
+        if self.logging:
+            self._log(f"  [{self._timestamp()}] {player}'s turn ends\n")
         
         self._save_state(game_state)
+        self.commit()
     
+    @rules_action
     def clear_mana_pool(self, player):
         """Reset all mana to 0."""
         game_state = self._load_state()
@@ -262,8 +626,11 @@ class GameEngine:
         player_data["blue_mana"] = 0
         player_data["red_mana"] = 0
         player_data["green_mana"] = 0
+        for field in ("blue_mana", "red_mana", "green_mana"):
+            self._changed_field(game_state, player, field)
         
-        print(f"  [{self._timestamp()}] Mana pool cleared → blue: 0, red: 0, green: 0")
+        if self.logging:
+            self._log(f"  [{self._timestamp()}] Mana pool cleared → blue: 0, red: 0, green: 0")
         
         self._save_state(game_state)
 
@@ -271,58 +638,69 @@ class GameEngine:
     # LAND & MANA SYSTEM
     # ===================
     
+    @rules_action
     def play_land(self, player, card_id):
         """Move land from hand to lands dict."""
         game_state = self._load_state()
         
         if player not in game_state:
-            print(f"[{self._timestamp()}] Error: Player '{player}' not found")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Player '{player}' not found")
             return False
         
         # Check lands played this turn
         if game_state.get("lands_played_this_turn", 0) >= 1:
-            print(f"[{self._timestamp()}] Error: {player} already played a land this turn")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: {player} already played a land this turn")
             return False
         
-        player_data = game_state[player]
+        zones = self._zones(game_state, player)
         card_id_str = str(card_id)
         
         # Find card in hand
-        if card_id_str not in player_data["hand"]:
-            print(f"[{self._timestamp()}] Error: Card ID {card_id} not in {player}'s hand")
+        if card_id_str not in zones.hand:
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Card ID {card_id} not in {player}'s hand")
             return False
         
-        card_dict = player_data["hand"][card_id_str]
+        card_dict = zones.hand.get(card_id_str)
         
         # Verify it's a land
-        if card_dict.get("type") != "Land":
-            print(f"[{self._timestamp()}] Error: {card_dict['name']} is not a land")
+        if self._card_definition(game_state, card_dict).get("type") != "Land":
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: {self._card_name(game_state, card_dict)} is not a land")
             return False
         
         # Reconstruct card
-        card = self._reconstruct_card(card_dict)
+        card = self._reconstruct_card(card_dict, game_state["definitions"])
         
         # Check if enters tapped
         if enters_tapped(card):
             card.tapped = 1
         
         # Move to lands
-        del player_data["hand"][card_id_str]
-        player_data["lands"][card_id_str] = {
-            "card": card.to_dict()
-        }
+        zones.hand.remove(card_id_str)
+        zones.lands.add(card_id_str, {
+            "card": card.to_record(card_dict["def_id"])
+        })
         
         game_state["lands_played_this_turn"] = game_state.get("lands_played_this_turn", 0) + 1
+        self._changed_field(game_state, None, "lands_played_this_turn")
         
-        print(f"[{self._timestamp()}] {player} plays {card.name}")
-        if card.tapped:
-            print(f"  [{self._timestamp()}] {card.name} enters tapped")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] {player} plays {card.name}")
+        if self.logging and card.tapped:
+            self._log(f"  [{self._timestamp()}] {card.name} enters tapped")
         
         self._save_state(game_state)
         return True
     
-    def tap_land(self, player, land_id):
-        """Execute 'tap? gen [color]' effect, set tapped=1."""
+    @rules_action
+    def tap_land(self, player, land_id, color=None):
+        """
+        Execute 'tap? gen [color]' effect, set tapped=1.
+        color picks the mana a dual land makes, by default its first color.
+        """
         game_state = self._load_state()
         
         if player not in game_state:
@@ -332,37 +710,36 @@ class GameEngine:
         land_id_str = str(land_id)
         
         if land_id_str not in player_data["lands"]:
-            print(f"[{self._timestamp()}] Error: Land ID {land_id} not found")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Land ID {land_id} not found")
             return False
         
         land_data = player_data["lands"][land_id_str]
         
         # Check if already tapped
         if land_data["card"]["tapped"] == 1:
-            print(f"[{self._timestamp()}] Error: {land_data['card']['name']} is already tapped")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: {self._card_name(game_state, land_data['card'])} is already tapped")
+            return False
+        
+        # Colors from "tap? gen [color]" ("gen red/blue" makes either)
+        colors = mana.land_colors(self._card_definition(game_state, land_data["card"]).get("effect"))
+        if color is not None and color not in colors:
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: {self._card_name(game_state, land_data['card'])} can't make {color} mana")
             return False
         
         # Tap the land
         land_data["card"]["tapped"] = 1
+        self._changed_card(game_state, player, "lands", land_id_str)
         
-        # Parse effect to generate mana
-        effect = land_data["card"].get("effect", "")
-        
-        # Simple parsing for "tap? gen [color]"
-        if "gen" in effect:
-            colors = []
-            if "green" in effect:
-                colors.append("green")
-            if "blue" in effect:
-                colors.append("blue")
-            if "red" in effect:
-                colors.append("red")
-            
-            # For dual lands, choose first color (can be enhanced later)
-            if colors:
-                color = colors[0]
-                player_data[f"{color}_mana"] += 1
-                print(f"[{self._timestamp()}] {player} taps {land_data['card']['name']} for {color} → {color}_mana: {player_data[f'{color}_mana']}")
+        # Generate mana, dual lands default to their first color
+        if colors:
+            color = color or colors[0]
+            player_data[f"{color}_mana"] += 1
+            self._changed_field(game_state, player, f"{color}_mana")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] {player} taps {self._card_name(game_state, land_data['card'])} for {color} → {color}_mana: {player_data[f'{color}_mana']}")
         
         self._save_state(game_state)
         return True
@@ -394,43 +771,103 @@ class GameEngine:
         
         return total_mana >= total_needed
     
-    def pay_mana(self, player, generic, sp_mana):
-        """Deduct colored mana first, then generic from remaining."""
+    @rules_action
+    def pay_mana(self, player, generic, sp_mana, spend=None):
+        """
+        Deduct colored mana first, then generic from remaining.
+        spend ({color: amount}) says which colors pay the generic part,
+        otherwise green, then blue, then red.
+        """
         game_state = self._load_state()
         
         if player not in game_state:
             return False
         
         if not self.check_mana_cost(player, generic, sp_mana):
-            print(f"[{self._timestamp()}] Error: Not enough mana")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Not enough mana")
             return False
         
         player_data = game_state[player]
         
+        if spend is not None and (sum(spend.values()) != generic or any(
+                player_data.get(f"{color}_mana", 0) - (1 if color == sp_mana else 0) < amount
+                for color, amount in spend.items())):
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Can't pay {generic} generic with {spend}")
+            return False
+        
         # Pay specific mana first
         if sp_mana:
             player_data[f"{sp_mana}_mana"] -= 1
+            self._changed_field(game_state, player, f"{sp_mana}_mana")
         
         # Pay generic from remaining mana
         remaining = generic
         for color in ["green", "blue", "red"]:
             mana_key = f"{color}_mana"
             available = player_data.get(mana_key, 0)
-            to_pay = min(remaining, available)
-            player_data[mana_key] -= to_pay
+            to_pay = min(remaining, available) if spend is None else spend.get(color, 0)
+            if to_pay:
+                player_data[mana_key] -= to_pay
+                self._changed_field(game_state, player, mana_key)
             remaining -= to_pay
             if remaining == 0:
                 break
         
-        print(f"[{self._timestamp()}] Paid: {generic} generic + {sp_mana if sp_mana else 'none'}")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] Paid: {generic} generic + {sp_mana if sp_mana else 'none'}")
         
         self._save_state(game_state)
         return True
 
+    def castability(self, player=None):
+        """
+        Whether each card in player's hand (default the current player) can
+        be cast now, after tapping lands or not at all, and the fewest lands
+        to tap, from one read of the state. See mana.castability().
+        """
+        game_state = self._load_state()
+        if player is None:
+            player = game_state["current_player"]
+        return mana.castability(game_state, player)
+    
+    @rules_action
+    def auto_pay(self, player, card_ids):
+        """
+        Tap lands for and pay the costs of cards in player's hand, as
+        planned by modules/mana.py so every card gets its colors. Returns
+        the ManaPlan, or None (with nothing tapped) if they can't all be paid.
+        """
+        game_state = self._load_state()
+        
+        if player not in game_state:
+            return None
+        
+        card_ids = [str(card_id) for card_id in card_ids]
+        missing = [card_id for card_id in card_ids if card_id not in game_state[player]["hand"]]
+        if missing:
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Card IDs {', '.join(missing)} not in hand")
+            return None
+        
+        plan = mana.payment_plan(game_state, player, card_ids)
+        if plan is None:
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Not enough mana for {len(card_ids)} cards")
+            return None
+        
+        for land_id, color in plan.taps:
+            self.tap_land(player, land_id, color)
+        for generic, sp_mana, spend in plan.payments:
+            self.pay_mana(player, generic, sp_mana, spend)
+        return plan
+
     # ===================
     # COMBAT SYSTEM
     # ===================
     
+    @rules_action
     def declare_attackers(self, player, creature_ids):
         """
         Declare which creatures attack.
@@ -442,19 +879,22 @@ class GameEngine:
         game_state = self._load_state()
         
         if player not in game_state:
-            print(f"[{self._timestamp()}] Error: Player '{player}' not found")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Player '{player}' not found")
             return False
         
         player_data = game_state[player]
         attackers = []
         
-        print(f"[{self._timestamp()}] DECLARE ATTACKERS:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] DECLARE ATTACKERS:")
         
         for creature_id in creature_ids:
             creature_id_str = str(creature_id)
             
             if creature_id_str not in player_data["creatures"]:
-                print(f"  [{self._timestamp()}] Error: Creature ID {creature_id} not found")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] Error: Creature ID {creature_id} not found")
                 continue
             
             creature_data = player_data["creatures"][creature_id_str]
@@ -462,31 +902,37 @@ class GameEngine:
             
             # Check if tapped
             if card["tapped"] == 1:
-                print(f"  [{self._timestamp()}] Error: {card['name']} is already tapped")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] Error: {self._card_name(game_state, card)} is already tapped")
                 continue
             
             # Check summoning sickness
             if creature_data.get("summoning_sickness", False):
-                print(f"  [{self._timestamp()}] Error: {card['name']} has summoning sickness")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] Error: {self._card_name(game_state, card)} has summoning sickness")
                 continue
             
             # Valid attacker
             attackers.append(creature_id_str)
             
             # Check if vigilant (from status or effect)
-            has_vigilant = "vigilant" in card.get("status", "").lower() or "notap" in card.get("status", "").lower()
+            has_vigilant = is_vigilant(moves.card_keywords(game_state["definitions"], card))
             
             # Tap creature unless vigilant
             if not has_vigilant:
                 card["tapped"] = 1
-                print(f"  [{self._timestamp()}] {card['name']} attacks (tapped)")
+                self._changed_card(game_state, player, "creatures", creature_id_str)
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, card)} attacks (tapped)")
             else:
-                print(f"  [{self._timestamp()}] {card['name']} attacks (vigilant - stays untapped)")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, card)} attacks (vigilant - stays untapped)")
         
         # Store attackers in combat state
         game_state["combat"]["attackers"] = attackers
         
-        print(f"  [{self._timestamp()}] Total attackers: {len(attackers)}")
+        if self.logging:
+            self._log(f"  [{self._timestamp()}] Total attackers: {len(attackers)}")
         
         self._save_state(game_state)
         
@@ -496,6 +942,7 @@ class GameEngine:
         
         return True
     
+    @rules_action
     def declare_blockers(self, defender, block_assignments):
         """
         Declare which creatures block which attackers.
@@ -504,10 +951,12 @@ class GameEngine:
         game_state = self._load_state()
         
         if defender not in game_state:
-            print(f"[{self._timestamp()}] Error: Player '{defender}' not found")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] Error: Player '{defender}' not found")
             return False
         
-        print(f"[{self._timestamp()}] DECLARE BLOCKERS:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] DECLARE BLOCKERS:")
         
         defender_data = game_state[defender]
         blocks = {}
@@ -516,7 +965,8 @@ class GameEngine:
             attacker_id_str = str(attacker_id)
             
             if attacker_id_str not in game_state["combat"]["attackers"]:
-                print(f"  [{self._timestamp()}] Error: {attacker_id} is not attacking")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] Error: {attacker_id} is not attacking")
                 continue
             
             valid_blockers = []
@@ -525,18 +975,21 @@ class GameEngine:
                 blocker_id_str = str(blocker_id)
                 
                 if blocker_id_str not in defender_data["creatures"]:
-                    print(f"  [{self._timestamp()}] Error: Blocker {blocker_id} not found")
+                    if self.logging:
+                        self._log(f"  [{self._timestamp()}] Error: Blocker {blocker_id} not found")
                     continue
                 
                 # Use can_block() for validation (includes flying/reach/unblockable checks)
                 if not self.can_block(blocker_id_str, attacker_id_str):
                     blocker_data = defender_data["creatures"][blocker_id_str]
-                    print(f"  [{self._timestamp()}] Error: {blocker_data['card']['name']} cannot block (tapped/flying/unblockable)")
+                    if self.logging:
+                        self._log(f"  [{self._timestamp()}] Error: {self._card_name(game_state, blocker_data['card'])} cannot block (tapped/flying/unblockable)")
                     continue
                 
                 blocker_data = defender_data["creatures"][blocker_id_str]
                 valid_blockers.append(blocker_id_str)
-                print(f"  [{self._timestamp()}] {blocker_data['card']['name']} blocks attacker {attacker_id}")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, blocker_data['card'])} blocks attacker {attacker_id}")
             
             if valid_blockers:
                 blocks[attacker_id_str] = valid_blockers
@@ -581,6 +1034,34 @@ class GameEngine:
         
         return True
 
+    def legal_moves(self, decision=moves.MAIN, player=None, dedupe=True):
+        """
+        Generate the legal moves of a decision (moves.MAIN, ATTACK or BLOCK).
+        player defaults to the current player, or its opponent for BLOCK.
+        See modules/moves.py for the moves.
+        """
+        game_state = self._load_state()
+        if player is None:
+            current_player = game_state["current_player"]
+            if decision == moves.BLOCK:
+                player = self.player2 if current_player == self.player1 else self.player1
+            else:
+                player = current_player
+        return moves.legal_moves(game_state, decision, player, dedupe)
+
+    def suggest_blocks(self, defender=None, max_blockers=1):
+        """
+        Best blocks against the declared attackers by the combat evaluator
+        (modules/combat.py), as {attacker_id: [blocker_id, ...]}, and their
+        outcome (deaths, life loss, board value).
+        """
+        game_state = self._load_state()
+        if defender is None:
+            current_player = game_state["current_player"]
+            defender = self.player2 if current_player == self.player1 else self.player1
+        return combat.best_blocks(game_state, defender, max_blockers, zones=self._zones(game_state, defender))
+
+    @rules_action
     def calculate_combat_damage(self):
         """
         Build damage queue for all attackers and blockers.
@@ -589,7 +1070,8 @@ class GameEngine:
         game_state = self._load_state()
         damage_queue = []
         
-        print(f"[{self._timestamp()}] DAMAGE CALCULATION:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] DAMAGE CALCULATION:")
         
         # Get current and opposing players
         current_player = game_state["current_player"]
@@ -634,8 +1116,9 @@ class GameEngine:
                         "damage": blocker_power
                     })
                     
-                    print(f"  [{self._timestamp()}] {attacker_card['name']} deals {attacker_power} to {blocker_card['name']}")
-                    print(f"  [{self._timestamp()}] {blocker_card['name']} deals {blocker_power} to {attacker_card['name']}")
+                    if self.logging:
+                        self._log(f"  [{self._timestamp()}] {self._card_name(game_state, attacker_card)} deals {attacker_power} to {self._card_name(game_state, blocker_card)}")
+                        self._log(f"  [{self._timestamp()}] {self._card_name(game_state, blocker_card)} deals {blocker_power} to {self._card_name(game_state, attacker_card)}")
                 
                 else:
                     # Multiple blockers: attacker assigns damage, all blockers hit back
@@ -660,7 +1143,8 @@ class GameEngine:
                                 "damage": assigned_damage
                             })
                             remaining_damage -= assigned_damage
-                            print(f"  [{self._timestamp()}] {attacker_card['name']} assigns {assigned_damage} to {blocker_card['name']}")
+                            if self.logging:
+                                self._log(f"  [{self._timestamp()}] {self._card_name(game_state, attacker_card)} assigns {assigned_damage} to {self._card_name(game_state, blocker_card)}")
                         
                         # Blocker deals damage back to attacker
                         damage_queue.append({
@@ -671,7 +1155,8 @@ class GameEngine:
                             "target_player": current_player,
                             "damage": blocker_power
                         })
-                        print(f"  [{self._timestamp()}] {blocker_card['name']} deals {blocker_power} to {attacker_card['name']}")
+                        if self.logging:
+                            self._log(f"  [{self._timestamp()}] {self._card_name(game_state, blocker_card)} deals {blocker_power} to {self._card_name(game_state, attacker_card)}")
             
             else:
                 # Unblocked attacker: damage opponent directly
@@ -682,7 +1167,8 @@ class GameEngine:
                     "target_player": opponent,
                     "damage": attacker_power
                 })
-                print(f"  [{self._timestamp()}] {attacker_card['name']} deals {attacker_power} to {opponent} (unblocked)")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, attacker_card)} deals {attacker_power} to {opponent} (unblocked)")
         
         # Store damage queue
         game_state["combat"]["damage_queue"] = damage_queue
@@ -690,6 +1176,7 @@ class GameEngine:
         
         return True
 
+    @rules_action
     def resolve_damage_queue(self):
         """
         Apply ALL damage simultaneously from the damage queue.
@@ -699,10 +1186,12 @@ class GameEngine:
         damage_queue = game_state["combat"]["damage_queue"]
         
         if not damage_queue:
-            print(f"[{self._timestamp()}] No damage to resolve")
+            if self.logging:
+                self._log(f"[{self._timestamp()}] No damage to resolve")
             return True
         
-        print(f"[{self._timestamp()}] DAMAGE RESOLUTION:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] DAMAGE RESOLUTION:")
         
         # Apply all damage simultaneously
         for damage_entry in damage_queue:
@@ -713,8 +1202,10 @@ class GameEngine:
                 # Damage to player health
                 target_player = damage_entry["target_player"]
                 game_state[target_player]["health"] -= damage_amount
+                self._changed_field(game_state, target_player, "health")
                 new_health = game_state[target_player]["health"]
-                print(f"  [{self._timestamp()}] {target_player} takes {damage_amount} damage → Health: {new_health}")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {target_player} takes {damage_amount} damage → Health: {new_health}")
                 
             elif target_type == "creature":
                 # Damage to creature defence
@@ -727,9 +1218,11 @@ class GameEngine:
                     
                     old_defence = creature_card["defence"]
                     creature_card["defence"] -= damage_amount
+                    self._changed_card(game_state, target_player, "creatures", target_id)
                     new_defence = creature_card["defence"]
                     
-                    print(f"  [{self._timestamp()}] {creature_card['name']} takes {damage_amount} damage → Defence: {old_defence} → {new_defence}")
+                    if self.logging:
+                        self._log(f"  [{self._timestamp()}] {self._card_name(game_state, creature_card)} takes {damage_amount} damage → Defence: {old_defence} → {new_defence}")
         
         # Clear damage queue after resolution
         game_state["combat"]["damage_queue"] = []
@@ -742,6 +1235,7 @@ class GameEngine:
         
         return True
 
+    @rules_action
     def check_creature_deaths(self):
         """
         Move creatures with defence ≤ 0 to graveyard.
@@ -750,38 +1244,35 @@ class GameEngine:
         game_state = self._load_state()
         deaths = []
         
-        print(f"[{self._timestamp()}] STATE-BASED ACTIONS:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] STATE-BASED ACTIONS:")
         
         # Check all players for dead creatures
         for player in [self.player1, self.player2]:
             if player not in game_state:
                 continue
                 
-            player_data = game_state[player]
+            zones = self._zones(game_state, player)
             dead_creatures = []
             
-            for creature_id, creature_data in player_data["creatures"].items():
+            for creature_id, creature_data in zones.creatures.cards.items():
                 creature_card = creature_data["card"]
                 
                 if creature_card["defence"] <= 0:
                     dead_creatures.append(creature_id)
-                    deaths.append((player, creature_id, creature_card["name"]))
+                    deaths.append((player, creature_id, self._card_name(game_state, creature_card)))
             
             # Move dead creatures to graveyard
             for creature_id in dead_creatures:
-                creature_data = player_data["creatures"][creature_id]
-                creature_card = creature_data["card"]
-                
-                # Add to graveyard
-                player_data["graveyard"].append(creature_card)
-                
-                # Remove from battlefield
-                del player_data["creatures"][creature_id]
+                # Remove from battlefield and add to graveyard
+                creature_card = zones.creatures.remove(creature_id)["card"]
+                zones.graveyard.add(creature_card)
                 
-                print(f"  [{self._timestamp()}] {creature_card['name']} dies → {player}'s graveyard")
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, creature_card)} dies → {player}'s graveyard")
         
-        if not deaths:
-            print(f"  [{self._timestamp()}] No creatures died")
+        if self.logging and not deaths:
+            self._log(f"  [{self._timestamp()}] No creatures died")
         
         self._save_state(game_state)
         return deaths
@@ -815,20 +1306,9 @@ class GameEngine:
         if blocker_card["tapped"] == 1:
             return False
         
-        # Check unblockable
-        if "unblockable" in attacker_card.get("status", "").lower():
-            return False
-        
-        # Check flying/reach restrictions
-        attacker_has_flying = "flying" in attacker_card.get("status", "").lower()
-        blocker_has_flying = "flying" in blocker_card.get("status", "").lower()
-        blocker_has_reach = "reach" in blocker_card.get("status", "").lower()
-        
-        # Flying creatures can only be blocked by flying or reach
-        if attacker_has_flying and not (blocker_has_flying or blocker_has_reach):
-            return False
-        
-        return True
+        # Unblockable, and flying creatures can only be blocked by flying or reach
+        definitions = game_state["definitions"]
+        return can_block_keywords(moves.card_keywords(definitions, attacker_card), moves.card_keywords(definitions, blocker_card))
 
     def check_win_condition(self):
         """
@@ -846,15 +1326,17 @@ class GameEngine:
             # Check health
             if player_data["health"] <= 0:
                 opponent = self.player2 if player == self.player1 else self.player1
-                print(f"[{self._timestamp()}] GAME OVER: {player} reduced to {player_data['health']} health!")
-                print(f"[{self._timestamp()}] {opponent} wins!")
+                if self.logging:
+                    self._log(f"[{self._timestamp()}] GAME OVER: {player} reduced to {player_data['health']} health!")
+                    self._log(f"[{self._timestamp()}] {opponent} wins!")
                 return opponent
                 
             # Check empty deck (try to draw when deck is empty = lose)  
-            if len(player_data["deck"]) == 0:
+            if len(self._zones(game_state, player).deck) == 0:
                 opponent = self.player2 if player == self.player1 else self.player1
-                print(f"[{self._timestamp()}] GAME OVER: {player} tried to draw from empty deck!")
-                print(f"[{self._timestamp()}] {opponent} wins!")
+                if self.logging:
+                    self._log(f"[{self._timestamp()}] GAME OVER: {player} tried to draw from empty deck!")
+                    self._log(f"[{self._timestamp()}] {opponent} wins!")
                 return opponent
         
         return None
@@ -868,6 +1350,7 @@ class GameEngine:
         # This could be enhanced with interactive damage assignment
         return [str(bid) for bid in blocker_ids]
 
+    @rules_action
     def move_to_graveyard(self, player, card_id, from_zone):
         """
         Move card from battlefield/hand to graveyard.
@@ -877,27 +1360,16 @@ class GameEngine:
         if player not in game_state:
             return False
             
-        player_data = game_state[player]
+        zones = self._zones(game_state, player)
         card_id_str = str(card_id)
         
-        if from_zone == "battlefield" and card_id_str in player_data["creatures"]:
-            creature_data = player_data["creatures"][card_id_str]
-            card_dict = creature_data["card"]
-            
-            # Add to graveyard
-            player_data["graveyard"].append(card_dict)
-            
-            # Remove from battlefield
-            del player_data["creatures"][card_id_str]
-            
-        elif from_zone == "hand" and card_id_str in player_data["hand"]:
-            card_dict = player_data["hand"][card_id_str] 
-            
-            # Add to graveyard
-            player_data["graveyard"].append(card_dict)
+        if from_zone == "battlefield" and card_id_str in zones.creatures:
+            # Remove from battlefield and add to graveyard
+            zones.graveyard.add(zones.creatures.remove(card_id_str)["card"])
             
-            # Remove from hand
-            del player_data["hand"][card_id_str]
+        elif from_zone == "hand" and card_id_str in zones.hand:
+            # Remove from hand and add to graveyard
+            zones.graveyard.add(zones.hand.remove(card_id_str))
         
         else:
             return False
@@ -914,15 +1386,8 @@ class GameEngine:
         
         if player not in game_state:
             return 0
-            
-        player_data = game_state[player]
-        count = 0
         
-        for card_dict in player_data["graveyard"]:
-            if card_dict.get("name") == card_name:
-                count += 1
-                
-        return count
+        return self._zones(game_state, player).graveyard.count(card_name)
 
     def check_enter_triggers(self, entering_player, entering_card_id):
         """
@@ -931,7 +1396,8 @@ class GameEngine:
         """
         game_state = self._load_state()
         
-        print(f"[{self._timestamp()}] ENTER TRIGGERS:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] ENTER TRIGGERS:")
         
         triggers_fired = False
         
@@ -940,26 +1406,26 @@ class GameEngine:
             if player not in game_state:
                 continue
                 
-            player_data = game_state[player]
+            creatures = self._zones(game_state, player).creatures
             
-            for creature_id, creature_data in player_data["creatures"].items():
-                creature_card = creature_data["card"]
-                effect = creature_card.get("effect", "")
+            # Only creatures subscribed to enter? are visited
+            for creature_id in creatures.subscribed("enter?"):
+                # Don't trigger on self (creature entering doesn't trigger itself)
+                if player == entering_player and creature_id == str(entering_card_id):
+                    continue
                 
-                # Check if this creature has enter? trigger
-                if "enter?" in effect:
-                    # Don't trigger on self (creature entering doesn't trigger itself)
-                    if player == entering_player and creature_id == str(entering_card_id):
-                        continue
-                        
-                    triggers_fired = True
-                    print(f"  [{self._timestamp()}] {creature_card['name']} triggers (enter?)")
-                    
-                    # Execute the enter? effect on this creature
-                    self._execute_trigger_effect(player, creature_id, effect, "enter?")
+                creature_card = creatures.get(creature_id)["card"]
+                effect = self._card_definition(game_state, creature_card).get("effect", "")
+                
+                triggers_fired = True
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, creature_card)} triggers (enter?)")
+                
+                # Execute the enter? effect on this creature
+                self._execute_trigger_effect(player, creature_id, effect, "enter?")
         
-        if not triggers_fired:
-            print(f"  [{self._timestamp()}] No enter? triggers")
+        if self.logging and not triggers_fired:
+            self._log(f"  [{self._timestamp()}] No enter? triggers")
         
         # Note: _execute_trigger_effect handles its own _save_state calls
         return True
@@ -970,28 +1436,31 @@ class GameEngine:
         """
         game_state = self._load_state()
         
-        print(f"[{self._timestamp()}] ATTACK TRIGGERS:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] ATTACK TRIGGERS:")
         
         triggers_fired = False
         
+        creatures = self._zones(game_state, attacking_player).creatures
+        subscribed = creatures.subscribers.get("attack?", {})
+        
         for attacker_id in attacker_ids:
             attacker_id_str = str(attacker_id)
             
-            if attacker_id_str in game_state[attacking_player]["creatures"]:
-                creature_data = game_state[attacking_player]["creatures"][attacker_id_str]
-                creature_card = creature_data["card"]
-                effect = creature_card.get("effect", "")
+            # Only creatures subscribed to attack? can trigger
+            if attacker_id_str in subscribed:
+                creature_card = creatures.get(attacker_id_str)["card"]
+                effect = self._card_definition(game_state, creature_card).get("effect", "")
                 
-                # Check if this creature has attack? trigger
-                if "attack?" in effect:
-                    triggers_fired = True
-                    print(f"  [{self._timestamp()}] {creature_card['name']} triggers (attack?)")
-                    
-                    # Execute the attack? effect on this creature
-                    self._execute_trigger_effect(attacking_player, attacker_id_str, effect, "attack?")
+                triggers_fired = True
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, creature_card)} triggers (attack?)")
+                
+                # Execute the attack? effect on this creature
+                self._execute_trigger_effect(attacking_player, attacker_id_str, effect, "attack?")
         
-        if not triggers_fired:
-            print(f"  [{self._timestamp()}] No attack? triggers")
+        if self.logging and not triggers_fired:
+            self._log(f"  [{self._timestamp()}] No attack? triggers")
         
         # Note: _execute_trigger_effect handles its own _save_state calls
         return True
@@ -1002,28 +1471,31 @@ class GameEngine:
         """
         game_state = self._load_state()
         
-        print(f"[{self._timestamp()}] BLOCK TRIGGERS:")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] BLOCK TRIGGERS:")
         
         triggers_fired = False
         
+        creatures = self._zones(game_state, blocking_player).creatures
+        subscribed = creatures.subscribers.get("block?", {})
+        
         for blocker_id in blocker_ids:
             blocker_id_str = str(blocker_id)
             
-            if blocker_id_str in game_state[blocking_player]["creatures"]:
-                creature_data = game_state[blocking_player]["creatures"][blocker_id_str]
-                creature_card = creature_data["card"]
-                effect = creature_card.get("effect", "")
+            # Only creatures subscribed to block? can trigger
+            if blocker_id_str in subscribed:
+                creature_card = creatures.get(blocker_id_str)["card"]
+                effect = self._card_definition(game_state, creature_card).get("effect", "")
                 
-                # Check if this creature has block? trigger
-                if "block?" in effect:
-                    triggers_fired = True
-                    print(f"  [{self._timestamp()}] {creature_card['name']} triggers (block?)")
-                    
-                    # Execute the block? effect on this creature
-                    self._execute_trigger_effect(blocking_player, blocker_id_str, effect, "block?")
+                triggers_fired = True
+                if self.logging:
+                    self._log(f"  [{self._timestamp()}] {self._card_name(game_state, creature_card)} triggers (block?)")
+                
+                # Execute the block? effect on this creature
+                self._execute_trigger_effect(blocking_player, blocker_id_str, effect, "block?")
         
-        if not triggers_fired:
-            print(f"  [{self._timestamp()}] No block? triggers")
+        if self.logging and not triggers_fired:
+            self._log(f"  [{self._timestamp()}] No block? triggers")
         
         # Note: _execute_trigger_effect handles its own _save_state calls
         return True
@@ -1031,96 +1503,68 @@ class GameEngine:
     def _execute_trigger_effect(self, player, creature_id, effect_string, trigger_type):
         """
         Execute a specific trigger effect on a creature.
-        Parses and applies effects like 'attack? inc att 2; dec end 1'.
+        Runs the compiled opcodes of effects like 'attack? inc att 2; dec end 1'.
         """
-        from .modules.parser import EffectParser
-        from .modules.utils import execute_card
-        
         game_state = self._load_state()
         
         if player not in game_state or creature_id not in game_state[player]["creatures"]:
             return False
         
-        creature_data = game_state[player]["creatures"][creature_id]
-        creature_card = creature_data["card"]
+        creature_card = game_state[player]["creatures"][creature_id]["card"]
         
-        # Parse the effect to find the specific trigger
-        parser = EffectParser()
-        parsed_effects = parser.parse(effect_string)
+        # Compiled once per effect string, grouped follow-up effects included
+        ops = effect_cache.get(effect_string).program.for_trigger(trigger_type)
         
-        # Find and execute the matching trigger
-        for effect in parsed_effects:
-            trigger_without_question = trigger_type.replace("?", "")
-            effect_trigger = effect.get("trigger")
-            
-            # Match both "enter?" and "enter" formats
-            if effect_trigger == trigger_type or effect_trigger == trigger_without_question:
-                print(f"    [{self._timestamp()}] Executing: {effect}")
-                
-                # Apply the effect to the creature
-                if effect["action"] == "inc":
-                    field = effect["field"]
-                    value = effect["value"]
-                    
-                    # Map parser field names to card field names
-                    field_mapping = {"att": "attack", "end": "defence"}
-                    card_field = field_mapping.get(field, field)
-                    
-                    if card_field in creature_card:
-                        old_value = creature_card[card_field]
-                        creature_card[card_field] += value
-                        new_value = creature_card[card_field]
-                        print(f"    [{self._timestamp()}] {creature_card['name']} {card_field}: {old_value} → {new_value}")
-                
-                elif effect["action"] == "dec":
-                    field = effect["field"]
-                    value = effect["value"]
-                    
-                    # Map parser field names to card field names
-                    field_mapping = {"att": "attack", "end": "defence"}
-                    card_field = field_mapping.get(field, field)
-                    
-                    if card_field in creature_card:
-                        old_value = creature_card[card_field]
-                        creature_card[card_field] -= value
-                        new_value = creature_card[card_field]
-                        print(f"    [{self._timestamp()}] {creature_card['name']} {card_field}: {old_value} → {new_value}")
-        
-        # For grouped effects like "enter? inc att 1; inc end 1", the parser may split them
-        # Look for follow-up effects without triggers that should be part of the same group
-        last_trigger = None
-        for effect in parsed_effects:
-            if effect.get("trigger"):
-                last_trigger = effect.get("trigger")
-            elif last_trigger == trigger_type and not effect.get("trigger"):
-                # This is a continuation of the previous trigger
-                print(f"    [{self._timestamp()}] Executing grouped effect: {effect}")
-                
-                if effect["action"] == "inc":
-                    field = effect["field"]
-                    value = effect["value"]
-                    
-                    # Map parser field names to card field names
-                    field_mapping = {"att": "attack", "end": "defence"}
-                    card_field = field_mapping.get(field, field)
-                    
-                    if card_field in creature_card:
-                        old_value = creature_card[card_field]
-                        creature_card[card_field] += value
-                        new_value = creature_card[card_field]
-                        print(f"    [{self._timestamp()}] {creature_card['name']} {card_field}: {old_value} → {new_value}")
+        def trace(op, old_value, new_value):
+            self._log(f"    [{self._timestamp()}] {op[3]}")
+            if old_value is not None:
+                self._log(f"    [{self._timestamp()}] {self._card_name(game_state, creature_card)} {op[1]}: {old_value} → {new_value}")
+        
+        # Only traced when logging, the opcodes run untraced otherwise
+        run_effect(ops, creature_card, self._zones(game_state, player), trace if self.logging else None)
+        self._changed_card(game_state, player, "creatures", creature_id)
         
         # Save the modified creature stats
         self._save_state(game_state)
         
         return True
 
-    def _reconstruct_card(self, card_dict):
-        """Reconstruct a card object from a dictionary."""
+    def _reconstruct_card(self, card_dict, definitions=None):
+        """Reconstruct a card object from a dictionary (or a card record and its definition)."""
+        if definitions is not None and card_dict.get("def_id") in definitions:
+            prototype = self._prototype(definitions, card_dict["def_id"])
+        else:
+            prototype = self._build_card(card_dict)
+        if prototype is None:
+            return None
+        
+        # Restore state on a fresh copy, the prototype itself is never handed out
+        card = prototype.instantiate()
+        card.id = card_dict.get("id")
+        card.tapped = card_dict.get("tapped", 0)
+        card.status = card_dict.get("status", "")
+        if isinstance(card, SummonCard):
+            card.attack = card_dict.get("attack", card.attack)
+            card.defence = card_dict.get("defence", card.defence)
+        return card
+    
+    def _prototype(self, definitions, def_id):
+        """Cached card built from a definition, shared by every copy of it in this game."""
+        # A reloaded state brings a new definitions dict, so start a new cache
+        if self._prototype_source is not definitions:
+            self._prototype_source = definitions
+            self._prototypes = {}
+        prototype = self._prototypes.get(def_id)
+        if prototype is None:
+            prototype = self._prototypes[def_id] = self._build_card(definitions[def_id])
+        return prototype
+    
+    def _build_card(self, card_dict):
+        """Build a card object from the shared fields of a card dict."""
         card_type = card_dict.get("type")
         
         if card_type == "Creature":
-            card = SummonCard(
+            return SummonCard(
                 name=card_dict.get("name"),
                 generic_mana=card_dict.get("generic_mana"),
                 sp_mana=card_dict.get("sp_mana"),
@@ -1129,47 +1573,45 @@ class GameEngine:
                 end=card_dict.get("defence"),
                 effect=card_dict.get("effect")
             )
-            # Restore state
-            card.id = card_dict.get("id")
-            card.tapped = card_dict.get("tapped", 0)
-            card.status = card_dict.get("status", "")
-            return card
             
         elif card_type == "Land":
-            card = LandCards(
+            return LandCards(
                 name=card_dict.get("name"),
                 generic_mana=card_dict.get("generic_mana"),
                 sp_mana=card_dict.get("sp_mana"),
                 description=card_dict.get("description"),
                 effect=card_dict.get("effect")
             )
-            # Restore state
-            card.id = card_dict.get("id")
-            card.tapped = card_dict.get("tapped", 0)
-            card.status = card_dict.get("status", "")
-            return card
             
         elif card_type == "Spell":
-            card = SpellCard(
+            return SpellCard(
                 name=card_dict.get("name"),
                 generic_mana=card_dict.get("generic_mana"),
                 sp_mana=card_dict.get("sp_mana"),
                 description=card_dict.get("description"),
                 effect=card_dict.get("effect")
             )
-            # Restore state  
-            card.id = card_dict.get("id")
-            card.tapped = card_dict.get("tapped", 0)
-            card.status = card_dict.get("status", "")
-            return card
         
         else:
-            print(f"Unknown card type: {card_type}")
+            if self.logging:
+                self._log(f"Unknown card type: {card_type}")
             return None
 
     def get_game_state(self):
         """Get the current game state with proper formatting for CLI."""
-        game_state = self._load_state()
+        live_state = self._load_state()
+        self._flush_zones()
+        definitions = live_state.get("definitions", {})
+        
+        # Copy with every card record expanded to a full card dict,
+        # so the CLI-only fields and edits don't touch the live state
+        game_state = {}
+        for key, value in live_state.items():
+            if key == "definitions":
+                continue
+            if key in (self.player1, self.player2) and isinstance(value, dict):
+                value = self._expand_player(definitions, value)
+            game_state[key] = value
         
         # Add active_player field for CLI compatibility
         if 'active_player' not in game_state:
@@ -1185,32 +1627,55 @@ class GameEngine:
             game_state['turn'] = game_state.get('turn_number', 1)
             
         return game_state
+    
+    def _expand_player(self, definitions, player_data):
+        """Copy of a player's zones with full card dicts instead of records."""
+        player_view = dict(player_data)
+        player_view["deck"] = [self._expand_card(definitions, c) for c in player_data["deck"]]
+        player_view["hand"] = {cid: self._expand_card(definitions, c) for cid, c in player_data["hand"].items()}
+        player_view["graveyard"] = [self._expand_card(definitions, c) for c in player_data["graveyard"]]
+        for zone in ("creatures", "lands"):
+            player_view[zone] = {
+                cid: dict(entry, card=self._expand_card(definitions, entry["card"]))
+                for cid, entry in player_data[zone].items()
+            }
+        return player_view
+    
+    def set_game_state(self, game_state):
+        """Replace the game state with an edited copy returned by get_game_state()."""
+        live_state = self._load_state()
+        
+        new_state = {"definitions": live_state.get("definitions", {})}
+        for key, value in game_state.items():
+            # CLI-only fields are recomputed by get_game_state()
+            if key not in ("active_player", "turn"):
+                new_state[key] = value
+        
+        self._save_state(self._compact_state(new_state))
 
     def ready(self):
         """Prepares the game state and variables for the next game."""
         # resets the .json file to an empty JSON object
-        ts = time.time()
-        timestamp = datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
-        print(f"[{timestamp}] Game setup begins")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] Game setup begins")
         
-        # Create the db directory if it doesn't exist
-        os.makedirs(os.path.dirname(self.game_file), exist_ok=True)
-        
-        with open(self.game_file, "w") as f:
-            json.dump({}, f)
+        # every deck entry gets its own copy, so repeated cards (e.g. pool * 2) get distinct IDs
+        self.deck1 = [card.instantiate() for card in self.deck1]
+        self.deck2 = [card.instantiate() for card in self.deck2]
         
         # assign unique IDs to each card copy
         self.assign_card_ids(self.deck1)
         self.assign_card_ids(self.deck2)
         
         # shuffle
-        self.deck1 = self.shuffle_deck(self.deck1)
-        self.deck2 = self.shuffle_deck(self.deck2)
-        timestamp = datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
-        print(f"[{timestamp}] Deck created and shuffled")
+        self.shuffle_deck(self.deck1)
+        self.shuffle_deck(self.deck2)
+        if self.logging:
+            self._log(f"[{self._timestamp()}] Deck created and shuffled")
         
+        definitions = {}
         player1_data = {
-                "deck": [card.to_dict() for card in self.deck1],
+                "deck": [self._card_record(definitions, card) for card in self.deck1],
                 "hand": {},
                 "graveyard": [],
                 "health": 20,
@@ -1223,7 +1688,7 @@ class GameEngine:
         }
 
         player2_data = {
-                "deck": [card.to_dict() for card in self.deck2],
+                "deck": [self._card_record(definitions, card) for card in self.deck2],
                 "hand": {},
                 "graveyard": [],
                 "health": 20,
@@ -1236,6 +1701,7 @@ class GameEngine:
         }
 
         game_state = {
+            "definitions": definitions,
             self.player1: player1_data,
             self.player2: player2_data,
             "battlefield": self.battlefield,
@@ -1250,9 +1716,10 @@ class GameEngine:
             }
         }
 
+        self._save_rng(game_state)
+
         # create battlefield
-        with open(self.game_file, "w") as f:
-            json.dump(game_state, f, indent=4)
+        self.session.reset(game_state)
 
-        timestamp = datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
-        print(f"[{timestamp}] Game battlefield created")
+        if self.logging:
+            self._log(f"[{self._timestamp()}] Game battlefield created")
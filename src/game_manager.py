@@ -0,0 +1,213 @@
+if __package__:
+    from .game import GameEngine
+    from .modules.storage import DEFAULT_FILES, STORES, JSONFileStore, make_store
+else:
+    from game import GameEngine
+    from modules.storage import DEFAULT_FILES, STORES, JSONFileStore, make_store
+
+from collections import OrderedDict
+import functools
+import json
+import os
+import re
+import threading
+import time
+
+
+class GameManager:
+    """
+    Hosts many games in one process.
+
+    Every game gets its own state store under root (one file per game id
+    by default) and its own GameEngine. Only max_games engines are kept
+    in memory: the least recently used game is committed and evicted
+    when the limit is reached, and games idle for longer than ttl
+    seconds are evicted too. An evicted game is reloaded from its store
+    the next time it is looked up.
+    """
+
+    GAME_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+    def __init__(self, root=None, max_games=1000, ttl=None, store_factory=None, durable=False, suffix=None):
+        if root is None:
+            src_dir = os.path.dirname(os.path.abspath(__file__))
+            project_root = os.path.dirname(src_dir)
+            root = os.path.join(project_root, "db", "games")
+        os.makedirs(root, exist_ok=True)
+
+        self.root = root
+        self.max_games = max_games
+        self.ttl = ttl
+        self.durable = durable
+        # A callable taking a state path, or the name of a store in storage.STORES.
+        # State files take the extension of the store's default file unless suffix is given
+        if isinstance(store_factory, str):
+            if store_factory not in STORES:
+                raise ValueError(f"Unknown store {store_factory!r}, choose from {sorted(STORES)}")
+            suffix = suffix or os.path.splitext(DEFAULT_FILES[store_factory])[1]
+            store_factory = functools.partial(make_store, store_factory)
+        self.store_factory = store_factory or JSONFileStore
+        self.suffix = suffix or ".json"
+
+        # game_id -> [engine, last_used], least recently used first
+        self._games = OrderedDict()
+        # game_id -> [player1, player2] for every hosted game, loaded or not
+        self._index_file = os.path.join(root, "games.jsonl")
+        self._players = self._load_index()
+        self._lock = threading.RLock()
+
+    # ===================
+    # INDEX
+    # ===================
+
+    def _load_index(self):
+        """Replay the append-only index of created and removed games."""
+        players = {}
+        if not os.path.exists(self._index_file):
+            return players
+        with open(self._index_file, "r") as f:
+            for line in f:
+                try:
+                    game_id, names = json.loads(line)
+                except ValueError:
+                    break
+                if names is None:
+                    players.pop(game_id, None)
+                else:
+                    players[game_id] = names
+        return players
+
+    def _write_index(self, game_id, names):
+        with open(self._index_file, "a") as f:
+            f.write(json.dumps([game_id, names]) + "\n")
+
+    def store_path(self, game_id):
+        """Path of the state file for a game id."""
+        if not isinstance(game_id, str) or not self.GAME_ID.match(game_id):
+            raise ValueError(f"Invalid game id {game_id!r} (use letters, digits, '-' and '_')")
+        return os.path.join(self.root, game_id + self.suffix)
+
+    def _engine(self, game_id, player1, player2, deck1, deck2, seed=None):
+        store = self.store_factory(self.store_path(game_id))
+        return GameEngine(player1, player2, deck1, deck2, durable=self.durable, store=store, seed=seed)
+
+    # ===================
+    # GAMES
+    # ===================
+
+    def create_game(self, game_id, player1, player2, deck1, deck2, seed=None):
+        """
+        Create, set up and register a new game. Returns its engine.
+        seed makes the shuffles reproducible (a fresh one is picked otherwise).
+        """
+        with self._lock:
+            if game_id in self._players:
+                raise ValueError(f"Game '{game_id}' already exists")
+
+            engine = self._engine(game_id, player1, player2, deck1, deck2, seed)
+            engine.ready()
+
+            self._players[game_id] = [player1, player2]
+            self._write_index(game_id, [player1, player2])
+            self._games[game_id] = [engine, time.monotonic()]
+            self._enforce_limits()
+            return engine
+
+    def get_game(self, game_id):
+        """Return the engine for a game, reloading it from its store if it was evicted."""
+        with self._lock:
+            now = time.monotonic()
+            entry = self._games.get(game_id)
+
+            if entry is not None:
+                entry[1] = now
+                self._games.move_to_end(game_id)
+                self.evict_idle(now)
+                return entry[0]
+
+            if game_id not in self._players:
+                raise KeyError(f"Game '{game_id}' not found")
+
+            player1, player2 = self._players[game_id]
+            engine = self._engine(game_id, player1, player2, [], [])
+            self._games[game_id] = [engine, now]
+            self._enforce_limits()
+            return engine
+
+    def __getitem__(self, game_id):
+        return self.get_game(game_id)
+
+    def __contains__(self, game_id):
+        return game_id in self._players
+
+    def __len__(self):
+        return len(self._players)
+
+    def loaded_games(self):
+        """Ids of the games currently held in memory, least recently used first."""
+        return list(self._games)
+
+    def evict(self, game_id):
+        """Write a game to its store and drop it from memory. Returns True if it was loaded."""
+        with self._lock:
+            entry = self._games.pop(game_id, None)
+            if entry is None:
+                return False
+
+            engine = entry[0]
+            engine.commit()
+            close = getattr(engine.session.store, "close", None)
+            if close is not None:
+                close()
+            return True
+
+    def evict_idle(self, now=None):
+        """Evict games that haven't been used for ttl seconds. Returns the evicted ids."""
+        if self.ttl is None:
+            return []
+
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            expired = []
+            # Ordered by last use, so stop at the first game that's still fresh
+            for game_id, (_, last_used) in self._games.items():
+                if now - last_used < self.ttl:
+                    break
+                expired.append(game_id)
+            for game_id in expired:
+                self.evict(game_id)
+            return expired
+
+    def _enforce_limits(self):
+        self.evict_idle()
+        while len(self._games) > self.max_games:
+            self.evict(next(iter(self._games)))
+
+    def remove_game(self, game_id):
+        """Forget a game and delete its stored state."""
+        with self._lock:
+            self.evict(game_id)
+            if self._players.pop(game_id, None) is None:
+                return False
+            self._write_index(game_id, None)
+
+            path = self.store_path(game_id)
+            for suffix in ("", ".journal", ".tmp", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            return True
+
+    def commit_all(self):
+        """Write every loaded game to its store."""
+        with self._lock:
+            for engine, _ in self._games.values():
+                engine.commit()
+
+    def close(self):
+        """Commit and evict every loaded game."""
+        with self._lock:
+            for game_id in list(self._games):
+                self.evict(game_id)
+
+    def __repr__(self):
+        return f"GameManager({self.root!r}, {len(self._games)}/{len(self._players)} loaded)"
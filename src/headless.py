@@ -0,0 +1,275 @@
+"""
+Headless games for self-play and balance studies.
+
+HeadlessGame plays by the same rules as GameEngine (it is one), but the
+state only lives in memory (MemoryStore) and log lines are dropped.
+Shuffles and agents draw from the game's seeded RNG, so a game is
+reproducible from its seed and nothing touches the filesystem or the
+terminal. The decisions
+are made by the agents in the two seats (see modules.ai).
+
+    game = HeadlessGame(deck1, deck2, seed=7, agents=("greedy", "random"))
+    winner = game.play_game()
+
+run_games() plays many games in this process and reports games/sec and
+actions/sec, selfplay.run_batch() spreads them over worker processes.
+"""
+if __package__:
+    from .game import GameEngine
+    from .modules.storage import MemoryStore, GameSession
+    from .modules.ai import make_agent
+    from .modules.moves import MAIN, ATTACK, BLOCK
+else:
+    from game import GameEngine
+    from modules.storage import MemoryStore, GameSession
+    from modules.ai import make_agent
+    from modules.moves import MAIN, ATTACK, BLOCK
+
+import random
+import time
+
+
+STARTING_HEALTH = 20
+OPENING_HAND = 7
+MAX_TURNS = 200
+
+
+def clone_state(game_state, players):
+    """
+    Copy of a game state deep enough for the engine to play on. Records in
+    the deck, hand and graveyard are never changed in place and are
+    shared, battlefield entries and their records are copied.
+    """
+    clone = dict(game_state)
+    for player in players:
+        data = dict(game_state[player])
+        data["deck"] = list(data["deck"])
+        data["hand"] = dict(data["hand"])
+        data["graveyard"] = list(data["graveyard"])
+        data["queue"] = dict(data["queue"])
+        for zone in ("creatures", "lands"):
+            data[zone] = {card_id: dict(entry, card=dict(entry["card"])) for card_id, entry in data[zone].items()}
+        clone[player] = data
+    combat = game_state["combat"]
+    clone["combat"] = {
+        "attackers": list(combat["attackers"]),
+        "blocks": dict(combat["blocks"]),
+        "damage_queue": list(combat["damage_queue"])
+    }
+    return clone
+
+
+class HeadlessGame(GameEngine):
+    """In-memory, silent, seeded game that can play itself."""
+
+    logging = False
+
+    def __init__(self, deck1, deck2, seed=None, player1="P1", player2="P2", agents=("greedy", "greedy")):
+        super().__init__(player1, player2, list(deck1), list(deck2), store=MemoryStore(), seed=seed)
+        self.agents = {player1: make_agent(agents[0]), player2: make_agent(agents[1])}
+        self.winner = None
+        self.turns = 0
+        self.max_turns = MAX_TURNS
+        # Pending (MAIN/ATTACK/BLOCK, player) decision, None when the game is over
+        self.decision = None
+        self.cards_played = {player1: 0, player2: 0}
+        # Clones made without an rng, each gets its own seed
+        self.clones = 0
+
+    @property
+    def actions(self):
+        """Rules actions run so far."""
+        return self.session.actions
+
+    # ===================
+    # AGENT VIEW
+    # ===================
+
+    @property
+    def state(self):
+        """The live game state (card records, see definition())."""
+        return self._load_state()
+
+    def zones(self, player):
+        """Zone views over a player's part of the state."""
+        return self._zones(self._load_state(), player)
+
+    def definition(self, card):
+        """Definition (name, costs, type, effect, ...) of a card record."""
+        return self._card_definition(self._load_state(), card)
+
+    def opponent(self, player):
+        return self.player2 if player == self.player1 else self.player1
+
+    def play_land(self, player, card_id):
+        played = super().play_land(player, card_id)
+        if played:
+            self.cards_played[player] += 1
+        return played
+
+    def play_creature(self, player, card_id):
+        played = super().play_creature(player, card_id)
+        if played:
+            self.cards_played[player] += 1
+        return played
+
+    # ===================
+    # SELF-PLAY
+    # ===================
+
+    def setup(self, hand_size=OPENING_HAND, max_turns=MAX_TURNS):
+        """Shuffle, deal opening hands and begin the first turn."""
+        self.max_turns = max_turns
+        self.ready()
+        for _ in range(hand_size):
+            self.draw_card(self.player1)
+            self.draw_card(self.player2)
+        self.decision = self.begin_turn(self.player1)
+
+    def play_game(self, max_turns=MAX_TURNS, hand_size=OPENING_HAND):
+        """
+        Set up and play a whole game, each player using the agent in its seat.
+        Returns the winner, or None if nobody won within max_turns.
+        """
+        self.setup(hand_size, max_turns)
+        return self.play_out()
+
+    def play_out(self, agents=None):
+        """
+        Play from the pending decision to the end of the game, with the
+        seat agents or agents ({player: agent}). Returns the winner.
+        """
+        agents = agents or self.agents
+        while self.decision is not None:
+            kind, player = self.decision
+            agent = agents[player]
+            if kind == MAIN:
+                agent.main_phase(self, player)
+                self.decision = self.end_main(player)
+            elif kind == ATTACK:
+                self.decision = self.attack(player, agent.choose_attackers(self, player))
+            else:
+                self.decision = self.block(player, agent.choose_blocks(self, player))
+        return self.winner
+
+    # Every step below returns the next decision, (MAIN/ATTACK/BLOCK, player)
+    # or None once the game is over
+
+    def begin_turn(self, player):
+        """Start, untap and draw steps of player's turn."""
+        self.turns += 1
+        self.start_turn(player)
+        self.untap_step(player)
+        self.draw_step(player)
+        self.winner = self.check_win_condition()
+        if self.winner is not None:
+            return None
+        return (MAIN, player)
+
+    def end_main(self, player):
+        """Main phase done, player decides on attackers next."""
+        return (ATTACK, player)
+
+    def attack(self, player, attackers):
+        """Declare attackers, the defender decides on blocks next (no attack ends the turn)."""
+        if not attackers:
+            return self.finish_turn(player)
+        self.declare_attackers(player, attackers)
+        return (BLOCK, self.opponent(player))
+
+    def block(self, defender, blocks):
+        """Declare blocks, deal combat damage and end the attacker's turn."""
+        self.declare_blockers(defender, blocks)
+        self.calculate_combat_damage()
+        self.resolve_damage_queue()
+        self.winner = self.check_win_condition()
+        return self.finish_turn(self.opponent(defender))
+
+    def finish_turn(self, player):
+        """End player's turn and begin the opponent's, unless the game is over."""
+        self.end_turn(player)
+        if self.winner is not None or self.turns >= self.max_turns:
+            return None
+        return self.begin_turn(self.opponent(player))
+
+    # ===================
+    # CLONES
+    # ===================
+
+    def clone(self, rng=None, agents=None):
+        """
+        Independent copy of the game for search and playouts. Card
+        definitions, prototypes and decks are shared, the zones and
+        everything the rules actions change are copied.
+        """
+        self._flush_zones()
+        game = object.__new__(self.__class__)
+        game.__dict__.update(self.__dict__)
+
+        game.session = GameSession(MemoryStore(), durable=False)
+        game.session.replayer = game._replay
+        game.session.before_commit = game._flush_zones
+        game.session.reset(clone_state(self._load_state(), (self.player1, self.player2)))
+        game._zone_cache = {}
+        game._zone_source = None
+        game._watchers = None
+        game._watch_source = None
+        if rng is None:
+            # Seeded from a copy of our generator and the clone number: cloning doesn't
+            # change this game's random draws, and every clone still draws differently
+            self.clones += 1
+            parent = random.Random()
+            parent.setstate(self.rng.getstate())
+            rng = random.Random(f"{parent.getrandbits(64)}:{self.clones}")
+        game.rng = rng
+        game.clones = 0
+        game.agents = agents or self.agents
+        game.cards_played = dict(self.cards_played)
+        return game
+
+    def result(self):
+        """Summary of the game: winner, turns, and per player damage dealt and cards played."""
+        state = self._load_state()
+        players = (self.player1, self.player2)
+        return {
+            "seed": self.seed,
+            "winner": self.winner,
+            "turns": self.turns,
+            "actions": self.actions,
+            # Nothing heals yet, so a player's lost health is the damage dealt to it
+            "damage": {player: STARTING_HEALTH - state[self.opponent(player)]["health"] for player in players},
+            "cards_played": dict(self.cards_played)
+        }
+
+
+# ===================
+# BATCHES
+# ===================
+
+def run_games(deck1, deck2, games=100, seed=0, max_turns=MAX_TURNS, agents=("greedy", "greedy")):
+    """
+    Play a number of headless games between deck1 and deck2, game i seeded with seed + i.
+    Returns win counts and throughput (games/sec, actions/sec).
+    """
+    wins = {}
+    actions = 0
+    turns = 0
+
+    start = time.perf_counter()
+    for i in range(games):
+        game = HeadlessGame(deck1, deck2, seed=seed + i, agents=agents)
+        winner = game.play_game(max_turns)
+        wins[winner] = wins.get(winner, 0) + 1
+        actions += game.actions
+        turns += game.turns
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "wins": wins,
+        "turns": turns,
+        "actions": actions,
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed if elapsed else 0.0,
+        "actions_per_sec": actions / elapsed if elapsed else 0.0
+    }
@@ -0,0 +1,450 @@
+"""
+Agents that make a player's decisions in headless games.
+
+HeadlessGame asks the agent in each seat for every choice of a turn:
+
+    main_phase(game, player)         play lands and cast creatures through the rules actions
+    choose_attackers(game, player)   ids of the creatures to attack with
+    choose_blocks(game, defender)    {attacker_id: [blocker_id, ...]} against the current attackers
+
+Agents only read the game through game.state / game.zones() /
+game.definition() and only change it through the engine's rules actions,
+so every agent plays by the same rules. Randomness comes from game.rng,
+which keeps seeded games reproducible.
+
+Agents are picked by name (see AGENTS) so batch runs can name them in
+worker processes.
+
+MCTSAgent searches instead of following rules of thumb: it plays each
+decision out on determinized clones of the game (see MONTE CARLO TREE
+SEARCH below).
+"""
+if __package__:
+    from . import moves, combat
+    from .moves import BLOCK, PASS
+else:
+    import moves
+    import combat
+    from moves import BLOCK, PASS
+
+from itertools import islice
+import math
+import random
+import time
+
+
+# ===================
+# HELPERS
+# ===================
+
+def lands_in_hand(game, player):
+    """Ids of the lands in player's hand."""
+    return [card_id for card_id, card in game.zones(player).hand.cards.items()
+            if game.definition(card).get("type") == "Land"]
+
+
+def creatures_in_hand(game, player):
+    """(card_id, definition) of the creatures in player's hand."""
+    creatures = []
+    for card_id, card in game.zones(player).hand.cards.items():
+        definition = game.definition(card)
+        if definition.get("type") == "Creature":
+            creatures.append((card_id, definition))
+    return creatures
+
+
+def tap_all_lands(game, player):
+    for land_id, land in list(game.zones(player).lands.cards.items()):
+        if not land["card"]["tapped"]:
+            game.tap_land(player, land_id)
+
+
+def cast(game, player, card_id, definition):
+    """Pay for and cast a creature. Returns False if the mana isn't there."""
+    if not game.check_mana_cost(player, definition["generic_mana"], definition["sp_mana"]):
+        return False
+    game.pay_mana(player, definition["generic_mana"], definition["sp_mana"])
+    return game.play_creature(player, card_id)
+
+
+def ready_attackers(game, player):
+    """Ids of player's creatures that can attack."""
+    return [card_id for card_id in game.state[player]["creatures"] if game.can_attack(player, card_id)]
+
+
+def untapped_blockers(game, defender):
+    return [card_id for card_id, entry in game.state[defender]["creatures"].items() if not entry["card"]["tapped"]]
+
+
+def mana_value(definition):
+    """Total mana a card costs."""
+    return definition["generic_mana"] + (1 if definition["sp_mana"] else 0)
+
+
+def greedy_blocks(game, defender):
+    """Each untapped creature blocks the strongest attacker it survives or kills."""
+    state = game.state
+    attacking = state[state["current_player"]]["creatures"]
+    defending = state[defender]["creatures"]
+
+    blocks = {}
+    free = untapped_blockers(game, defender)
+    for attacker_id in sorted(state["combat"]["attackers"], key=lambda aid: -attacking[aid]["card"]["attack"]):
+        attacker = attacking[attacker_id]["card"]
+        for blocker_id in free:
+            blocker = defending[blocker_id]["card"]
+            if ((blocker["defence"] > attacker["attack"] or blocker["attack"] >= attacker["defence"])
+                    and game.can_block(blocker_id, attacker_id)):
+                blocks[attacker_id] = [blocker_id]
+                free.remove(blocker_id)
+                break
+    return blocks
+
+
+# ===================
+# AGENTS
+# ===================
+
+class Agent:
+    """Base agent."""
+    name = "agent"
+
+    def main_phase(self, game, player):
+        raise NotImplementedError
+
+    def choose_attackers(self, game, player):
+        raise NotImplementedError
+
+    def choose_blocks(self, game, defender):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class GreedyAgent(Agent):
+    """
+    Plays an untapped land first, casts the most expensive creatures it
+    can afford, attacks with everything and blocks when the blocker
+    survives or trades.
+    """
+    name = "greedy"
+
+    def main_phase(self, game, player):
+        lands = lands_in_hand(game, player)
+        if lands:
+            # Lands that enter untapped first, they can pay for something this turn
+            lands.sort(key=lambda card_id: "entertap" in game.definition(game.zones(player).hand.get(card_id))["effect"])
+            game.play_land(player, lands[0])
+
+        tap_all_lands(game, player)
+
+        creatures = creatures_in_hand(game, player)
+        creatures.sort(key=lambda creature: -mana_value(creature[1]))
+        for card_id, definition in creatures:
+            cast(game, player, card_id, definition)
+
+    def choose_attackers(self, game, player):
+        return ready_attackers(game, player)
+
+    def choose_blocks(self, game, defender):
+        return greedy_blocks(game, defender)
+
+
+class RandomAgent(Agent):
+    """Makes a random legal choice everywhere, a baseline for the other agents."""
+    name = "random"
+
+    def __init__(self, attack_chance=0.5, block_chance=0.5):
+        self.attack_chance = attack_chance
+        self.block_chance = block_chance
+
+    def main_phase(self, game, player):
+        rng = game.rng
+        lands = lands_in_hand(game, player)
+        if lands:
+            game.play_land(player, rng.choice(lands))
+
+        tap_all_lands(game, player)
+
+        creatures = creatures_in_hand(game, player)
+        rng.shuffle(creatures)
+        for card_id, definition in creatures:
+            cast(game, player, card_id, definition)
+
+    def choose_attackers(self, game, player):
+        rng = game.rng
+        return [card_id for card_id in ready_attackers(game, player) if rng.random() < self.attack_chance]
+
+    def choose_blocks(self, game, defender):
+        rng = game.rng
+        blocks = {}
+        attackers = game.state["combat"]["attackers"]
+        if not attackers:
+            return blocks
+        for blocker_id in untapped_blockers(game, defender):
+            if rng.random() >= self.block_chance:
+                continue
+            attacker_id = rng.choice(attackers)
+            if game.can_block(blocker_id, attacker_id):
+                blocks.setdefault(attacker_id, []).append(blocker_id)
+        return blocks
+
+
+class CombatAgent(GreedyAgent):
+    """Plays like GreedyAgent, but blocks with the best assignment by the combat evaluator."""
+    name = "combat"
+
+    def __init__(self, max_blockers=1, life_weight=1.0):
+        self.max_blockers = max_blockers
+        self.life_weight = life_weight
+
+    def choose_blocks(self, game, defender):
+        blocks, _ = combat.best_blocks(game.state, defender, self.max_blockers, self.life_weight, game.zones(defender))
+        return blocks
+
+
+# ===================
+# MOVES
+# ===================
+
+# Most attacks and blocks offered to the search per decision, the
+# generator lists no attack / no blocks first
+MAX_SEARCH_MOVES = 64
+
+
+def legal_moves(game, limit=None):
+    """Legal moves (see modules/moves.py) for the game's pending decision."""
+    kind, player = game.decision
+    if kind == BLOCK:
+        # One blocker per attacker keeps the branching manageable on wide boards
+        generated = moves.block_moves(game.state, player, max_blockers=1)
+    else:
+        generated = moves.legal_moves(game.state, kind, player)
+    return list(islice(generated, limit)) if limit else list(generated)
+
+
+def move_key(move):
+    """
+    Key for a move that means the same in every determinization: cards in
+    hand are named by def_id (their ids depend on the deal), board moves
+    already name public permanents.
+    """
+    if move[0] == "land" or move[0] == "cast":
+        return (move[0], move[2])
+    return move
+
+
+def apply_move(game, move):
+    """Make move for the pending decision and advance game.decision."""
+    kind, player = game.decision
+    action = move[0]
+    if action == "land":
+        game.play_land(player, move[1])
+    elif action == "cast":
+        # Lands tapped for the colors the card needs, as cast_moves() found them
+        if game.auto_pay(player, [move[1]]) is not None:
+            game.play_creature(player, move[1])
+    elif action == "pass":
+        game.decision = game.end_main(player)
+    elif action == "attack":
+        game.decision = game.attack(player, list(move[1]))
+    else:
+        game.decision = game.block(player, blocks_from_pairs(move[1]))
+    return game.decision
+
+
+def blocks_from_pairs(pairs):
+    """{attacker_id: [blocker_id, ...]} for declare_blockers from (attacker_id, blocker_id) pairs."""
+    blocks = {}
+    for attacker_id, blocker_id in pairs:
+        blocks.setdefault(attacker_id, []).append(blocker_id)
+    return blocks
+
+
+# ===================
+# MONTE CARLO TREE SEARCH
+# ===================
+
+class _Node:
+    """Search tree node, reached by the move with key move made by player."""
+    __slots__ = ("move", "player", "parent", "children", "visits", "reward", "available")
+
+    def __init__(self, move=None, player=None, parent=None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = {}
+        self.visits = 0
+        self.reward = 0.0
+        # Times this move was legal when its parent was searched
+        self.available = 0
+
+    def select(self, moves, exploration):
+        """UCT choice among the children for moves, which are all expanded."""
+        best = None
+        best_score = -1.0
+        for move in moves:
+            child = self.children[move]
+            child.available += 1
+            score = child.reward / child.visits + exploration * math.sqrt(math.log(child.available) / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+
+class MCTSAgent(Agent):
+    """
+    Monte Carlo tree search with UCT selection.
+
+    Hidden information is handled by determinization: every iteration
+    plays on a clone of the game where the opponent's hand and deck are
+    redealt from the cards the searching player can't see, and the
+    player's own deck is reshuffled. One tree is shared by all
+    determinizations, a move's UCT exploration term counts how often it
+    was legal (information set MCTS).
+
+    iterations and time_limit (seconds) bound each decision, whichever
+    runs out first. Playouts use the rollout agent for both players and
+    stop after rollout_turns turns, unfinished games are scored by the
+    board evaluation (modules/evaluation.py) with weights.
+
+    With a seed the agent has its own random source, otherwise each
+    search draws one from game.rng, so seeded games stay reproducible.
+    """
+    name = "mcts"
+
+    def __init__(self, iterations=300, time_limit=None, exploration=1.4, rollout="greedy", rollout_turns=8, weights=None,
+                 seed=None):
+        if not iterations and not time_limit:
+            raise ValueError("MCTSAgent needs an iteration or a time budget")
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rollout = make_agent(rollout)
+        self.rollout_turns = rollout_turns
+        self.weights = weights
+        self.rng = random.Random(seed) if seed is not None else None
+        # Iterations and seconds of the last search
+        self.last_search = None
+
+    def main_phase(self, game, player):
+        while True:
+            move = self.search(game)
+            if move == PASS:
+                return
+            apply_move(game, move)
+
+    def choose_attackers(self, game, player):
+        return list(self.search(game)[1])
+
+    def choose_blocks(self, game, defender):
+        return blocks_from_pairs(self.search(game)[1])
+
+    # ===================
+    # SEARCH
+    # ===================
+
+    def _search_rng(self, game):
+        """Random source of one search: the agent's own, or one seeded from game.rng."""
+        return self.rng if self.rng is not None else random.Random(game.rng.getrandbits(64))
+
+    def determinize(self, game, observer, rng=None):
+        """Clone of game with the cards observer can't see redealt."""
+        rng = rng or self._search_rng(game)
+        sim = game.clone(rng=rng)
+        state = sim.state
+
+        opponent = state[sim.opponent(observer)]
+        unseen = list(opponent["hand"].values()) + opponent["deck"]
+        rng.shuffle(unseen)
+        hand_size = len(opponent["hand"])
+        opponent["hand"] = {str(card["id"]): card for card in unseen[:hand_size]}
+        opponent["deck"] = unseen[hand_size:]
+        rng.shuffle(state[observer]["deck"])
+        return sim
+
+    def score(self, sim, player):
+        """Result of a playout for player: 1 win, 0 loss, the board evaluation in between if unfinished."""
+        if sim.winner is not None:
+            return 1.0 if sim.winner == player else 0.0
+        return sim.evaluation().win_probability(player, self.weights)
+
+    def search(self, game):
+        """Best move for game's pending decision."""
+        observer = game.decision[1]
+        choices = {move_key(move): move for move in legal_moves(game, MAX_SEARCH_MOVES)}
+        if len(choices) == 1:
+            return next(iter(choices.values()))
+
+        rng = self._search_rng(game)
+        root = _Node()
+        rollout_agents = {game.player1: self.rollout, game.player2: self.rollout}
+        deadline = time.perf_counter() + self.time_limit if self.time_limit else None
+        start = time.perf_counter()
+        iterations = 0
+
+        while not self.iterations or iterations < self.iterations:
+            # The first iteration always runs, so there is a move to return
+            if deadline is not None and iterations and time.perf_counter() >= deadline:
+                break
+            iterations += 1
+            sim = self.determinize(game, observer, rng)
+            node = root
+
+            # Selection and expansion
+            while sim.decision is not None:
+                legal = {move_key(move): move for move in legal_moves(sim, MAX_SEARCH_MOVES)}
+                untried = [key for key in legal if key not in node.children]
+                player = sim.decision[1]
+                if untried:
+                    for key in legal:
+                        if key in node.children:
+                            node.children[key].available += 1
+                    key = rng.choice(untried)
+                    child = node.children[key] = _Node(key, player, node)
+                    child.available = 1
+                    apply_move(sim, legal[key])
+                    node = child
+                    break
+                node = node.select(legal, self.exploration)
+                apply_move(sim, legal[node.move])
+
+            # Playout
+            if sim.decision is not None:
+                sim.max_turns = min(sim.max_turns, sim.turns + self.rollout_turns)
+                sim.play_out(rollout_agents)
+
+            # Backpropagation, every node scores the playout for the player who moved into it
+            scores = {}
+            while node is not root:
+                if node.player not in scores:
+                    scores[node.player] = self.score(sim, node.player)
+                node.visits += 1
+                node.reward += scores[node.player]
+                node = node.parent
+            root.visits += 1
+
+        self.last_search = {"iterations": iterations, "seconds": time.perf_counter() - start}
+        best = max(root.children.values(), key=lambda child: child.visits)
+        return choices[best.move]
+
+
+AGENTS = {
+    "greedy": GreedyAgent,
+    "random": RandomAgent,
+    "combat": CombatAgent,
+    "mcts": MCTSAgent
+}
+
+
+def make_agent(spec):
+    """An agent from a name in AGENTS, an agent class or an agent instance."""
+    if isinstance(spec, Agent):
+        return spec
+    if isinstance(spec, str):
+        try:
+            return AGENTS[spec]()
+        except KeyError:
+            raise ValueError(f"Unknown agent {spec!r}, choose from {sorted(AGENTS)}") from None
+    return spec()
@@ -1,7 +1,10 @@
-from PIL import Image, ImageDraw, ImageFont
 import os
 import random
 
+# PIL is imported on first render (see _load_pil), so importing this
+# module is cheap and headless code never loads it
+Image = ImageDraw = ImageFont = None
+
 # Card dimensions (2x for clarity)
 CARD_WIDTH = 264
 CARD_HEIGHT = 448
@@ -21,8 +24,16 @@ FONTS_PATH = os.path.join(ASSETS_PATH, "fonts")
 FONT_FILE = os.path.join(FONTS_PATH, "Silkscreen-Regular.ttf")
 
 
+def _load_pil():
+    """Import PIL the first time a card is rendered."""
+    global Image, ImageDraw, ImageFont
+    if Image is None:
+        from PIL import Image, ImageDraw, ImageFont
+
+
 def load_font(size):
     """Load the aseprite font at the specified size."""
+    _load_pil()
     try:
         font = ImageFont.truetype(FONT_FILE, size)
         return font
@@ -39,6 +50,7 @@ def draw_crisp_text(base_img, position, text, font, color=(0, 0, 0, 255), mode="
       - "antialiased": use PIL's default antialiased rendering (smooth)
       - "crisp": 1-bit mask paste (blocky pixel-perfect)
     """
+    _load_pil()
     if mode == "antialiased":
         # Just draw directly with PIL's built-in antialiasing
         draw = ImageDraw.Draw(base_img)
@@ -66,6 +78,7 @@ def create_card(card_data, output_path="card_output.png"):
         card_data: Card object (SummonCard, SpellCard, or LandCards)
         output_path: Path where to save the generated card
     """
+    _load_pil()
     # Load random card base (card1-card6.png) and scale 2x with nearest neighbor
     card_num = random.randint(1, 6)
     card_base_path = os.path.join(ASSETS_PATH, f"card{card_num}.png")
@@ -199,6 +212,7 @@ def wrap_text(text, font, max_width):
     Returns:
         List of wrapped lines
     """
+    _load_pil()
     words = text.split()
     lines = []
     current_line = []
@@ -1,14 +1,73 @@
+class CardDefinition:
+    """
+    Immutable fields shared by every copy of a card.
+    Card objects only hold a reference to their definition plus the
+    per-copy state (id, tapped, status and current stats).
+    """
+    __slots__ = ("name", "generic_mana", "sp_mana", "type", "description", "effect", "attack", "defence", "def_id")
+
+    def __init__(self, name, generic_mana, sp_mana, card_type, description, effect="", attack=None, defence=None):
+        set_field = object.__setattr__
+        set_field(self, "name", name)
+        set_field(self, "generic_mana", generic_mana)
+        set_field(self, "sp_mana", sp_mana)
+        set_field(self, "type", card_type)
+        set_field(self, "description", description)
+        set_field(self, "effect", effect)
+        set_field(self, "attack", attack)
+        set_field(self, "defence", defence)
+        # Definition id shared by every copy of this card (matches the card_index name)
+        set_field(self, "def_id", name.lower().replace(" ", "_") if name else "")
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Card definitions are immutable, change the card copy instead")
+
+    def __reduce__(self):
+        return (CardDefinition, (self.name, self.generic_mana, self.sp_mana, self.type,
+                                 self.description, self.effect, self.attack, self.defence))
+
+    def __repr__(self):
+        return f"CardDefinition({self.name!r})"
+
+
 class Cards:
-    def __init__(self, name, generic_mana, sp_mana, card_type, description):
-        self.name = name
-        self.generic_mana = generic_mana
-        self.sp_mana = sp_mana
-        self.type = card_type
-        self.description = description
+    __slots__ = ("definition", "id", "tapped", "status")
+
+    def __init__(self, name, generic_mana, sp_mana, card_type, description, effect="", att=None, end=None):
+        self.definition = CardDefinition(name, generic_mana, sp_mana, card_type, description, effect, att, end)
+        self._reset()
+
+    def _reset(self):
+        """Set the per-copy state to that of a fresh card."""
         self.tapped = 0
         self.status = ""
         self.id = 0
-    
+
+    def instantiate(self):
+        """Create a fresh copy of this card that shares its definition."""
+        card = object.__new__(self.__class__)
+        card.definition = self.definition
+        card._reset()
+        return card
+
+    def copy(self):
+        """Copy of this card including its current per-copy state."""
+        card = object.__new__(self.__class__)
+        card.definition = self.definition
+        card.id = self.id
+        card.tapped = self.tapped
+        card.status = self.status
+        return card
+
+    # Shared fields are read from the definition
+    name = property(lambda self: self.definition.name)
+    generic_mana = property(lambda self: self.definition.generic_mana)
+    sp_mana = property(lambda self: self.definition.sp_mana)
+    type = property(lambda self: self.definition.type)
+    description = property(lambda self: self.definition.description)
+    effect = property(lambda self: self.definition.effect)
+    def_id = property(lambda self: self.definition.def_id)
+
     def to_dict(self):
         """Convert card to dictionary for JSON serialization"""
         return {
@@ -22,13 +81,43 @@ class Cards:
             "status": self.status
         }
 
+    def definition_to_dict(self):
+        """Fields shared by every copy of this card, stored once per game"""
+        return {
+            "name": self.name,
+            "generic_mana": self.generic_mana,
+            "sp_mana": self.sp_mana,
+            "type": self.type,
+            "description": self.description,
+            "effect": self.effect
+        }
+
+    def to_record(self, def_id=None):
+        """Per-copy fields only, referring to a definition by def_id"""
+        return {
+            "id": str(self.id),
+            "def_id": def_id or self.def_id,
+            "tapped": self.tapped,
+            "status": self.status
+        }
+
 class SummonCard(Cards):
+    __slots__ = ("attack", "defence")
+
     def __init__(self, name, generic_mana, sp_mana, description, att, end, effect):
-        super().__init__(name, generic_mana, sp_mana, "Creature", description)
-        self.attack = att
-        self.defence = end
-        self.effect = effect
-    
+        super().__init__(name, generic_mana, sp_mana, "Creature", description, effect, att, end)
+
+    def _reset(self):
+        super()._reset()
+        self.attack = self.definition.attack
+        self.defence = self.definition.defence
+
+    def copy(self):
+        card = super().copy()
+        card.attack = self.attack
+        card.defence = self.defence
+        return card
+
     def to_dict(self):
         """Convert summon card to dictionary"""
         data = super().to_dict()
@@ -39,11 +128,30 @@ class SummonCard(Cards):
         })
         return data
 
+    def definition_to_dict(self):
+        """Summon card definition with its base stats"""
+        data = super().definition_to_dict()
+        data.update({
+            "attack": self.definition.attack,
+            "defence": self.definition.defence
+        })
+        return data
+
+    def to_record(self, def_id=None):
+        """Summon card copy with its current (possibly modified) stats"""
+        data = super().to_record(def_id)
+        data.update({
+            "attack": self.attack,
+            "defence": self.defence
+        })
+        return data
+
 class SpellCard(Cards):
+    __slots__ = ()
+
     def __init__(self, name, generic_mana, sp_mana, description, effect):
-        super().__init__(name, generic_mana, sp_mana, "Spell", description)
-        self.effect = effect
-    
+        super().__init__(name, generic_mana, sp_mana, "Spell", description, effect)
+
     def to_dict(self):
         """Convert spell card to dictionary"""
         data = super().to_dict()
@@ -51,10 +159,11 @@ class SpellCard(Cards):
         return data
 
 class EnchantmentCards(Cards):
+    __slots__ = ()
+
     def __init__(self, name, generic_mana, sp_mana, description, effect):
-        super().__init__(name, generic_mana, sp_mana, "Enchantment", description)
-        self.effect = effect
-    
+        super().__init__(name, generic_mana, sp_mana, "Enchantment", description, effect)
+
     def to_dict(self):
         """Convert enchantment card to dictionary"""
         data = super().to_dict()
@@ -62,10 +171,11 @@ class EnchantmentCards(Cards):
         return data
 
 class LandCards(Cards):
+    __slots__ = ()
+
     def __init__(self, name, generic_mana, sp_mana, description, effect):
-        super().__init__(name, generic_mana, sp_mana, "Land", description)
-        self.effect = effect
-    
+        super().__init__(name, generic_mana, sp_mana, "Land", description, effect)
+
     def to_dict(self):
         """Convert land card to dictionary"""
         data = super().to_dict()
@@ -0,0 +1,303 @@
+"""
+Precompiled card catalog.
+
+build_catalog() turns the cards in card_index into plain data: every
+card definition with its parsed effect, keyword flags, triggers and mana
+colors. Effects are validated while building, so a typo in an effect
+string fails the build (CatalogError) instead of surfacing mid-game.
+
+The result is written to db/card_catalog.bin with marshal (plain data
+only, and unlike pickle it needs no import) together with the catalog
+version, the Python version and a signature (mtime and size) of the
+source files. load_catalog() reads it and only rebuilds when one of
+those changed, then builds the card prototypes and seeds the shared
+effect cache from it so nothing is parsed at startup. Self-play decks
+(selfplay.build_deck()) and the deck optimizer's card pool are built
+from the catalog, so workers never import card_index.
+
+    python -m src.modules.catalog      # build the catalog
+"""
+if __package__:
+    from .cards import SummonCard, SpellCard, EnchantmentCards, LandCards
+    from .parser import EffectParser, effect_cache
+    from .mana import LAND_COLORS, land_colors
+else:
+    from cards import SummonCard, SpellCard, EnchantmentCards, LandCards
+    from parser import EffectParser, effect_cache
+    from mana import LAND_COLORS, land_colors
+
+import marshal
+import os
+import sys
+
+CATALOG_VERSION = 1
+
+_MODULES_DIR = os.path.dirname(os.path.abspath(__file__))
+_SRC_DIR = os.path.dirname(_MODULES_DIR)
+DEFAULT_PATH = os.path.join(os.path.dirname(_SRC_DIR), "db", "card_catalog.bin")
+
+# Files the catalog is compiled from, a change to any of them triggers a rebuild
+SOURCES = (
+    os.path.join(_SRC_DIR, "card_index.py"),
+    os.path.join(_MODULES_DIR, "cards.py"),
+    os.path.join(_MODULES_DIR, "parser.py"),
+    os.path.join(_MODULES_DIR, "effects.py"),
+    os.path.join(_MODULES_DIR, "keywords.py"),
+    os.path.join(_MODULES_DIR, "mana.py"),
+    os.path.join(_MODULES_DIR, "catalog.py")
+)
+
+CARD_CLASSES = {
+    "Creature": SummonCard,
+    "Spell": SpellCard,
+    "Enchantment": EnchantmentCards,
+    "Land": LandCards
+}
+
+
+class CatalogError(ValueError):
+    """Raised when card_index contains cards with invalid effects."""
+
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__("Invalid card effects:\n  " + "\n  ".join(problems))
+
+
+# ===================
+# VALIDATION
+# ===================
+
+def validate_effect(effect_string, card_names=None, parser=None):
+    """
+    Check an effect string against the effect syntax.
+    Returns a list of problems, empty when the effect is valid.
+    """
+    parser = parser or EffectParser()
+    problems = []
+
+    for inst in parser.parse(effect_string):
+        raw = inst["raw"]
+        trigger = inst.get("trigger")
+        action = inst.get("action")
+        value = inst.get("value")
+
+        if trigger is not None and trigger not in parser.TRIGGERS:
+            problems.append(f"unknown trigger '{trigger}' in '{raw}'")
+        if action is None:
+            problems.append(f"missing action in '{raw}'")
+        elif action == "static":
+            continue
+        elif action in parser.MODIFIERS:
+            if inst.get("field") not in parser.FIELDS:
+                problems.append(f"'{action}' needs one of {parser.FIELDS}, got '{inst.get('field')}' in '{raw}'")
+            if isinstance(value, tuple):
+                if len(value) != 3 or value[0] not in parser.PLACES or value[1] != "count":
+                    problems.append(f"bad expression {value} in '{raw}', expected (place count name)")
+                elif card_names is not None and value[2] not in card_names:
+                    problems.append(f"expression counts unknown card '{value[2]}' in '{raw}'")
+        elif action == "gen":
+            for color in value or ():
+                if color not in LAND_COLORS:
+                    problems.append(f"unknown mana color '{color}' in '{raw}'")
+            if not value:
+                problems.append(f"'gen' needs a color in '{raw}'")
+        elif action not in parser.ACTIONS:
+            problems.append(f"unknown action or keyword '{action}' in '{raw}'")
+
+    return problems
+
+
+# ===================
+# BUILD
+# ===================
+
+def _card_index():
+    # card_index lives in src, one level up when src itself is a package
+    if __package__ and "." in __package__:
+        from .. import card_index
+    else:
+        import card_index
+    return card_index
+
+
+def source_signature(sources=SOURCES):
+    """(file name, mtime, size) of every catalog source."""
+    signature = []
+    for path in sources:
+        try:
+            stat = os.stat(path)
+            signature.append((os.path.basename(path), stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((os.path.basename(path), None, None))
+    return tuple(signature)
+
+
+def build_catalog(cards=None, names=None):
+    """
+    Compile cards (card_index by default) into catalog data.
+    names maps card_index variable names to def_ids.
+    Raises CatalogError if any effect is invalid.
+    """
+    if cards is None:
+        card_index = _card_index()
+        cards = list(card_index.CARD_DEFINITIONS.values())
+        card_ids = {id(card) for card in cards}
+        names = {name: value.def_id for name, value in vars(card_index).items()
+                 if not name.startswith("_") and id(value) in card_ids}
+
+    parser = EffectParser()
+    card_names = {card.name for card in cards}
+    problems = []
+    definitions = {}
+    effects = {}
+
+    for card in cards:
+        if card.type not in CARD_CLASSES:
+            problems.append(f"{card.name}: unknown card type '{card.type}'")
+            continue
+        effect = card.effect or ""
+        problems.extend(f"{card.name}: {problem}" for problem in validate_effect(effect, card_names, parser))
+        definitions[card.def_id] = card.definition_to_dict()
+
+        if effect not in effects:
+            parsed = effect_cache.get(effect)
+            effects[effect] = {
+                "instructions": [dict(inst) for inst in parsed.instructions],
+                "keywords": parsed.keywords,
+                "triggers": list(parsed.triggers),
+                "colors": list(land_colors(effect))
+            }
+
+    if problems:
+        raise CatalogError(problems)
+
+    return {
+        "version": CATALOG_VERSION,
+        "python": list(sys.version_info[:2]),
+        "signature": source_signature(),
+        "definitions": definitions,
+        "effects": effects,
+        "names": names or {}
+    }
+
+
+def write_catalog(data, path=DEFAULT_PATH):
+    """Write catalog data to path (atomically, other processes may be reading it)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        marshal.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+# ===================
+# LOAD
+# ===================
+
+class Catalog:
+    """Loaded catalog: card prototypes and precomputed effect data by def_id."""
+
+    def __init__(self, data):
+        self.version = data["version"]
+        self.signature = data["signature"]
+        self.definitions = data["definitions"]
+        self.effects = data["effects"]
+        self.names = data["names"]
+        # Prototypes are built on first use
+        self._cards = {}
+
+    def _build_card(self, definition):
+        card_class = CARD_CLASSES[definition["type"]]
+        if card_class is SummonCard:
+            return SummonCard(definition["name"], definition["generic_mana"], definition["sp_mana"],
+                              definition["description"], definition["attack"], definition["defence"], definition["effect"])
+        return card_class(definition["name"], definition["generic_mana"], definition["sp_mana"],
+                          definition["description"], definition["effect"])
+
+    def seed(self, cache=effect_cache):
+        """Let the shared effect cache use the catalog's parsed effects instead of parsing."""
+        cache.preload({effect: data["instructions"] for effect, data in self.effects.items()})
+
+    def effect_data(self, def_id):
+        """Precomputed keywords, triggers and mana colors of a card."""
+        return self.effects[self.definitions[def_id]["effect"] or ""]
+
+    def get(self, def_id, default=None):
+        """Prototype card for def_id (instantiate() it for a playable copy)."""
+        card = self._cards.get(def_id)
+        if card is None:
+            definition = self.definitions.get(def_id)
+            if definition is None:
+                return default
+            card = self._cards[def_id] = self._build_card(definition)
+        return card
+
+    def __getitem__(self, def_id):
+        card = self.get(def_id)
+        if card is None:
+            raise KeyError(def_id)
+        return card
+
+    def __contains__(self, def_id):
+        return def_id in self.definitions
+
+    def __iter__(self):
+        return iter(self.definitions)
+
+    def __len__(self):
+        return len(self.definitions)
+
+    def __repr__(self):
+        return f"Catalog(v{self.version}, {len(self.definitions)} cards)"
+
+
+def load_catalog(path=DEFAULT_PATH, rebuild=True):
+    """
+    Load the catalog from path, rebuilding it first if it is missing,
+    from another catalog version or older than its sources.
+    With rebuild=False a stale or missing catalog raises instead.
+    """
+    data = None
+    try:
+        with open(path, "rb") as f:
+            data = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        data = None
+
+    if (not isinstance(data, dict) or data.get("version") != CATALOG_VERSION
+            or data.get("python") != list(sys.version_info[:2])
+            or data.get("signature") != source_signature()):
+        if not rebuild:
+            raise FileNotFoundError(f"Card catalog {path} is missing or out of date")
+        data = build_catalog()
+        try:
+            write_catalog(data, path)
+        except OSError:
+            # Read-only checkout, keep the catalog in memory only
+            pass
+
+    catalog = Catalog(data)
+    catalog.seed()
+    return catalog
+
+
+_catalog = None
+
+
+def get_catalog():
+    """The process-wide catalog, loaded on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
+
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    try:
+        data = build_catalog()
+    except CatalogError as e:
+        print(e)
+        sys.exit(1)
+    write_catalog(data, output)
+    print(f"Card catalog v{CATALOG_VERSION} written: {output} ({len(data['definitions'])} cards, {len(data['effects'])} effects)")
@@ -0,0 +1,266 @@
+"""
+Vectorized combat evaluation.
+
+Scores every candidate block assignment against the declared attackers
+in one pass over NumPy arrays instead of running each option through
+calculate_combat_damage / resolve_damage_queue:
+
+    board = combat_board(game_state, defender)
+    outcome = evaluate_blocks(board, block_assignments(board))
+    best = outcome["score"].argmax()
+
+An assignment is a row with one entry per blocker: the index of the
+attacker it blocks, or -1 for no block. Damage follows the engine's
+rules: unblocked attackers hit the defending player, every blocker hits
+its attacker for its full attack, and an attacker splits its attack over
+its blockers in board order, each getting lethal damage before the next.
+Blockers fight with their stats after their block? triggers.
+
+NumPy is imported on first use, it isn't needed to play a game.
+"""
+if __package__:
+    from .keywords import is_flying, has_reach, is_unblockable
+    from .moves import card_keywords
+    from .parser import effect_cache
+    from .effects import run as run_effect
+else:
+    from keywords import is_flying, has_reach, is_unblockable
+    from moves import card_keywords
+    from parser import effect_cache
+    from effects import run as run_effect
+
+# Most assignments block_assignments() enumerates exhaustively, wider
+# boards keep only the BEAM_WIDTH best partial assignments per blocker
+MAX_ASSIGNMENTS = 1 << 16
+BEAM_WIDTH = 1 << 10
+
+# Score penalty of assignments that leave the defender dead
+LETHAL_PENALTY = 1_000_000
+
+
+# ===================
+# BOARD
+# ===================
+
+class CombatBoard:
+    """
+    Attack, defence and keyword arrays of the attackers and the untapped
+    blockers. Blocker stats are the ones they fight with, after their
+    block? triggers.
+    """
+
+    def __init__(self, attacker_ids, blocker_ids, attackers, blockers, blocker_values, health):
+        self.attacker_ids = attacker_ids
+        self.blocker_ids = blocker_ids
+        # (creatures, 3) arrays of attack, defence and keyword mask
+        self.attacker_attack, self.attacker_defence, self.attacker_keywords = attackers.T
+        self.blocker_attack, self.blocker_defence, self.blocker_keywords = blockers.T
+        # Value of blockers that stay out of combat (no block? trigger)
+        self.blocker_values = blocker_values
+        self.health = health
+
+    @property
+    def legal(self):
+        """(blockers, attackers) bool matrix of which blocker may block which attacker."""
+        attacker = self.attacker_keywords[None, :]
+        blocker = self.blocker_keywords[:, None]
+        # can_block_keywords() over the whole matrix
+        flying_ok = ~is_flying(attacker) | is_flying(blocker) | has_reach(blocker)
+        return flying_ok & ~is_unblockable(attacker)
+
+    def blocks(self, assignment):
+        """{attacker_id: [blocker_id, ...]} for declare_blockers from an assignment row."""
+        blocks = {}
+        for blocker_id, attacker in zip(self.blocker_ids, assignment.tolist()):
+            if attacker >= 0:
+                blocks.setdefault(self.attacker_ids[attacker], []).append(blocker_id)
+        return blocks
+
+
+def _stats(definitions, record):
+    return (record["attack"], record["defence"], card_keywords(definitions, record))
+
+
+def _blocking_stats(definitions, record, zones):
+    """A blocker's stats once its block? trigger (if any) has run."""
+    ops = effect_cache.get(definitions[record["def_id"]].get("effect")).program.for_trigger("block?")
+    if not ops:
+        return _stats(definitions, record)
+    stats = run_effect(ops, {"attack": record["attack"], "defence": record["defence"]}, zones)
+    return (stats["attack"], stats["defence"], card_keywords(definitions, record))
+
+
+def combat_board(game_state, defender, zones=None):
+    """
+    CombatBoard for the declared attackers against defender's untapped
+    creatures. zones (defender's zones) resolves counts in block? triggers.
+    """
+    import numpy as np
+
+    definitions = game_state["definitions"]
+    attacking = game_state[game_state["current_player"]]["creatures"]
+    defending = game_state[defender]["creatures"]
+    attacker_ids = [card_id for card_id in game_state["combat"]["attackers"] if card_id in attacking]
+    blocker_ids = [card_id for card_id, entry in defending.items() if not entry["card"]["tapped"]]
+
+    attackers = np.array([_stats(definitions, attacking[card_id]["card"]) for card_id in attacker_ids],
+                         dtype=np.int64).reshape(-1, 3)
+    blockers = np.array([_blocking_stats(definitions, defending[card_id]["card"], zones) for card_id in blocker_ids],
+                        dtype=np.int64).reshape(-1, 3)
+    resting = np.array([_stats(definitions, defending[card_id]["card"]) for card_id in blocker_ids],
+                       dtype=np.int64).reshape(-1, 3)
+    blocker_values = creature_values(resting[:, 0], resting[:, 1])
+    return CombatBoard(attacker_ids, blocker_ids, attackers, blockers, blocker_values, game_state[defender]["health"])
+
+
+# ===================
+# ASSIGNMENTS
+# ===================
+
+def block_assignments(board, max_blockers=1, life_weight=1.0):
+    """
+    Legal assignments as an (assignments, blockers) int array, no blocks
+    first. max_blockers caps blockers per attacker (None for no cap).
+    Every assignment is listed up to MAX_ASSIGNMENTS, past that the
+    partial assignments are pruned to the BEAM_WIDTH best scoring ones
+    (see _prune()) before the next blocker is added, and the greedy
+    assignment (see _greedy()) is added at the end.
+    """
+    import numpy as np
+
+    legal = board.legal
+    attackers = legal.shape[1]
+
+    # Extended one blocker at a time, per blocker the attackers it may
+    # block with -1 (no block) first, dropping rows over the cap as they appear
+    assignments = np.zeros((1, 0), dtype=np.int64)
+    counts = np.zeros((1, attackers), dtype=np.int64)
+    pruned = False
+    for row in legal:
+        choices = np.concatenate(([-1], np.flatnonzero(row)))
+        if len(assignments) * len(choices) > MAX_ASSIGNMENTS:
+            pruned = True
+            keep = _prune(board, assignments, life_weight)
+            assignments, counts = assignments[keep], counts[keep]
+        column = np.tile(choices, len(assignments))
+        assignments = np.column_stack((np.repeat(assignments, len(choices), axis=0), column))
+        counts = np.repeat(counts, len(choices), axis=0)
+        blocking = np.flatnonzero(column >= 0)
+        counts[blocking, column[blocking]] += 1
+        if max_blockers is not None and attackers:
+            keep = counts.max(axis=1) <= max_blockers
+            assignments, counts = assignments[keep], counts[keep]
+    if pruned:
+        assignments = np.vstack((assignments, _greedy(board, legal)))
+    return assignments
+
+
+def _prune(board, assignments, life_weight):
+    """
+    Indices of the BEAM_WIDTH best partial assignments, scored with the
+    blockers not assigned yet staying back, in their original order. The
+    first row (no blocks) is always kept.
+    """
+    import numpy as np
+
+    rows, assigned = assignments.shape
+    rest = np.full((rows, len(board.blocker_ids) - assigned), -1, dtype=np.int64)
+    score = evaluate_blocks(board, np.column_stack((assignments, rest)), life_weight)["score"]
+    best = np.argsort(-score, kind="stable")[:BEAM_WIDTH - 1]
+    return np.union1d([0], best)
+
+
+def _greedy(board, legal):
+    """
+    One blocker per attacker, the attackers in order of attack, each
+    taking the first free blocker that may block it. The beam scores
+    partial rows, it can miss the blocks that only together keep the
+    defender alive.
+    """
+    import numpy as np
+
+    row = np.full(legal.shape[0], -1, dtype=np.int64)
+    for attacker in np.argsort(-board.attacker_attack, kind="stable"):
+        free = np.flatnonzero(legal[:, attacker] & (row < 0))
+        if len(free):
+            row[free[0]] = attacker
+    return row
+
+
+# ===================
+# EVALUATION
+# ===================
+
+def creature_values(attack, defence):
+    """Board value of creatures, their attack plus defence."""
+    return attack + defence
+
+
+def evaluate_blocks(board, assignments, life_weight=1.0):
+    """
+    Outcome of every assignment row, as a dict of arrays:
+
+        attacker_deaths  (assignments, attackers) bool
+        blocker_deaths   (assignments, blockers) bool
+        life_loss        defending player's health lost
+        board_value      value of the defender's surviving creatures minus the attacker's
+        score            board_value - life_weight * life_loss, minus LETHAL_PENALTY
+                         if the defender dies
+    """
+    import numpy as np
+
+    assignments = np.asarray(assignments, dtype=np.int64)
+    if assignments.ndim == 1:
+        assignments = assignments[None, :]
+    rows, blockers = assignments.shape
+    attackers = len(board.attacker_ids)
+
+    # blocked[k, b, a]: in assignment k blocker b blocks attacker a
+    blocked = assignments[:, :, None] == np.arange(attackers)
+
+    # Blockers hit back with their full attack
+    attacker_damage = (blocked * board.blocker_attack[None, :, None]).sum(axis=1)
+    attacker_deaths = attacker_damage >= board.attacker_defence
+
+    # Unblocked attackers hit the player
+    unblocked = ~blocked.any(axis=1)
+    life_loss = (unblocked * board.attacker_attack).sum(axis=1)
+
+    # Attackers assign lethal damage to their blockers in board order
+    remaining = np.broadcast_to(board.attacker_attack, (rows, attackers)).copy()
+    blocker_damage = np.zeros((rows, blockers), dtype=np.int64)
+    index = np.arange(rows)
+    for blocker in range(blockers):
+        target = assignments[:, blocker]
+        blocking = target >= 0
+        column = np.where(blocking, target, 0)
+        dealt = np.where(blocking, np.minimum(remaining[index, column], board.blocker_defence[blocker]), 0)
+        remaining[index, column] -= dealt
+        blocker_damage[:, blocker] = dealt
+    blocker_deaths = blocker_damage >= board.blocker_defence
+
+    attacker_values = creature_values(board.attacker_attack, board.attacker_defence)
+    blocker_values = np.where(assignments >= 0, creature_values(board.blocker_attack, board.blocker_defence),
+                              board.blocker_values)
+    board_value = (~blocker_deaths * blocker_values).sum(axis=1) - (~attacker_deaths * attacker_values).sum(axis=1)
+
+    score = board_value - life_weight * life_loss - np.where(life_loss >= board.health, LETHAL_PENALTY, 0)
+    return {
+        "attacker_deaths": attacker_deaths,
+        "blocker_deaths": blocker_deaths,
+        "life_loss": life_loss,
+        "board_value": board_value,
+        "score": score
+    }
+
+
+def best_blocks(game_state, defender, max_blockers=1, life_weight=1.0, zones=None):
+    """
+    Highest scoring blocks for defender against the declared attackers,
+    as {attacker_id: [blocker_id, ...]}, and that assignment's outcome.
+    """
+    board = combat_board(game_state, defender, zones)
+    assignments = block_assignments(board, max_blockers, life_weight)
+    outcome = evaluate_blocks(board, assignments, life_weight)
+    best = int(outcome["score"].argmax())
+    return board.blocks(assignments[best]), {name: values[best] for name, values in outcome.items()}
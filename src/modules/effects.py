@@ -0,0 +1,137 @@
+"""
+Effect compiler and interpreter.
+
+Parsed effect instructions are compiled once per effect string into a
+Program: a tuple of opcodes for the static (trigger-less) effects plus
+one tuple per trigger. Every opcode is a plain tuple
+
+    (code, key, value, label)
+
+code   OP_INC / OP_DEC change a stat, OP_NOP only reports the instruction
+key    card stat it changes ("attack" or "defence")
+value  int, or an expression tuple like ('graveyard', 'count', 'Skeleton')
+label  text reported when the opcode runs on a trigger
+
+run() is the one interpreter for both static and triggered effects.
+"""
+
+OP_NOP = 0
+OP_INC = 1
+OP_DEC = 2
+
+# Parser field names -> card stat keys
+FIELD_KEYS = {"att": "attack", "end": "defence"}
+_CODES = {"inc": OP_INC, "dec": OP_DEC}
+
+
+class Program:
+    """Compiled form of one effect string."""
+    __slots__ = ("static", "triggers")
+
+    def __init__(self, static, triggers):
+        self.static = static
+        self.triggers = triggers
+
+    def for_trigger(self, trigger):
+        """Opcodes run when trigger (e.g. "attack?") fires, empty if the effect has none."""
+        return self.triggers.get(trigger, ())
+
+    def __repr__(self):
+        return f"Program(static={len(self.static)}, triggers={sorted(self.triggers)})"
+
+
+def _opcode(inst, label, modifiers=("inc", "dec")):
+    code = _CODES.get(inst.get("action")) if inst.get("action") in modifiers else None
+    if code is None:
+        return (OP_NOP, None, None, label)
+    field = inst.get("field")
+    return (code, FIELD_KEYS.get(field, field), inst.get("value"), label)
+
+
+def compile_effect(instructions):
+    """Compile parsed instructions (EffectParser.parse output) into a Program."""
+    static = []
+    for inst in instructions:
+        if inst.get("trigger"):
+            continue
+        if inst.get("action") in _CODES and inst.get("field") in FIELD_KEYS:
+            static.append(_opcode(inst, None))
+
+    triggers = {}
+    for trigger in {inst["trigger"] for inst in instructions if inst.get("trigger")}:
+        ops = []
+        # Instructions carrying the trigger
+        for inst in instructions:
+            if inst.get("trigger") in (trigger, trigger.replace("?", "")):
+                ops.append(_opcode(inst, f"Executing: {dict(inst)}"))
+        # Trigger-less instructions following it ("attack? inc att 1; inc end 1"),
+        # only increases are grouped with the trigger
+        last_trigger = None
+        for inst in instructions:
+            if inst.get("trigger"):
+                last_trigger = inst["trigger"]
+            elif last_trigger == trigger:
+                ops.append(_opcode(inst, f"Executing grouped effect: {dict(inst)}", modifiers=("inc",)))
+        triggers[trigger] = tuple(ops)
+
+    return Program(tuple(static), triggers)
+
+
+# ===================
+# INTERPRETER
+# ===================
+
+def run(ops, stats, zones=None, trace=None):
+    """
+    Apply opcodes to stats, a dict holding "attack"/"defence" (a card record).
+    Expressions are resolved against zones. trace(op, old, new) is called
+    for every opcode, with old and new None when nothing changed.
+    """
+    for op in ops:
+        code, key, value, _ = op
+        if code == OP_NOP or key not in stats:
+            if trace is not None:
+                trace(op, None, None)
+            continue
+        if value.__class__ is tuple:
+            value = resolve_expression(value, zones)
+        old = stats[key]
+        new = stats[key] = old + value if code == OP_INC else old - value
+        if trace is not None:
+            trace(op, old, new)
+    return stats
+
+
+# ===================
+# EXPRESSIONS
+# ===================
+
+def count_named(cards, card_name):
+    """Count cards called card_name, using the zone counter when there is one."""
+    if hasattr(cards, 'count') and hasattr(cards, 'counts'):
+        return cards.count(card_name)
+    return sum(1 for card in cards if getattr(card, 'name', None) == card_name)
+
+
+def resolve_expression(expr, zones):
+    """
+    Resolve expression tuple like ('graveyard', 'count', 'Skeleton') to int value.
+    zones is a player's zones (O(1) counts) or a dict of card lists.
+    """
+    if not isinstance(expr, tuple) or len(expr) == 0:
+        return 0
+
+    if len(expr) >= 3 and expr[0] in ['graveyard', 'deck']:
+        place = expr[0]
+        operation = expr[1]
+        card_name = expr[2]
+
+        if operation == 'count' and zones is not None:
+            if isinstance(zones, dict):
+                cards_in_place = zones.get(place)
+            else:
+                cards_in_place = getattr(zones, place, None)
+            if cards_in_place is not None:
+                return count_named(cards_in_place, card_name)
+
+    return 0
@@ -0,0 +1,181 @@
+"""
+Board evaluation for search agents.
+
+Evaluation keeps per player totals of the terms a position is scored by
+and updates them from the same change events as the state hash (see
+zones.py and zobrist.py), so scoring a leaf is a weighted sum over a
+dozen numbers instead of a walk over the board:
+
+    life              health
+    power, toughness  summed attack and defence of the creatures
+    creatures         creatures on the battlefield
+    lands             mana-producing lands
+    untapped_lands    mana-producing lands that are untapped
+    hand              cards in hand
+    flying, reach, haste, unblockable, vigilant
+                      creatures with that keyword
+    graveyard_synergy for every card in hand that grows with a graveyard
+                      count (Skeleton Army), the count it would get now
+
+score(player) is the weighted difference between player's terms and the
+opponent's. WEIGHTS are the defaults, pass weights to tune them.
+"""
+if __package__:
+    from .keywords import KEYWORDS
+    from .moves import card_keywords
+    from .mana import land_colors
+    from .parser import effect_cache
+else:
+    from keywords import KEYWORDS
+    from moves import card_keywords
+    from mana import land_colors
+    from parser import effect_cache
+
+from collections import Counter
+import math
+
+WEIGHTS = {
+    "life": 1.0,
+    "power": 1.5,
+    "toughness": 1.0,
+    "creatures": 0.5,
+    "lands": 0.5,
+    "untapped_lands": 0.25,
+    "hand": 0.75,
+    "flying": 1.5,
+    "reach": 0.5,
+    "haste": 0.25,
+    "unblockable": 2.0,
+    "vigilant": 0.5,
+    "graveyard_synergy": 1.0
+}
+
+# Keywords that are evaluation terms, as (term, flag)
+KEYWORD_TERMS = tuple((name, flag) for name, flag in KEYWORDS if name in WEIGHTS)
+
+# Score difference that maps to about 73% in win_probability()
+SCORE_SCALE = 10.0
+
+_scaling_names = {}
+
+
+def graveyard_counts(effect):
+    """Names of the cards an effect counts in the graveyard."""
+    names = _scaling_names.get(effect)
+    if names is None:
+        names = _scaling_names[effect] = tuple(
+            inst["value"][2] for inst in effect_cache.get(effect)
+            if isinstance(inst.get("value"), tuple) and inst["value"][:2] == ("graveyard", "count"))
+    return names
+
+
+class Evaluation:
+    """Evaluation terms of both players of one game state."""
+    __slots__ = ("players", "definitions", "weights", "terms", "parts", "graveyard", "scaling")
+
+    def __init__(self, game_state, players, weights=None):
+        self.players = tuple(players)
+        self.definitions = game_state["definitions"]
+        self.weights = weights or WEIGHTS
+        self.terms = {player: dict.fromkeys(WEIGHTS, 0) for player in self.players}
+        # (player, zone, slot) -> the terms its card adds, and its synergy names
+        self.parts = {}
+        # Per player: card names in the graveyard, and hand cards growing with a name
+        self.graveyard = {player: Counter() for player in self.players}
+        self.scaling = {player: Counter() for player in self.players}
+
+        for player in self.players:
+            player_data = game_state[player]
+            for index, record in enumerate(player_data["graveyard"]):
+                self.card(player, "graveyard", index, record)
+            for zone in ("hand", "creatures", "lands"):
+                for card_id, item in player_data[zone].items():
+                    self.card(player, zone, card_id, item)
+            self.scalar(player, "health", player_data["health"])
+
+    # ===================
+    # CHANGES
+    # ===================
+
+    def _contribution(self, zone, item):
+        """(terms, graveyard name, scaling names) a card adds in a zone."""
+        if zone == "creatures":
+            record = item["card"]
+            terms = [("power", record["attack"]), ("toughness", record["defence"]), ("creatures", 1)]
+            keywords = card_keywords(self.definitions, record)
+            for term, flag in KEYWORD_TERMS:
+                if keywords & flag:
+                    terms.append((term, 1))
+            return terms, None, ()
+        if zone == "lands":
+            record = item["card"]
+            if not land_colors(self.definitions[record["def_id"]].get("effect")):
+                return (), None, ()
+            return [("lands", 1), ("untapped_lands", 0 if record["tapped"] else 1)], None, ()
+        definition = self.definitions[item["def_id"]]
+        if zone == "hand":
+            return [("hand", 1)], None, graveyard_counts(definition.get("effect"))
+        if zone == "graveyard":
+            return (), definition["name"], ()
+        return (), None, ()
+
+    def card(self, player, zone, slot, item):
+        """Set the card in a zone slot, item None if the slot is now empty."""
+        if zone == "deck":
+            return
+        terms = self.terms[player]
+        graveyard = self.graveyard[player]
+        scaling = self.scaling[player]
+
+        part = (player, zone, slot)
+        old = self.parts.pop(part, None)
+        if old is not None:
+            for term, amount in old[0]:
+                terms[term] -= amount
+            if old[1] is not None:
+                graveyard[old[1]] -= 1
+                terms["graveyard_synergy"] -= scaling[old[1]]
+            for name in old[2]:
+                scaling[name] -= 1
+                terms["graveyard_synergy"] -= graveyard[name]
+
+        if item is None:
+            return
+        new = self._contribution(zone, item)
+        for term, amount in new[0]:
+            terms[term] += amount
+        if new[1] is not None:
+            terms["graveyard_synergy"] += scaling[new[1]]
+            graveyard[new[1]] += 1
+        for name in new[2]:
+            terms["graveyard_synergy"] += graveyard[name]
+            scaling[name] += 1
+        self.parts[part] = new
+
+    def scalar(self, player, field, value):
+        """Set a player field (player None for a game field), only health is a term."""
+        if field == "health":
+            self.terms[player]["life"] = value
+
+    # ===================
+    # SCORES
+    # ===================
+
+    def score(self, player, weights=None):
+        """Weighted difference between player's terms and the opponent's."""
+        weights = weights or self.weights
+        mine = self.terms[player]
+        theirs = self.terms[self.players[1] if player == self.players[0] else self.players[0]]
+        return sum(weight * (mine[term] - theirs[term]) for term, weight in weights.items())
+
+    def win_probability(self, player, weights=None):
+        """score() squashed into (0, 1)."""
+        return 1.0 / (1.0 + math.exp(-self.score(player, weights) / SCORE_SCALE))
+
+    def __repr__(self):
+        return f"Evaluation({', '.join(f'{player}: {self.score(player):+.1f}' for player in self.players)})"
+
+
+def evaluate(game_state, players, player, weights=None):
+    """score() of a game state computed from scratch."""
+    return Evaluation(game_state, players, weights).score(player)
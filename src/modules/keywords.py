@@ -0,0 +1,94 @@
+"""
+Keyword abilities as integer bit flags.
+
+A card's keyword mask is computed once per effect string (see
+ParsedEffect.keywords) and combined with the keywords in a copy's status
+string, so rules checks are a couple of bit operations instead of
+substring tests.
+"""
+
+HASTE = 1
+FLYING = 2
+REACH = 4
+UNBLOCKABLE = 8
+VIGILANT = 16
+ENTERTAP = 32
+
+# Order used when keywords are listed (e.g. in a creature's status)
+KEYWORDS = (
+    ("haste", HASTE),
+    ("flying", FLYING),
+    ("reach", REACH),
+    ("unblockable", UNBLOCKABLE),
+    ("vigilant", VIGILANT),
+    ("entertap", ENTERTAP)
+)
+KEYWORD_FLAGS = dict(KEYWORDS)
+# Other spellings accepted in status strings
+KEYWORD_FLAGS["notap"] = VIGILANT
+
+_status_masks = {}
+
+
+def keyword_mask(names):
+    """Bit mask for an iterable of keyword names (unknown names are ignored)."""
+    mask = 0
+    for name in names:
+        mask |= KEYWORD_FLAGS.get(name, 0)
+    return mask
+
+
+def keyword_names(mask):
+    """Keyword names set in mask, in KEYWORDS order."""
+    return [name for name, flag in KEYWORDS if mask & flag]
+
+
+def status_mask(status):
+    """Bit mask for a comma-separated status string like "haste, flying"."""
+    mask = _status_masks.get(status)
+    if mask is None:
+        if not isinstance(status, str):
+            return 0
+        mask = keyword_mask(part.strip() for part in status.lower().split(","))
+        # A card copy's status is one of a handful of strings
+        if len(_status_masks) < 4096:
+            _status_masks[status] = mask
+    return mask
+
+
+# ===================
+# PREDICATES
+# ===================
+
+# Each takes a keyword mask, or a NumPy array of them (answering per element)
+
+def is_flying(mask):
+    return (mask & FLYING) != 0
+
+
+def has_reach(mask):
+    return (mask & REACH) != 0
+
+
+def is_unblockable(mask):
+    return (mask & UNBLOCKABLE) != 0
+
+
+def is_vigilant(mask):
+    return (mask & VIGILANT) != 0
+
+
+def has_haste(mask):
+    return (mask & HASTE) != 0
+
+
+def mask_enters_tapped(mask):
+    """Whether a keyword mask makes a permanent enter the battlefield tapped."""
+    return (mask & ENTERTAP) != 0
+
+
+def can_block_keywords(attacker_mask, blocker_mask):
+    """Keyword part of block legality: unblockable, and flying needs flying or reach."""
+    if is_unblockable(attacker_mask):
+        return False
+    return not is_flying(attacker_mask) or is_flying(blocker_mask) or has_reach(blocker_mask)
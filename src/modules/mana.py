@@ -0,0 +1,243 @@
+"""
+Mana payment solver.
+
+Works out which lands to tap, and for which color, so that a set of
+casts all get paid:
+
+    plan = payment_plan(game_state, player, ["12", "15"])
+    plan.taps       [(land_id, color), ...] lands to tap_land()
+    plan.payments   [(generic, sp_mana, spend), ...] per card, for pay_mana()
+
+Colored costs come first: floating mana of the color pays them where it
+can, the rest are matched to lands that make the color (bipartite
+matching with augmenting paths, so a dual land is moved off a color a
+basic land can cover). Generic costs then take the leftover floating
+mana and the remaining lands, least flexible first, so dual lands are
+the ones left untapped. spend says which colors pay each generic cost,
+pay_mana's own green, blue, red order can strand a color a later cast
+needs.
+
+Plans depend only on the floating mana, the colors of the untapped
+lands and the costs, they are cached by that configuration.
+
+land_colors() is the one place the colors a land makes are read from its
+effect, the engine, move generation, evaluation and the card catalog all
+use it.
+
+castability() answers "what in this hand can I cast" for the whole hand
+from one read of the player's mana (mana_availability()), solving once
+per distinct cost.
+"""
+if __package__:
+    from .parser import effect_cache
+else:
+    from parser import effect_cache
+
+# Colors of mana in the order lands list them, tap_land takes a land's first one unless told otherwise
+LAND_COLORS = ("green", "blue", "red")
+
+_COLOR_INDEX = {color: index for index, color in enumerate(LAND_COLORS)}
+
+# castability() statuses
+CAST_NOW = "now"
+CAST_AFTER_TAPPING = "tap"
+NOT_CASTABLE = "no"
+
+# Colors by effect string
+_land_colors = {}
+
+# Plans by (pool, land kinds, costs)
+_plans = {}
+# Plans are cached up to this many configurations, then solved on every use
+MAX_CACHED_PLANS = 1 << 16
+
+
+def land_colors(effect):
+    """
+    Every color of mana an effect string's "gen" makes (a dual land's
+    "gen red/blue" makes either), in LAND_COLORS order.
+    """
+    colors = _land_colors.get(effect)
+    if colors is None:
+        made = set()
+        for inst in effect_cache.get(effect).instructions:
+            if inst.get("action") == "gen":
+                made.update(inst.get("value") or ())
+        colors = tuple(color for color in LAND_COLORS if color in made)
+        # A game only has a handful of land effects
+        if len(_land_colors) < 4096:
+            _land_colors[effect] = colors
+    return colors
+
+
+class ManaPlan:
+    """Lands to tap and how to pay each cost."""
+    __slots__ = ("taps", "payments")
+
+    def __init__(self, taps, payments):
+        # [(land_id, color), ...]
+        self.taps = taps
+        # [(generic, sp_mana, {color: generic mana of that color}), ...] in cost order
+        self.payments = payments
+
+    def __repr__(self):
+        return f"ManaPlan(taps={self.taps}, payments={self.payments})"
+
+
+def _solve(pool, kinds, costs):
+    """
+    Plan over land kinds: pool is floating mana per LAND_COLORS, kinds
+    ((colors, count), ...) least flexible first, costs ((generic, sp_mana), ...).
+    Returns (taps, spends), taps as ((kind, color), ...) and spends a tuple
+    of generic mana per LAND_COLORS for each cost, or None if unpayable.
+    """
+    pool = list(pool)
+
+    # Colored costs: floating mana first, the rest need a land
+    pips = []
+    for _, sp_mana in costs:
+        if sp_mana:
+            if pool[_COLOR_INDEX[sp_mana]]:
+                pool[_COLOR_INDEX[sp_mana]] -= 1
+            else:
+                pips.append(sp_mana)
+
+    units = [kind for kind, (_, count) in enumerate(kinds) for _ in range(count)]
+    # Pip each land unit pays, None while free
+    owner = [None] * len(units)
+
+    def augment(pip, seen):
+        for unit, kind in enumerate(units):
+            if unit in seen or pips[pip] not in kinds[kind][0]:
+                continue
+            seen.add(unit)
+            if owner[unit] is None or augment(owner[unit], seen):
+                owner[unit] = pip
+                return True
+        return False
+
+    for pip in range(len(pips)):
+        if not augment(pip, set()):
+            return None
+    taps = [(units[unit], pips[pip]) for unit, pip in enumerate(owner) if pip is not None]
+
+    # Generic costs: leftover floating mana, then the free lands in order
+    needed = sum(generic for generic, _ in costs)
+    generic = []
+    for index, color in enumerate(LAND_COLORS):
+        generic += [color] * min(pool[index], needed - len(generic))
+    for unit, kind in enumerate(units):
+        if len(generic) == needed:
+            break
+        if owner[unit] is None:
+            color = kinds[kind][0][0]
+            taps.append((kind, color))
+            generic.append(color)
+    if len(generic) < needed:
+        return None
+
+    spends = []
+    start = 0
+    for amount, _ in costs:
+        spend = [0] * len(LAND_COLORS)
+        for color in generic[start:start + amount]:
+            spend[_COLOR_INDEX[color]] += 1
+        start += amount
+        spends.append(tuple(spend))
+    return tuple(sorted(taps)), tuple(spends)
+
+
+def solve_payment(pool, lands, costs):
+    """
+    ManaPlan paying every cost, or None if they can't all be paid.
+
+    pool   floating mana, {color: amount}
+    lands  untapped lands, {land_id: colors they can make}
+    costs  [(generic, sp_mana), ...]
+    """
+    by_colors = {}
+    for land_id, colors in lands.items():
+        if colors:
+            by_colors.setdefault(tuple(colors), []).append(land_id)
+    kinds = tuple(sorted(((colors, len(ids)) for colors, ids in by_colors.items()),
+                         key=lambda kind: (len(kind[0]), kind[0])))
+    pool_key = tuple(pool.get(color, 0) for color in LAND_COLORS)
+    costs = tuple((generic, sp_mana or None) for generic, sp_mana in costs)
+
+    key = (pool_key, kinds, costs)
+    solution = _plans.get(key, False)
+    if solution is False:
+        solution = _solve(pool_key, kinds, costs)
+        if len(_plans) < MAX_CACHED_PLANS:
+            _plans[key] = solution
+    if solution is None:
+        return None
+
+    taps, spends = solution
+    free = {colors: list(ids) for colors, ids in by_colors.items()}
+    plan_taps = [(free[kinds[kind][0]].pop(0), color) for kind, color in taps]
+    payments = [(generic, sp_mana, {color: amount for color, amount in zip(LAND_COLORS, spend) if amount})
+                for (generic, sp_mana), spend in zip(costs, spends)]
+    return ManaPlan(plan_taps, payments)
+
+
+def untapped_lands(game_state, player):
+    """{land_id: colors} of player's untapped lands that make mana."""
+    definitions = game_state["definitions"]
+    lands = {}
+    for land_id, land in game_state[player]["lands"].items():
+        record = land["card"]
+        if not record["tapped"]:
+            colors = land_colors(definitions[record["def_id"]].get("effect"))
+            if colors:
+                lands[land_id] = colors
+    return lands
+
+
+def mana_availability(game_state, player):
+    """(floating mana {color: amount}, untapped lands {land_id: colors}) of player."""
+    player_data = game_state[player]
+    return {color: player_data[f"{color}_mana"] for color in LAND_COLORS}, untapped_lands(game_state, player)
+
+
+def payment_plan(game_state, player, card_ids, availability=None):
+    """ManaPlan for casting the cards in player's hand with these ids, None if they can't all be paid."""
+    hand = game_state[player]["hand"]
+    definitions = game_state["definitions"]
+    costs = []
+    for card_id in card_ids:
+        definition = definitions[hand[str(card_id)]["def_id"]]
+        costs.append((definition["generic_mana"], definition["sp_mana"]))
+    pool, lands = availability or mana_availability(game_state, player)
+    return solve_payment(pool, lands, costs)
+
+
+def castability(game_state, player, availability=None):
+    """
+    {card_id: (status, taps)} for every card in player's hand but lands:
+
+        CAST_NOW            the floating mana pays for it, taps []
+        CAST_AFTER_TAPPING  taps is the fewest [(land_id, color), ...] that pay for it
+        NOT_CASTABLE        taps None
+
+    availability is mana_availability()'s result, computed here if not given.
+    """
+    pool, lands = availability or mana_availability(game_state, player)
+    definitions = game_state["definitions"]
+    by_cost = {}
+    result = {}
+    for card_id, record in game_state[player]["hand"].items():
+        definition = definitions[record["def_id"]]
+        if definition["type"] == "Land":
+            continue
+        cost = (definition["generic_mana"], definition["sp_mana"])
+        answer = by_cost.get(cost)
+        if answer is None:
+            plan = solve_payment(pool, lands, [cost])
+            if plan is None:
+                answer = (NOT_CASTABLE, None)
+            else:
+                answer = (CAST_AFTER_TAPPING if plan.taps else CAST_NOW, plan.taps)
+            by_cost[cost] = answer
+        result[card_id] = (answer[0], list(answer[1]) if answer[1] is not None else None)
+    return result
@@ -0,0 +1,225 @@
+"""
+Legal move generation.
+
+legal_moves(game_state, decision, player) yields every legal action of a
+decision point, reading the game state dict directly (no engine calls,
+no state loads):
+
+    MAIN    ("land", card_id, def_id) while no land was played this turn,
+            ("cast", card_id, def_id) for creatures the mana pool plus the
+            untapped lands can pay for (dual lands making either color,
+            see mana.solve_payment()), and PASS
+    ATTACK  ("attack", (attacker_id, ...)) for every subset of the
+            untapped creatures without summoning sickness, smallest first
+    BLOCK   ("block", ((attacker_id, blocker_id), ...)) with every
+            untapped blocker on at most one attacker it can legally block
+
+With dedupe=True (the default) interchangeable cards are offered once:
+copies with the same def_id in hand, and identical creatures (same
+definition, stats and status) on the battlefield. Attacking with "two of
+three identical bears" is one move instead of three, and swapping which
+of two identical blockers blocks what is no new move either.
+
+Everything is generated lazily, callers on wide boards can stop early
+(itertools.islice) or cap blockers per attacker.
+"""
+if __package__:
+    from .keywords import status_mask, can_block_keywords
+    from .parser import effect_cache
+    from .mana import mana_availability, solve_payment
+else:
+    from keywords import status_mask, can_block_keywords
+    from parser import effect_cache
+    from mana import mana_availability, solve_payment
+
+from itertools import combinations_with_replacement
+
+# Decisions a player makes during a turn
+MAIN = "main"
+ATTACK = "attack"
+BLOCK = "block"
+
+PASS = ("pass",)
+
+
+# ===================
+# MAIN PHASE
+# ===================
+
+def land_moves(game_state, player, dedupe=True):
+    """Lands player can play from hand."""
+    if game_state.get("lands_played_this_turn", 0) >= 1:
+        return
+    definitions = game_state["definitions"]
+    seen = set()
+    for card_id, record in game_state[player]["hand"].items():
+        def_id = record["def_id"]
+        if definitions[def_id]["type"] != "Land" or (dedupe and def_id in seen):
+            continue
+        seen.add(def_id)
+        yield ("land", card_id, def_id)
+
+
+def cast_moves(game_state, player, dedupe=True, availability=None):
+    """
+    Creatures in player's hand that the mana pool plus the untapped lands
+    pay for. availability is mana.mana_availability()'s result, read here
+    if not given.
+    """
+    definitions = game_state["definitions"]
+    pool, lands = availability or mana_availability(game_state, player)
+    seen = set()
+    for card_id, record in game_state[player]["hand"].items():
+        def_id = record["def_id"]
+        definition = definitions[def_id]
+        if definition["type"] != "Creature" or (dedupe and def_id in seen):
+            continue
+        seen.add(def_id)
+        if solve_payment(pool, lands, [(definition["generic_mana"], definition["sp_mana"])]) is not None:
+            yield ("cast", card_id, def_id)
+
+
+def main_moves(game_state, player, dedupe=True):
+    yield from land_moves(game_state, player, dedupe)
+    yield from cast_moves(game_state, player, dedupe)
+    yield PASS
+
+
+# ===================
+# COMBAT
+# ===================
+
+def _signature(entry):
+    """Creatures with the same signature are interchangeable in combat."""
+    record = entry["card"]
+    return (record["def_id"], record.get("attack"), record.get("defence"), record.get("status", ""), record["tapped"])
+
+
+def _classes(card_ids, entries, dedupe):
+    """card_ids grouped into lists of interchangeable creatures, in board order."""
+    if not dedupe:
+        return [[card_id] for card_id in card_ids]
+    classes = {}
+    for card_id in card_ids:
+        classes.setdefault(_signature(entries[card_id]), []).append(card_id)
+    return list(classes.values())
+
+
+def card_keywords(definitions, record):
+    """Keyword mask of a card record: its definition's keywords plus those in its status."""
+    effect = definitions[record["def_id"]].get("effect")
+    return effect_cache.get(effect).keywords | status_mask(record.get("status", ""))
+
+
+def attack_moves(game_state, player, dedupe=True):
+    """Attacker subsets, smallest first (no attack is the first move)."""
+    creatures = game_state[player]["creatures"]
+    ready = [card_id for card_id, entry in creatures.items()
+             if not entry["card"]["tapped"] and not entry.get("summoning_sickness", False)]
+    classes = _classes(ready, creatures, dedupe)
+    sizes = [len(group) for group in classes]
+
+    # Per number of attackers, how many of each class attack, the first
+    # ones in board order
+    for size in range(len(ready) + 1):
+        for counts in _counts(sizes, size):
+            attacking = {card_id for group, n in zip(classes, counts) for card_id in group[:n]}
+            yield ("attack", tuple(card_id for card_id in ready if card_id in attacking))
+
+
+def _counts(sizes, total):
+    """Tuples of counts, at most sizes[i] at position i, adding up to total."""
+    # room[i]: how many the positions from i on can take
+    room = [0] * (len(sizes) + 1)
+    for index in range(len(sizes) - 1, -1, -1):
+        room[index] = room[index + 1] + sizes[index]
+
+    def fill(index, left):
+        if index == len(sizes):
+            yield ()
+            return
+        for n in range(max(0, left - room[index + 1]), min(sizes[index], left) + 1):
+            for rest in fill(index + 1, left - n):
+                yield (n,) + rest
+
+    return fill(0, total)
+
+
+def block_moves(game_state, defender, dedupe=True, max_blockers=None):
+    """
+    Block assignments against the declared attackers, no blocks first.
+    max_blockers caps how many creatures may block one attacker.
+    """
+    attacking_player = game_state["current_player"]
+    definitions = game_state["definitions"]
+    attacking = game_state[attacking_player]["creatures"]
+    defending = game_state[defender]["creatures"]
+    attackers = [card_id for card_id in game_state["combat"]["attackers"] if card_id in attacking]
+    blockers = [card_id for card_id, entry in defending.items() if not entry["card"]["tapped"]]
+
+    attacker_masks = {card_id: card_keywords(definitions, attacking[card_id]["card"]) for card_id in attackers}
+    attacker_class = {card_id: _signature(attacking[card_id]) if dedupe else card_id for card_id in attackers}
+    blocker_class = {card_id: _signature(defending[card_id]) if dedupe else card_id for card_id in blockers}
+
+    # Per class of identical blockers, every way to spread them over
+    # (no block, attacker...), ignoring which copy goes where
+    class_options = []
+    for group in _classes(blockers, defending, dedupe):
+        mask = card_keywords(definitions, defending[group[0]]["card"])
+        targets = [None] + [attacker_id for attacker_id in attackers
+                            if can_block_keywords(attacker_masks[attacker_id], mask)]
+        options = []
+        for choice in combinations_with_replacement(targets, len(group)):
+            pairs = [(attacker_id, blocker_id) for blocker_id, attacker_id in zip(group, choice) if attacker_id is not None]
+            per_attacker = {attacker_id: choice.count(attacker_id) for attacker_id, _ in pairs}
+            if max_blockers is None or all(n <= max_blockers for n in per_attacker.values()):
+                options.append((pairs, per_attacker))
+        class_options.append(options)
+
+    seen = set()
+    for pairs in _assignments(class_options, {}, max_blockers):
+        if dedupe:
+            # Identical attackers are interchangeable too
+            blocked = {}
+            for attacker_id, blocker_id in pairs:
+                blocked.setdefault(attacker_id, []).append(blocker_class[blocker_id])
+            key = tuple(sorted((attacker_class[attacker_id], tuple(sorted(classes)))
+                               for attacker_id, classes in blocked.items()))
+            if key in seen:
+                continue
+            seen.add(key)
+        pairs.sort(key=lambda pair: (attackers.index(pair[0]), blockers.index(pair[1])))
+        yield ("block", tuple(pairs))
+
+
+def _assignments(class_options, counts, max_blockers, index=0):
+    """
+    Lists of (attacker_id, blocker_id) pairs combining one option per
+    blocker class, skipping partial ones that already put too many
+    blockers on an attacker. counts tracks blockers per attacker so far.
+    """
+    if index == len(class_options):
+        yield []
+        return
+    for pairs, per_attacker in class_options[index]:
+        if max_blockers is not None:
+            if any(counts.get(attacker_id, 0) + n > max_blockers for attacker_id, n in per_attacker.items()):
+                continue
+            for attacker_id, n in per_attacker.items():
+                counts[attacker_id] = counts.get(attacker_id, 0) + n
+        for rest in _assignments(class_options, counts, max_blockers, index + 1):
+            yield pairs + rest
+        if max_blockers is not None:
+            for attacker_id, n in per_attacker.items():
+                counts[attacker_id] -= n
+
+
+def legal_moves(game_state, decision, player, dedupe=True):
+    """Every legal move of player for a MAIN, ATTACK or BLOCK decision."""
+    if decision == MAIN:
+        return main_moves(game_state, player, dedupe)
+    if decision == ATTACK:
+        return attack_moves(game_state, player, dedupe)
+    if decision == BLOCK:
+        return block_moves(game_state, player, dedupe)
+    raise ValueError(f"Unknown decision {decision!r}, expected {MAIN!r}, {ATTACK!r} or {BLOCK!r}")
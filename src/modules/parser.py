@@ -1,3 +1,14 @@
+if __package__:
+    from .effects import compile_effect
+    from .keywords import keyword_mask
+else:
+    from effects import compile_effect
+    from keywords import keyword_mask
+
+from collections import OrderedDict
+from types import MappingProxyType
+
+
 class EffectParser:
     """
     Parses card effects.
@@ -165,3 +176,109 @@ class EffectParser:
     
     def __repr__(self):
         return f"EffectParser()"
+
+
+class ParsedEffect:
+    """
+    Immutable parse of one effect string, shared by every card using it.
+    instructions are read-only views of the EffectParser.parse dicts,
+    program is their compiled form (see effects.py) and keywords the
+    static abilities as a bit mask (see keywords.py).
+    """
+    __slots__ = ("source", "instructions", "triggers", "static_abilities", "program", "keywords")
+
+    def __init__(self, source, instructions):
+        frozen = []
+        for inst in instructions:
+            inst = dict(inst)
+            if isinstance(inst.get('value'), list):
+                inst['value'] = tuple(inst['value'])
+            frozen.append(MappingProxyType(inst))
+        set_field = object.__setattr__
+        set_field(self, "source", source)
+        set_field(self, "instructions", tuple(frozen))
+        set_field(self, "triggers", tuple(inst['trigger'] for inst in frozen if inst.get('trigger')))
+        set_field(self, "static_abilities", frozenset(inst['status'] for inst in frozen if inst.get('action') == 'static'))
+        set_field(self, "program", compile_effect(frozen))
+        set_field(self, "keywords", keyword_mask(self.static_abilities))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Parsed effects are shared and can't be changed")
+
+    def __iter__(self):
+        return iter(self.instructions)
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def __repr__(self):
+        return f"ParsedEffect({self.source!r})"
+
+
+class EffectCache:
+    """
+    Bounded LRU cache of parsed effects keyed by the effect string.
+    Cards repeat a handful of effect strings, so nearly every lookup is a hit.
+    """
+
+    def __init__(self, parser=None, maxsize=1024):
+        self.parser = parser or EffectParser()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        # effect string -> instructions parsed ahead of time (card catalog)
+        self._preparsed = {}
+
+    def get(self, effect_string):
+        """Return the ParsedEffect for effect_string, parsing it on first use."""
+        effect_string = effect_string or ""
+        parsed = self._cache.get(effect_string)
+        if parsed is not None:
+            self.hits += 1
+            self._cache.move_to_end(effect_string)
+            return parsed
+
+        self.misses += 1
+        instructions = self._preparsed.get(effect_string)
+        if instructions is None:
+            instructions = self.parser.parse(effect_string)
+        parsed = ParsedEffect(effect_string, instructions)
+        self._cache[effect_string] = parsed
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return parsed
+
+    def preload(self, effects):
+        """
+        Register already parsed effects (effect string -> instructions, e.g.
+        from the card catalog), used instead of parsing on a cache miss.
+        """
+        self._preparsed.update(effects)
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._cache),
+            "maxsize": self.maxsize
+        }
+
+    def clear(self):
+        """Drop every cached effect and reset the counters."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __repr__(self):
+        return f"EffectCache({len(self._cache)}/{self.maxsize}, hits={self.hits}, misses={self.misses})"
+
+
+# Shared by utils and the engine
+effect_cache = EffectCache()
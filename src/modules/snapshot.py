@@ -0,0 +1,411 @@
+"""
+Compact binary snapshots of the game state.
+
+LAYOUT (version 1):
+magic "WZS" | version byte | string table | card definition table | root value
+
+- every string (dict keys included) is written once in the string table
+  and referenced by index
+- cards (full card dicts or def_id records) are split into a shared
+  definition (name, cost, type, description, effect or def_id) and a
+  per-copy instance record: integer id, tapped and summoning_sickness
+  bit-packed into one flags byte, status and attack/defence
+- integers are zigzag varints, so small stats take a single byte
+
+Anything that isn't a recognised card falls back to a generic tagged
+encoding, so the codec round-trips any JSON-style game state.
+"""
+import json
+import struct
+
+MAGIC = b"WZS"
+SNAPSHOT_VERSION = 1
+
+# Value tags
+T_NONE = 0
+T_FALSE = 1
+T_TRUE = 2
+T_INT = 3
+T_FLOAT = 4
+T_STR = 5
+T_LIST = 6
+T_DICT = 7
+T_CARD = 8
+T_CREATURE = 9
+T_LAND = 10
+
+# Instance flag bits
+F_TAPPED = 1
+F_SICK = 2
+F_NUMERIC_ID = 4
+F_STATUS = 8
+
+# Card fields that belong to the copy rather than the definition
+INSTANCE_FIELDS = ("id", "tapped", "status", "attack", "defence")
+SCALARS = frozenset((str, int, float, type(None)))
+
+
+# ===================
+# VARINTS
+# ===================
+
+def _write_uint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _write_int(out, n):
+    _write_uint(out, (n << 1) if n >= 0 else ((-n << 1) - 1))
+
+
+def _read_uint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_int(data, pos):
+    n = data[pos]
+    if n < 0x80:
+        pos += 1
+    else:
+        n, pos = _read_uint(data, pos)
+    return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+
+
+# ===================
+# ENCODER
+# ===================
+
+class _Encoder:
+    def __init__(self):
+        self.strings = {}
+        self.definitions = {}
+        self.definition_rows = []
+
+    def string(self, out, text):
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        _write_uint(out, index)
+
+    def _is_card(self, value):
+        # Full card dicts, or per-copy records pointing at a definition
+        if not ("id" in value and ("def_id" in value or ("name" in value and "type" in value))):
+            return False
+        if value.get("tapped") not in (0, 1) or type(value.get("tapped")) is not int:
+            return False
+        if not isinstance(value.get("status", ""), str):
+            return False
+        for key in ("attack", "defence"):
+            if key in value and type(value[key]) is not int:
+                return False
+        for item in value.values():
+            if type(item) not in SCALARS:
+                return False
+        return True
+
+    def _card(self, out, card, flags):
+        keys = tuple(card)
+        shared = tuple(card[key] for key in keys if key not in INSTANCE_FIELDS)
+        definition_key = (keys, shared)
+        index = self.definitions.get(definition_key)
+        if index is None:
+            index = self.definitions[definition_key] = len(self.definition_rows)
+            self.definition_rows.append(definition_key)
+
+        card_id = card["id"]
+        numeric_id = isinstance(card_id, str) and card_id.isdigit() and str(int(card_id)) == card_id
+        if card["tapped"]:
+            flags |= F_TAPPED
+        if numeric_id:
+            flags |= F_NUMERIC_ID
+        if card.get("status"):
+            flags |= F_STATUS
+
+        _write_uint(out, index)
+        out.append(flags)
+        if numeric_id:
+            _write_uint(out, int(card_id))
+        else:
+            self.value(out, card_id)
+        if flags & F_STATUS:
+            self.string(out, card["status"])
+        if "attack" in card:
+            _write_int(out, card["attack"])
+        if "defence" in card:
+            _write_int(out, card["defence"])
+
+    def value(self, out, value):
+        if value is None:
+            out.append(T_NONE)
+        elif value is True:
+            out.append(T_TRUE)
+        elif value is False:
+            out.append(T_FALSE)
+        elif type(value) is int:
+            out.append(T_INT)
+            _write_int(out, value)
+        elif type(value) is float:
+            out.append(T_FLOAT)
+            out += struct.pack("<d", value)
+        elif isinstance(value, str):
+            out.append(T_STR)
+            self.string(out, value)
+        elif isinstance(value, (list, tuple)):
+            out.append(T_LIST)
+            _write_uint(out, len(value))
+            for item in value:
+                self.value(out, item)
+        elif isinstance(value, dict):
+            self._dict(out, value)
+        else:
+            raise TypeError(f"Cannot snapshot value of type {type(value).__name__}")
+
+    def _dict(self, out, value):
+        card = value.get("card")
+        if isinstance(card, dict) and self._is_card(card):
+            # Battlefield entries: {"card"} for lands, plus action/sickness for creatures
+            if len(value) == 1:
+                out.append(T_LAND)
+                self._card(out, card, 0)
+                return
+            sickness = value.get("summoning_sickness")
+            if (len(value) == 3 and isinstance(value.get("action"), str)
+                    and isinstance(sickness, bool) and "summoning_sickness" in value):
+                out.append(T_CREATURE)
+                self.string(out, value["action"])
+                self._card(out, card, F_SICK if sickness else 0)
+                return
+
+        if self._is_card(value):
+            out.append(T_CARD)
+            self._card(out, value, 0)
+            return
+
+        out.append(T_DICT)
+        _write_uint(out, len(value))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError("Snapshot dict keys must be strings")
+            self.string(out, key)
+            self.value(out, item)
+
+    def finish(self, body):
+        out = bytearray(MAGIC)
+        out.append(SNAPSHOT_VERSION)
+
+        # Definition values can add strings, so encode them before the string table
+        definitions = bytearray()
+        _write_uint(definitions, len(self.definition_rows))
+        for keys, shared in self.definition_rows:
+            _write_uint(definitions, len(keys))
+            for key in keys:
+                self.string(definitions, key)
+            for item in shared:
+                self.value(definitions, item)
+
+        _write_uint(out, len(self.strings))
+        for text in self.strings:
+            encoded = text.encode("utf-8")
+            _write_uint(out, len(encoded))
+            out += encoded
+
+        out += definitions
+        out += body
+        return bytes(out)
+
+
+def encode_state(game_state):
+    """Encode a game state dict into a binary snapshot."""
+    encoder = _Encoder()
+    body = bytearray()
+    encoder.value(body, game_state)
+    return encoder.finish(body)
+
+
+# ===================
+# DECODER
+# ===================
+
+class _Decoder:
+    def __init__(self, data):
+        self.data = data
+        self.strings = []
+        self.definitions = []
+
+    def string(self, pos):
+        index = self.data[pos]
+        if index < 0x80:
+            return self.strings[index], pos + 1
+        index, pos = _read_uint(self.data, pos)
+        return self.strings[index], pos
+
+    def _card(self, pos):
+        data = self.data
+        index = data[pos]
+        if index < 0x80:
+            pos += 1
+        else:
+            index, pos = _read_uint(data, pos)
+        template, has_attack, has_defence = self.definitions[index]
+        flags = data[pos]
+        pos += 1
+
+        # Shared fields come from the definition, in the original key order
+        card = template.copy()
+        if flags & F_NUMERIC_ID:
+            card_id, pos = _read_uint(data, pos)
+            card["id"] = str(card_id)
+        else:
+            card["id"], pos = self.value(pos)
+        card["tapped"] = 1 if flags & F_TAPPED else 0
+        if flags & F_STATUS:
+            card["status"], pos = self.string(pos)
+        if has_attack:
+            card["attack"], pos = _read_int(data, pos)
+        if has_defence:
+            card["defence"], pos = _read_int(data, pos)
+        return card, flags, pos
+
+    def value(self, pos):
+        data = self.data
+        tag = data[pos]
+        pos += 1
+
+        if tag == T_NONE:
+            return None, pos
+        if tag == T_FALSE:
+            return False, pos
+        if tag == T_TRUE:
+            return True, pos
+        if tag == T_INT:
+            return _read_int(data, pos)
+        if tag == T_FLOAT:
+            return struct.unpack_from("<d", data, pos)[0], pos + 8
+        if tag == T_STR:
+            return self.string(pos)
+        if tag == T_LIST:
+            length, pos = _read_uint(data, pos)
+            items = []
+            for _ in range(length):
+                item, pos = self.value(pos)
+                items.append(item)
+            return items, pos
+        if tag == T_DICT:
+            length, pos = _read_uint(data, pos)
+            result = {}
+            for _ in range(length):
+                key, pos = self.string(pos)
+                result[key], pos = self.value(pos)
+            return result, pos
+        if tag == T_CARD:
+            card, _, pos = self._card(pos)
+            return card, pos
+        if tag == T_LAND:
+            card, _, pos = self._card(pos)
+            return {"card": card}, pos
+        if tag == T_CREATURE:
+            action, pos = self.string(pos)
+            card, flags, pos = self._card(pos)
+            return {"card": card, "action": action, "summoning_sickness": bool(flags & F_SICK)}, pos
+
+        raise ValueError(f"Corrupt snapshot: unknown tag {tag}")
+
+    def decode(self):
+        data = self.data
+        pos = 4
+
+        count, pos = _read_uint(data, pos)
+        for _ in range(count):
+            length, pos = _read_uint(data, pos)
+            self.strings.append(data[pos:pos + length].decode("utf-8"))
+            pos += length
+
+        count, pos = _read_uint(data, pos)
+        for _ in range(count):
+            key_count, pos = _read_uint(data, pos)
+            keys = []
+            for _ in range(key_count):
+                key, pos = self.string(pos)
+                keys.append(key)
+            template = {}
+            for key in keys:
+                if key in INSTANCE_FIELDS:
+                    template[key] = "" if key == "status" else None
+                else:
+                    template[key], pos = self.value(pos)
+            self.definitions.append((template, "attack" in template, "defence" in template))
+
+        game_state, pos = self.value(pos)
+        if pos != len(data):
+            raise ValueError("Corrupt snapshot: trailing data")
+        return game_state
+
+
+# Decoders for every snapshot version this build can read
+_DECODERS = {1: _Decoder}
+
+
+def snapshot_version(data):
+    """Return the schema version of a snapshot, or raise ValueError if it isn't one."""
+    if len(data) < 4 or data[:3] != MAGIC:
+        raise ValueError("Not a game state snapshot")
+    return data[3]
+
+
+def decode_state(data):
+    """Decode a binary snapshot back into a game state dict."""
+    version = snapshot_version(data)
+    if version not in _DECODERS:
+        raise ValueError(f"Unsupported snapshot version {version} (this build reads {sorted(_DECODERS)})")
+    return _DECODERS[version](bytes(data)).decode()
+
+
+# ===================
+# FILES
+# ===================
+
+def save_snapshot(path, game_state):
+    """Write a game state to path as a binary snapshot."""
+    with open(path, "wb") as f:
+        f.write(encode_state(game_state))
+
+
+def load_snapshot(path):
+    """Read a binary snapshot file into a game state dict."""
+    with open(path, "rb") as f:
+        return decode_state(f.read())
+
+
+def convert_json_file(json_path, snapshot_path=None):
+    """
+    Convert a game_state.json file into a binary snapshot.
+    Writes next to the JSON file with a .wzs extension by default.
+    Returns the snapshot path.
+    """
+    if snapshot_path is None:
+        snapshot_path = json_path.rsplit(".", 1)[0] + ".wzs"
+    with open(json_path, "r") as f:
+        game_state = json.load(f)
+    save_snapshot(snapshot_path, game_state)
+    return snapshot_path
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python snapshot.py <game_state.json> [output.wzs]")
+        sys.exit(1)
+
+    output = convert_json_file(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Snapshot written: {output}")
@@ -0,0 +1,598 @@
+if __package__:
+    from .snapshot import encode_state, decode_state
+else:
+    from snapshot import encode_state, decode_state
+
+import contextlib
+import json
+import os
+
+
+class JSONFileStore:
+    """
+    Stores the whole game state as a single file, JSON by default.
+    format="snapshot" writes the binary snapshot of modules/snapshot.py
+    instead, several times smaller than compact JSON.
+    """
+
+    FORMATS = ("json", "snapshot")
+
+    def __init__(self, path, indent=4, format="json"):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown state format {format!r}, choose from {self.FORMATS}")
+        self.path = path
+        self.indent = indent
+        self.format = format
+
+    def load(self):
+        """Read and return the game state from disk."""
+        if self.format == "snapshot":
+            with open(self.path, "rb") as f:
+                return decode_state(f.read())
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, game_state):
+        """Write the full game state to disk."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.format == "snapshot":
+            with open(self.path, "wb") as f:
+                f.write(encode_state(game_state))
+            return
+        with open(self.path, "w") as f:
+            json.dump(game_state, f, indent=self.indent)
+
+    def __repr__(self):
+        if self.format != "json":
+            return f"JSONFileStore({self.path!r}, format={self.format!r})"
+        return f"JSONFileStore({self.path!r})"
+
+
+class MemoryStore:
+    """Keeps the game state in memory only (headless and simulated games)."""
+
+    # Nothing else can write the state, there is never a reason to re-read it
+    reload_each_action = False
+
+    def __init__(self, game_state=None):
+        self.game_state = game_state
+
+    def load(self):
+        """Return the stored game state."""
+        if self.game_state is None:
+            raise FileNotFoundError("No game state stored yet")
+        return self.game_state
+
+    def save(self, game_state):
+        """Keep a reference to the game state, nothing is copied or written."""
+        self.game_state = game_state
+
+    def __repr__(self):
+        return "MemoryStore()"
+
+
+class JournalStore:
+    """
+    Append-only journal of engine actions on top of a compact JSON snapshot.
+
+    Each committed action is written as one small JSON line to
+    <path>.journal. Every compact_every records the full state is written
+    to <path> as a new snapshot and the journal starts over. load()
+    returns the snapshot and leaves the journal records in tail for the
+    session to replay through the engine. Records of actions that draw
+    from the game's RNG (mulligan) carry the RNG state they started from.
+    """
+
+    # The journal is the only writer, no need to re-read it per action
+    reload_each_action = False
+
+    def __init__(self, path, compact_every=256, fsync=False):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.tail = []
+        self._journal = None
+        self._count = 0
+
+    def load(self):
+        """Read the snapshot and the journal records written after it."""
+        with open(self.path, "r") as f:
+            game_state = json.load(f)
+
+        self.tail = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        self.tail.append(json.loads(line))
+                    except ValueError:
+                        # Torn write from a crash, everything before it is intact
+                        break
+        self._count = len(self.tail)
+        return game_state
+
+    def _sync(self, f):
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def save(self, game_state):
+        """Write a full snapshot and start a new, empty journal."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(game_state, f, separators=(",", ":"))
+            self._sync(f)
+        os.replace(temp_path, self.path)
+
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, "w")
+        self._count = 0
+        self.tail = []
+
+    def append(self, records, game_state):
+        """Append action records, compacting into a snapshot when the journal gets long."""
+        if self._count + len(records) >= self.compact_every or not os.path.exists(self.path):
+            self.save(game_state)
+            return
+
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a")
+        for record in records:
+            self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._sync(self._journal)
+        self._count += len(records)
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def __repr__(self):
+        return f"JournalStore({self.path!r})"
+
+
+class GameSession:
+    """
+    Keeps the parsed game state in memory between engine calls.
+
+    In the default mode the state is only written to the store when
+    commit() (or flush()) is called, which the engine does at phase
+    boundaries and at the end of the turn.
+    With durable=True every load re-reads the store and every save is
+    written through immediately, like the original file-per-call engine.
+
+    Rules actions run inside transaction(), which also records them so a
+    journaling store can write the action instead of the whole state.
+    """
+
+    def __init__(self, store, durable=False):
+        self.store = store
+        self.durable = durable
+        self.dirty = False
+        # Rules actions run to completion (outermost transactions only)
+        self.actions = 0
+        # Called with journaled records to rebuild state after a load
+        self.replayer = None
+        # Called before the state is written, to fold pending changes into it
+        self.before_commit = None
+        # Called with a state just read from the store, before journaled actions are replayed
+        self.after_load = None
+        self._state = None
+        self._depth = 0
+        self._replaying = False
+        self._commit_on_exit = False
+        # Actions since the last commit, None when only a snapshot will do
+        self._records = []
+
+    def _reload_each_action(self):
+        return self.durable and getattr(self.store, "reload_each_action", True)
+
+    def load(self):
+        """Return the current game state, reading the store only when needed."""
+        if self._state is None or (self._depth == 0 and self._reload_each_action()):
+            self._state = self.store.load()
+            self._records = []
+            self.dirty = False
+            if self.after_load is not None:
+                self.after_load(self._state)
+            tail = getattr(self.store, "tail", None)
+            if tail and self.replayer is not None:
+                self._replaying = True
+                try:
+                    self.replayer(tail)
+                finally:
+                    self._replaying = False
+                    # Commits asked for by replayed actions were already made before the reload
+                    self._commit_on_exit = False
+                self.dirty = False
+        return self._state
+
+    def save(self, game_state):
+        """Replace the current game state, writing it out in durable mode."""
+        self._state = game_state
+        self.dirty = True
+        if self._depth == 0 and not self._replaying:
+            # Saved outside a rules action, can't be described by a record
+            self._records = None
+            if self.durable:
+                self.commit()
+
+    def begin(self):
+        """
+        Start a rules action. Returns True for the outermost action, which
+        is what end() and abort() need to be passed.
+        """
+        outermost = self._depth == 0 and not self._replaying
+        if outermost and self._reload_each_action():
+            self._state = None
+        self._depth += 1
+        return outermost
+
+    def end(self, outermost, action=None, args=(), kwargs=None, rng=None):
+        """
+        Finish a rules action, recording it and committing where needed.
+        rng is the RNG state the action started from, for actions that draw from it.
+        """
+        self._depth -= 1
+        if outermost:
+            self.actions += 1
+            if action is not None and self._records is not None:
+                record = {"action": action, "args": list(args)}
+                if kwargs:
+                    record["kwargs"] = kwargs
+                if rng is not None:
+                    record["rng"] = rng
+                self._records.append(record)
+            if self.durable or self._commit_on_exit:
+                self._commit_on_exit = False
+                self.commit()
+
+    def abort(self, outermost):
+        """A rules action raised: in durable mode its in-memory changes are dropped."""
+        self._depth -= 1
+        if outermost:
+            self._records = None
+            if self.durable:
+                self.discard()
+
+    @contextlib.contextmanager
+    def transaction(self, action=None, args=(), kwargs=None):
+        """
+        Group the loads and saves of one rules action.
+        In durable mode the store is read once when the outermost
+        transaction starts and written once when it ends; if the action
+        raises, the in-memory changes are dropped instead.
+        """
+        outermost = self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.abort(outermost)
+            raise
+        self.end(outermost, action, args, kwargs)
+
+    def reset(self, game_state):
+        """Start from a fresh game state and write it to the store."""
+        self._state = game_state
+        self._records = None
+        self.dirty = True
+        self.commit()
+
+    def commit(self):
+        """
+        Write pending changes to the store. Returns True if anything was written.
+        Inside a rules action the write happens when the action finishes.
+        """
+        if self._depth > 0:
+            self._commit_on_exit = True
+            return False
+        if not self.dirty or self._state is None:
+            return False
+        if self.before_commit is not None:
+            self.before_commit()
+        if self._records and hasattr(self.store, "append"):
+            self.store.append(self._records, self._state)
+        else:
+            self.store.save(self._state)
+        self._records = []
+        self.dirty = False
+        return True
+
+    flush = commit
+
+    def discard(self):
+        """Drop the in-memory state so the next load re-reads the store."""
+        self._state = None
+        self._records = []
+        self.dirty = False
+
+    def __repr__(self):
+        mode = "durable" if self.durable else "in-memory"
+        return f"GameSession({self.store!r}, {mode})"
+
+
+class SQLiteStore:
+    """
+    Stores the game state in normalized SQLite tables, one per zone.
+
+    Every save runs as a single transaction that compares the new state
+    with the last one written and only inserts, updates or deletes the
+    rows that changed, so tapping a land rewrites one row of the lands
+    table instead of the whole game.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY, position INTEGER, value TEXT);
+    CREATE TABLE IF NOT EXISTS players (
+        name TEXT PRIMARY KEY, seat INTEGER, health INTEGER, extra TEXT);
+    CREATE TABLE IF NOT EXISTS mana_pool (
+        player TEXT PRIMARY KEY, blue INTEGER, red INTEGER, green INTEGER);
+    CREATE TABLE IF NOT EXISTS deck (
+        player TEXT, position INTEGER, card TEXT, PRIMARY KEY (player, position));
+    CREATE TABLE IF NOT EXISTS hand (
+        player TEXT, card_id TEXT, position INTEGER, card TEXT, PRIMARY KEY (player, card_id));
+    CREATE TABLE IF NOT EXISTS creatures (
+        player TEXT, card_id TEXT, position INTEGER, card TEXT, action TEXT,
+        summoning_sickness INTEGER, extra TEXT, PRIMARY KEY (player, card_id));
+    CREATE TABLE IF NOT EXISTS lands (
+        player TEXT, card_id TEXT, position INTEGER, card TEXT, extra TEXT,
+        PRIMARY KEY (player, card_id));
+    CREATE TABLE IF NOT EXISTS graveyard (
+        player TEXT, position INTEGER, card TEXT, PRIMARY KEY (player, position));
+    CREATE TABLE IF NOT EXISTS combat (
+        key TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE IF NOT EXISTS definitions (
+        def_id TEXT PRIMARY KEY, definition TEXT);
+    """
+
+    # table -> (key columns, value columns)
+    TABLES = {
+        "meta": (("key",), ("position", "value")),
+        "players": (("name",), ("seat", "health", "extra")),
+        "mana_pool": (("player",), ("blue", "red", "green")),
+        "deck": (("player", "position"), ("card",)),
+        "hand": (("player", "card_id"), ("position", "card")),
+        "creatures": (("player", "card_id"), ("position", "card", "action", "summoning_sickness", "extra")),
+        "lands": (("player", "card_id"), ("position", "card", "extra")),
+        "graveyard": (("player", "position"), ("card",)),
+        "combat": (("key",), ("value",)),
+        "definitions": (("def_id",), ("definition",)),
+    }
+
+    PLAYER_KEYS = ("deck", "hand", "graveyard", "health", "creatures", "lands",
+                   "blue_mana", "red_mana", "green_mana")
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Imported here so in-memory and JSON games never load sqlite3
+        import sqlite3
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        # Rows as of the last load/save, None until we know what's on disk
+        self._image = None
+
+    # ===================
+    # STATE <-> ROWS
+    # ===================
+
+    def _is_player(self, value):
+        return isinstance(value, dict) and "hand" in value and "deck" in value
+
+    def _keyed_positions(self, table, player, keys):
+        """
+        Positions for an ordered id-keyed zone (hand, creatures, lands).
+        Cards keep their stored position while the order is unchanged,
+        so removing or appending a card doesn't touch the other rows.
+        """
+        old_rows = self._image.get(table, {}) if self._image else {}
+        positions = {}
+        last = -1
+        for key in keys:
+            old = old_rows.get((player, key))
+            position = old[0] if old is not None and old[0] > last else last + 1
+            positions[key] = position
+            last = position
+        return positions
+
+    def _rows(self, game_state):
+        """Split a game state into {table: {key: value}}."""
+        rows = {table: {} for table in self.TABLES}
+        seat = 0
+        meta_position = 0
+
+        for name, value in game_state.items():
+            if self._is_player(value):
+                extra = {k: v for k, v in value.items() if k not in self.PLAYER_KEYS}
+                rows["players"][(name,)] = (seat, value.get("health"), json.dumps(extra) if extra else None)
+                rows["mana_pool"][(name,)] = (value.get("blue_mana", 0), value.get("red_mana", 0), value.get("green_mana", 0))
+                seat += 1
+
+                # Deck positions count from the bottom so drawing only deletes a row
+                deck = value["deck"]
+                size = len(deck)
+                for i, card in enumerate(deck):
+                    rows["deck"][(name, size - 1 - i)] = (dict(card),)
+
+                positions = self._keyed_positions("hand", name, value["hand"])
+                for card_id, card in value["hand"].items():
+                    rows["hand"][(name, card_id)] = (positions[card_id], dict(card))
+
+                positions = self._keyed_positions("creatures", name, value["creatures"])
+                for card_id, entry in value["creatures"].items():
+                    extra = {k: v for k, v in entry.items() if k not in ("card", "action", "summoning_sickness")}
+                    rows["creatures"][(name, card_id)] = (
+                        positions[card_id], dict(entry["card"]), entry.get("action"),
+                        entry.get("summoning_sickness"), json.dumps(extra) if extra else None)
+
+                positions = self._keyed_positions("lands", name, value["lands"])
+                for card_id, entry in value["lands"].items():
+                    extra = {k: v for k, v in entry.items() if k != "card"}
+                    rows["lands"][(name, card_id)] = (positions[card_id], dict(entry["card"]), json.dumps(extra) if extra else None)
+
+                for i, card in enumerate(value["graveyard"]):
+                    rows["graveyard"][(name, i)] = (dict(card),)
+
+            elif name == "definitions":
+                for def_id, definition in value.items():
+                    rows["definitions"][(def_id,)] = (dict(definition),)
+
+            elif name == "combat":
+                for key, combat_value in value.items():
+                    rows["combat"][(key,)] = (json.dumps(combat_value),)
+
+            else:
+                rows["meta"][(name,)] = (meta_position, json.dumps(value))
+                meta_position += 1
+
+        return rows
+
+    def _encode(self, table, key, value):
+        """Turn a row key and value into SQL parameters."""
+        params = list(key)
+        for column, item in zip(self.TABLES[table][1], value):
+            if column in ("card", "definition"):
+                item = json.dumps(item)
+            elif column == "summoning_sickness" and item is not None:
+                item = int(item)
+            params.append(item)
+        return params
+
+    # ===================
+    # STORE API
+    # ===================
+
+    def load(self):
+        """Rebuild the game state dict from the zone tables."""
+        cur = self.conn.cursor()
+        game_state = {}
+
+        definitions = cur.execute("SELECT def_id, definition FROM definitions").fetchall()
+        if definitions:
+            game_state["definitions"] = {def_id: json.loads(definition) for def_id, definition in definitions}
+
+        for name, health, extra in cur.execute("SELECT name, health, extra FROM players ORDER BY seat").fetchall():
+            player_data = {"deck": [], "hand": {}, "graveyard": [], "health": health,
+                           "creatures": {}, "lands": {}}
+            blue, red, green = cur.execute(
+                "SELECT blue, red, green FROM mana_pool WHERE player = ?", (name,)).fetchone() or (0, 0, 0)
+            player_data.update({"blue_mana": blue, "red_mana": red, "green_mana": green})
+            if extra:
+                player_data.update(json.loads(extra))
+
+            for (card,) in cur.execute(
+                    "SELECT card FROM deck WHERE player = ? ORDER BY position DESC", (name,)).fetchall():
+                player_data["deck"].append(json.loads(card))
+            for card_id, card in cur.execute(
+                    "SELECT card_id, card FROM hand WHERE player = ? ORDER BY position", (name,)).fetchall():
+                player_data["hand"][card_id] = json.loads(card)
+            for card_id, card, action, sickness, entry_extra in cur.execute(
+                    "SELECT card_id, card, action, summoning_sickness, extra FROM creatures "
+                    "WHERE player = ? ORDER BY position", (name,)).fetchall():
+                entry = {"card": json.loads(card), "action": action, "summoning_sickness": bool(sickness)}
+                if entry_extra:
+                    entry.update(json.loads(entry_extra))
+                player_data["creatures"][card_id] = entry
+            for card_id, card, entry_extra in cur.execute(
+                    "SELECT card_id, card, extra FROM lands WHERE player = ? ORDER BY position", (name,)).fetchall():
+                entry = {"card": json.loads(card)}
+                if entry_extra:
+                    entry.update(json.loads(entry_extra))
+                player_data["lands"][card_id] = entry
+            for (card,) in cur.execute(
+                    "SELECT card FROM graveyard WHERE player = ? ORDER BY position", (name,)).fetchall():
+                player_data["graveyard"].append(json.loads(card))
+
+            game_state[name] = player_data
+
+        for key, value in cur.execute("SELECT key, value FROM meta ORDER BY position").fetchall():
+            game_state[key] = json.loads(value)
+
+        combat = cur.execute("SELECT key, value FROM combat").fetchall()
+        if combat:
+            game_state["combat"] = {key: json.loads(value) for key, value in combat}
+
+        self._image = self._rows(game_state)
+        return game_state
+
+    def save(self, game_state):
+        """Write only the rows that changed since the last load/save, in one transaction."""
+        rows = self._rows(game_state)
+
+        with self.conn:
+            for table, (key_columns, value_columns) in self.TABLES.items():
+                new_rows = rows[table]
+
+                if self._image is None:
+                    # Unknown contents on disk: replace the table
+                    self.conn.execute(f"DELETE FROM {table}")
+                    old_rows = {}
+                else:
+                    old_rows = self._image[table]
+
+                deleted = [key for key in old_rows if key not in new_rows]
+                changed = [(key, value) for key, value in new_rows.items() if old_rows.get(key) != value]
+
+                if deleted:
+                    where = " AND ".join(f"{column} = ?" for column in key_columns)
+                    self.conn.executemany(f"DELETE FROM {table} WHERE {where}", deleted)
+                if changed:
+                    columns = key_columns + value_columns
+                    placeholders = ", ".join("?" for _ in columns)
+                    self.conn.executemany(
+                        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                        [self._encode(table, key, value) for key, value in changed])
+
+        self._image = rows
+
+    def close(self):
+        self.conn.close()
+
+    def __repr__(self):
+        return f"SQLiteStore({self.path!r})"
+
+
+# ===================
+# STORE SELECTION
+# ===================
+
+# Stores GameEngine(store=...) and GameManager(store_factory=...) take by name,
+# each a callable taking the path of the state
+STORES = {
+    "json": JSONFileStore,
+    "journal": JournalStore,
+    "snapshot": lambda path: JSONFileStore(path, format="snapshot"),
+    "sqlite": SQLiteStore,
+    "memory": lambda path=None: MemoryStore(),
+}
+
+# File each store keeps its state in under db/ unless given a path
+DEFAULT_FILES = {
+    "json": "game_state.json",
+    "journal": "game_state.json",
+    "snapshot": "game_state.wzs",
+    "sqlite": "player_data.db",
+    "memory": "game_state.json",
+}
+
+
+def make_store(kind, path):
+    """A store by name (see STORES) keeping the game state at path."""
+    try:
+        factory = STORES[kind]
+    except KeyError:
+        raise ValueError(f"Unknown store {kind!r}, choose from {sorted(STORES)}") from None
+    return factory(path)
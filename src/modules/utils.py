@@ -1,8 +1,16 @@
-try:
-    from .parser import EffectParser
+if __package__:
+    from .parser import EffectParser, effect_cache
+    from .effects import run, resolve_expression, count_named
+    from .keywords import (keyword_names, has_haste, is_flying, is_unblockable, is_vigilant,
+                           mask_enters_tapped)
+    from .mana import land_colors
     from .cards import *
-except:
-    from parser import EffectParser
+else:
+    from parser import EffectParser, effect_cache
+    from effects import run, resolve_expression, count_named
+    from keywords import (keyword_names, has_haste, is_flying, is_unblockable, is_vigilant,
+                          mask_enters_tapped)
+    from mana import land_colors
     from cards import *
 
 effect_parser = EffectParser()
@@ -11,31 +19,34 @@ effect_parser = EffectParser()
 # PARSING FUNCTIONS
 # ====================
 
-def parse_card_effect(card: Cards) -> list:
+def get_parsed_effect(card: Cards):
+    """Cached, read-only parse of a card's effect string."""
+    return effect_cache.get(getattr(card, 'effect', ''))
+
+def parse_card_effect(card: Cards) -> tuple:
     """Parse a card's effect string."""
-    if hasattr(card, 'effect'):
-        return effect_parser.parse(card.effect)
-    return []
+    return get_parsed_effect(card).instructions
 
 def get_card_triggers(card: Cards) -> list:
     """Get all triggers from a card."""
-    if hasattr(card, 'effect'):
-        return effect_parser.get_triggers(card.effect)
-    return []
+    return list(get_parsed_effect(card).triggers)
 
 def get_card_static_abilities(card: Cards) -> list:
     """Get all static abilities from a card."""
-    if hasattr(card, 'effect'):
-        return effect_parser.get_static_abilities(card.effect)
-    return []
+    parsed = get_parsed_effect(card)
+    return [inst['status'] for inst in parsed.instructions if inst.get('action') == 'static']
+
+def get_keyword_mask(card: Cards) -> int:
+    """Keyword abilities of a card as a bit mask (see keywords.py)."""
+    return get_parsed_effect(card).keywords
 
 def card_has_ability(card: Cards, ability) -> bool:
     """Check if a card has a specific static ability."""
-    return ability in get_card_static_abilities(card)
+    return ability in get_parsed_effect(card).static_abilities
 
 def card_has_trigger(card: Cards, trigger) -> bool:
     """Check if a card has a specific trigger."""
-    return trigger in get_card_triggers(card)
+    return trigger in get_parsed_effect(card).triggers
 
 def get_instructions_by_trigger(card: Cards, trigger) -> list:
     """Get all instructions for a specific trigger."""
@@ -53,28 +64,27 @@ def get_static_instructions(card: Cards) -> list:
 
 def can_attack_immediately(card: Cards) -> bool:
     """Check if a card can attack the turn it's played (has haste)."""
-    return card_has_ability(card, 'haste')
+    return has_haste(get_keyword_mask(card))
 
 def can_be_blocked(card: Cards) -> bool:
     """Check if a card can be blocked."""
-    return not card_has_ability(card, 'unblockable')
+    return not is_unblockable(get_keyword_mask(card))
 
 def has_flying(card: Cards) -> bool:
     """Check if a card has flying."""
-    return card_has_ability(card, 'flying')
+    return is_flying(get_keyword_mask(card))
 
 def taps_when_attacking(card: Cards) -> bool:
     """Check if a card taps when attacking."""
-    return not card_has_ability(card, 'vigilant')
+    return not is_vigilant(get_keyword_mask(card))
 
 def enters_tapped(card: Cards) -> bool:
     """Check if a card enters the battlefield tapped."""
-    return card_has_ability(card, 'entertap')
+    return mask_enters_tapped(get_keyword_mask(card))
 
 def get_all_keywords(card: Cards) -> list:
     """Extract all keyword abilities from a card's effect."""
-    keywords = ['haste', 'flying', 'reach', 'unblockable', 'vigilant', 'entertap']
-    return [kw for kw in keywords if card_has_ability(card, kw)]
+    return keyword_names(get_keyword_mask(card))
 
 # ====================
 # LAND UTILITIES
@@ -82,14 +92,7 @@ def get_all_keywords(card: Cards) -> list:
 
 def get_mana_colors(land_card: Cards) -> list:
     """Get the mana colors a land can produce."""
-    instructions = parse_card_effect(land_card)
-    colors = []
-    
-    for inst in instructions:
-        if inst.get('action') == 'gen':
-            colors.extend(inst.get('value', []))
-    
-    return list(set(colors))
+    return list(land_colors(getattr(land_card, 'effect', '')))
 
 # ====================
 # EXECUTION ENGINE
@@ -98,71 +101,31 @@ def get_mana_colors(land_card: Cards) -> list:
 def execute_card(card: Cards, game_state=None):
     """
     Execute card effects and return modified card with computed values.
+    game_state is the playing player's zones, used by counting expressions.
     """
     if not isinstance(card, SummonCard):
         return card
     
-    import copy
-    executed_card = copy.deepcopy(card)
+    executed_card = card.copy()
     
-    instructions = parse_card_effect(card)
-    
-    for inst in instructions:
-        if inst.get('trigger'):
-            continue
-        
-        action = inst.get('action')
-        
-        if action == 'inc':
-            field = inst.get('field')
-            value = inst.get('value')
-            
-            if isinstance(value, tuple):
-                value = _resolve_expression(value, game_state)
-            
-            if field == 'att':
-                executed_card.attack += value
-            elif field == 'end':
-                executed_card.defence += value
-        
-        elif action == 'dec':
-            field = inst.get('field')
-            value = inst.get('value')
-            
-            if isinstance(value, tuple):
-                value = _resolve_expression(value, game_state)
-            
-            if field == 'att':
-                executed_card.attack -= value
-            elif field == 'end':
-                executed_card.defence -= value
+    ops = get_parsed_effect(card).program.static
+    if ops:
+        stats = run(ops, {"attack": executed_card.attack, "defence": executed_card.defence}, game_state)
+        executed_card.attack = stats["attack"]
+        executed_card.defence = stats["defence"]
     
     return executed_card
 
-def _resolve_expression(expr, game_state):
-    """Resolve expression tuple like ('graveyard', 'count', 'Skeleton') to int value."""
-    if not isinstance(expr, tuple) or len(expr) == 0:
-        return 0
-    
-    if len(expr) >= 3 and expr[0] in ['graveyard', 'deck']:
-        place = expr[0]
-        operation = expr[1]
-        card_name = expr[2]
-        
-        if operation == 'count' and game_state and place in game_state:
-            cards_in_place = game_state[place]
-            count = sum(1 for c in cards_in_place if hasattr(c, 'name') and c.name == card_name)
-            return count
-    
-    return 0
+# Kept for callers of the old helper names
+_resolve_expression = resolve_expression
 
 def count_in_graveyard(graveyard, card_name) -> int:
     """Count specific cards in graveyard."""
-    return sum(1 for card in graveyard if hasattr(card, 'name') and card.name == card_name)
+    return count_named(graveyard, card_name)
 
 def count_in_deck(deck, card_name) -> int:
     """Count specific cards in deck."""
-    return sum(1 for card in deck if hasattr(card, 'name') and card.name == card_name)
+    return count_named(deck, card_name)
 
 # ====================
 # CARD SUMMARY
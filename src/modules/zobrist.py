@@ -0,0 +1,126 @@
+"""
+Zobrist hashing of game states.
+
+A state's hash is the XOR of 64-bit keys, one per feature of the
+position: every card in a zone (with its slot, id and def_id), the
+tapped flag, summoning sickness, attack, defence and status of
+permanents, each player's life and mana pool, the phase, the current
+player and the lands played this turn. Turn numbers and the declared
+attackers and blocks (which stay in the state after combat) are left
+out, so the same position reached on different turns hashes the same.
+
+StateHash keeps one contribution per part of the state (a zone slot or
+a scalar field), so a mutation is folded in by XORing the old
+contribution out and the new one in:
+
+    hasher = StateHash(game_state, players)
+    ...                                   # engine changes a permanent
+    hasher.card(player, "creatures", card_id, entry)
+    hasher.value                          # 64-bit hash of the position
+
+Hand, creatures and lands are keyed by card id. Deck cards are keyed by
+their depth from the bottom and graveyard cards by their position, which
+don't move when the top card is drawn or a card is added.
+
+Keys are derived from the feature itself (blake2b), so hashes are the
+same in every process and every run.
+"""
+import hashlib
+
+# Player fields hashed as scalars
+PLAYER_FIELDS = ("health", "green_mana", "blue_mana", "red_mana")
+# Game fields hashed as scalars
+GAME_FIELDS = ("phase", "current_player", "lands_played_this_turn")
+
+_keys = {}
+# Card keys by every field that goes into them
+_card_keys = {}
+# Keys are cached up to this many features, then computed on every use
+MAX_CACHED_KEYS = 1 << 18
+
+
+def zobrist_key(*feature):
+    """64-bit key of a feature tuple."""
+    key = _keys.get(feature)
+    if key is None:
+        digest = hashlib.blake2b(repr(feature).encode(), digest_size=8).digest()
+        key = int.from_bytes(digest, "little")
+        if len(_keys) < MAX_CACHED_KEYS:
+            _keys[feature] = key
+    return key
+
+
+def card_key(player, zone, slot, item):
+    """
+    Key of a card in a zone slot. item is a card record, or a battlefield
+    entry ({"card": record, "summoning_sickness": ...}).
+    """
+    record = item.get("card", item)
+    fields = (player, zone, slot, record.get("id"), record.get("def_id"), bool(record.get("tapped")),
+              bool(item.get("summoning_sickness")), record.get("attack"), record.get("defence"), record.get("status") or "")
+    key = _card_keys.get(fields)
+    if key is None:
+        key = zobrist_key(*fields[:5])
+        if fields[5]:
+            key ^= zobrist_key(player, zone, slot, "tapped")
+        if fields[6]:
+            key ^= zobrist_key(player, zone, slot, "sick")
+        if fields[7] is not None:
+            key ^= zobrist_key(player, zone, slot, "attack", fields[7])
+        if fields[8] is not None:
+            key ^= zobrist_key(player, zone, slot, "defence", fields[8])
+        if fields[9]:
+            key ^= zobrist_key(player, zone, slot, "status", fields[9])
+        if len(_card_keys) < MAX_CACHED_KEYS:
+            _card_keys[fields] = key
+    return key
+
+
+class StateHash:
+    """Running Zobrist hash of one game state."""
+    __slots__ = ("value", "parts")
+
+    def __init__(self, game_state=None, players=()):
+        self.value = 0
+        # part -> its current contribution to value
+        self.parts = {}
+        if game_state is not None:
+            for player in players:
+                self.player(game_state, player)
+            for field in GAME_FIELDS:
+                self.scalar(None, field, game_state.get(field))
+
+    def _set(self, part, key):
+        self.value ^= self.parts.pop(part, 0) ^ key
+        if key:
+            self.parts[part] = key
+
+    def player(self, game_state, player):
+        """Hash in all of a player's zones and fields."""
+        player_data = game_state[player]
+        deck = player_data["deck"]
+        for index, record in enumerate(deck):
+            self.card(player, "deck", len(deck) - 1 - index, record)
+        for index, record in enumerate(player_data["graveyard"]):
+            self.card(player, "graveyard", index, record)
+        for zone in ("hand", "creatures", "lands"):
+            for card_id, item in player_data[zone].items():
+                self.card(player, zone, card_id, item)
+        for field in PLAYER_FIELDS:
+            self.scalar(player, field, player_data.get(field))
+
+    def card(self, player, zone, slot, item):
+        """Set the card in a zone slot, item None if the slot is now empty."""
+        self._set((player, zone, slot), card_key(player, zone, slot, item) if item is not None else 0)
+
+    def scalar(self, player, field, value):
+        """Set a player field (player None for a game field)."""
+        self._set((player, field), zobrist_key(player, field, value))
+
+    def __repr__(self):
+        return f"StateHash({self.value:#018x})"
+
+
+def state_hash(game_state, players):
+    """Hash of a game state computed from scratch."""
+    return StateHash(game_state, players).value
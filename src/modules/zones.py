@@ -0,0 +1,272 @@
+"""
+Zone views over a player's part of the game state.
+
+The JSON-style state stays the source of truth (it is what the stores
+write), a Zone wraps one of its lists or dicts and keeps a name -> count
+counter up to date as cards move, so "how many Skeletons are in the
+graveyard" is a dict lookup instead of a scan.
+
+Battlefield zones also index their permanents by trigger ("enter?",
+"attack?", ...), so trigger dispatch only visits the subscribed cards.
+
+Moves must go through the zone objects for the counters to stay correct,
+the engine rebuilds its zones whenever it is handed a new state dict.
+A zone can also be watched: watch(slot, item) is called after every
+change with the slot and its new card (None once it's empty), which
+keeps derived data such as the state hash (zobrist.py) and the board
+evaluation (evaluation.py) up to date.
+"""
+if __package__:
+    from .parser import effect_cache
+else:
+    from parser import effect_cache
+
+from collections import Counter
+import functools
+
+
+class Zone:
+    """Base zone: card records indexed by name through the definitions registry."""
+    __slots__ = ("cards", "definitions", "counts", "watch")
+
+    def __init__(self, cards, definitions):
+        self.cards = cards
+        self.definitions = definitions
+        self.counts = Counter(self.name_of(record) for record in self.records())
+        self.watch = None
+
+    def name_of(self, record):
+        """Name of a card record (or of a full card dict)."""
+        definition = self.definitions.get(record.get("def_id"))
+        return definition["name"] if definition is not None else record.get("name")
+
+    def records(self):
+        """Card records currently in the zone."""
+        return iter(self.cards)
+
+    def count(self, name):
+        """Number of cards called name in the zone."""
+        return self.counts[name]
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self)} cards)"
+
+
+class Pile(Zone):
+    """Ordered zone that only grows at the end (the graveyard)."""
+    __slots__ = ()
+
+    def add(self, record):
+        self.cards.append(record)
+        self.counts[self.name_of(record)] += 1
+        if self.watch is not None:
+            self.watch(len(self.cards) - 1, record)
+
+
+class Deck(Zone):
+    """
+    Draw pile, top card first.
+    Drawing moves an index pointer instead of shifting the list,
+    flush() drops the drawn cards from the list in one slice.
+    """
+    __slots__ = ("top",)
+
+    def __init__(self, cards, definitions):
+        self.top = 0
+        super().__init__(cards, definitions)
+
+    def records(self):
+        return iter(self.cards[self.top:])
+
+    def draw(self):
+        """Remove and return the top card record, or None if the deck is empty."""
+        if self.top >= len(self.cards):
+            return None
+        record = self.cards[self.top]
+        self.top += 1
+        self.counts[self.name_of(record)] -= 1
+        if self.watch is not None:
+            # Deck slots are depths from the bottom, they don't move as cards are drawn
+            self.watch(len(self.cards) - self.top, None)
+        return record
+
+    def peek(self, n=1):
+        """Top n card records without drawing them."""
+        return self.cards[self.top:self.top + n]
+
+    def flush(self):
+        """Write pending draws back to the underlying list."""
+        if self.top:
+            del self.cards[:self.top]
+            self.top = 0
+
+    def replace(self, records):
+        """Make records (top card first) the whole pile, e.g. after a shuffle."""
+        self.flush()
+        old_size = len(self.cards)
+        self.cards[:] = records
+        self.counts = Counter(self.name_of(record) for record in self.cards)
+        if self.watch is not None:
+            size = len(self.cards)
+            for depth in range(max(old_size, size)):
+                self.watch(depth, self.cards[size - 1 - depth] if depth < size else None)
+
+    def __len__(self):
+        return len(self.cards) - self.top
+
+
+class IndexedZone(Zone):
+    """
+    Zone keyed by card id (hand, creatures, lands).
+    Battlefield zones hold entries like {"card": record, ...}.
+    """
+    __slots__ = ("wrapped",)
+
+    def __init__(self, cards, definitions, wrapped=False):
+        self.wrapped = wrapped
+        super().__init__(cards, definitions)
+
+    def records(self):
+        if self.wrapped:
+            return (entry["card"] for entry in self.cards.values())
+        return iter(self.cards.values())
+
+    def _record(self, entry):
+        return entry["card"] if self.wrapped else entry
+
+    def add(self, card_id, entry):
+        card_id = str(card_id)
+        if card_id in self.cards:
+            self.counts[self.name_of(self._record(self.cards[card_id]))] -= 1
+        self.cards[card_id] = entry
+        self.counts[self.name_of(self._record(entry))] += 1
+        if self.watch is not None:
+            self.watch(card_id, entry)
+
+    def remove(self, card_id):
+        """Remove and return the entry for card_id, or None if it isn't here."""
+        entry = self.cards.pop(str(card_id), None)
+        if entry is not None:
+            self.counts[self.name_of(self._record(entry))] -= 1
+            if self.watch is not None:
+                self.watch(str(card_id), None)
+        return entry
+
+    def get(self, card_id):
+        return self.cards.get(str(card_id))
+
+    def __contains__(self, card_id):
+        return str(card_id) in self.cards
+
+    def __iter__(self):
+        return iter(self.cards)
+
+
+class BattlefieldZone(IndexedZone):
+    """
+    Permanents keyed by card id, with a trigger -> subscribed ids index.
+    Subscribers are kept in the order they entered, like the zone itself.
+    """
+    __slots__ = ("subscribers",)
+
+    def __init__(self, cards, definitions):
+        self.subscribers = {}
+        super().__init__(cards, definitions, wrapped=True)
+        for card_id, entry in cards.items():
+            self._subscribe(card_id, entry["card"])
+
+    def triggers_of(self, record):
+        """Triggers in the effect of a card record."""
+        definition = self.definitions.get(record.get("def_id"))
+        effect = definition.get("effect") if definition is not None else record.get("effect")
+        return effect_cache.get(effect).triggers
+
+    def _subscribe(self, card_id, record):
+        for trigger in self.triggers_of(record):
+            self.subscribers.setdefault(trigger, {})[card_id] = None
+
+    def _unsubscribe(self, card_id, record):
+        for trigger in self.triggers_of(record):
+            subscribed = self.subscribers.get(trigger)
+            if subscribed is not None:
+                subscribed.pop(card_id, None)
+
+    def add(self, card_id, entry):
+        card_id = str(card_id)
+        if card_id in self.cards:
+            self._unsubscribe(card_id, self.cards[card_id]["card"])
+        super().add(card_id, entry)
+        self._subscribe(card_id, entry["card"])
+
+    def remove(self, card_id):
+        entry = super().remove(card_id)
+        if entry is not None:
+            self._unsubscribe(str(card_id), entry["card"])
+        return entry
+
+    def subscribed(self, trigger):
+        """Ids of the permanents with a trigger, in the order they entered."""
+        subscribed = self.subscribers.get(trigger)
+        return list(subscribed) if subscribed else []
+
+
+class PlayerZones:
+    """All zones of one player in a game state."""
+    __slots__ = ("deck", "hand", "graveyard", "creatures", "lands")
+
+    def __init__(self, player_data, definitions):
+        # Older code paths kept the hand as a list of cards
+        if isinstance(player_data["hand"], list):
+            player_data["hand"] = {str(card["id"]): card for card in player_data["hand"]}
+
+        self.deck = Deck(player_data["deck"], definitions)
+        self.hand = IndexedZone(player_data["hand"], definitions)
+        self.graveyard = Pile(player_data["graveyard"], definitions)
+        self.creatures = BattlefieldZone(player_data["creatures"], definitions)
+        self.lands = BattlefieldZone(player_data["lands"], definitions)
+
+    def count(self, zone, name):
+        """Number of cards called name in a zone ("battlefield" covers creatures and lands)."""
+        if zone == "battlefield":
+            return self.creatures.count(name) + self.lands.count(name)
+        return getattr(self, zone).count(name)
+
+    def watch(self, watcher, player):
+        """Report every change to the zones to watcher.card() for player."""
+        for zone in self.__slots__:
+            getattr(self, zone).watch = functools.partial(watcher.card, player, zone)
+
+    def flush(self):
+        self.deck.flush()
+
+
+class StateWatchers:
+    """
+    Named watchers of one game state, each told about every change:
+    card(player, zone, slot, item) for cards, scalar(player, field, value)
+    for fields (player None for game fields).
+    """
+    __slots__ = ("watchers",)
+
+    def __init__(self):
+        self.watchers = {}
+
+    def get(self, name):
+        return self.watchers.get(name)
+
+    def add(self, name, watcher):
+        self.watchers[name] = watcher
+
+    def card(self, player, zone, slot, item):
+        for watcher in self.watchers.values():
+            watcher.card(player, zone, slot, item)
+
+    def scalar(self, player, field, value):
+        for watcher in self.watchers.values():
+            watcher.scalar(player, field, value)
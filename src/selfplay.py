@@ -0,0 +1,253 @@
+"""
+Batch self-play over a process pool.
+
+    python main.py --games 10000 --deck1 green_red --deck2 blue_red --agents greedy random
+
+run_batch() fans seeded games out to worker processes. Every game is a
+HeadlessGame between two deck lists of card_index names, each deck
+played by its own agent. Workers send back one small result per game
+as soon as it finishes (winner, turns, damage dealt, cards played) and
+the parent folds them into a BatchStats with win rates and averages.
+
+Decks and agents are handed to each worker once when it starts, a task
+is only (game number, seed). Decks swap seats every other game so the
+first player's advantage doesn't show up as a deck advantage.
+"""
+if __package__:
+    from .headless import HeadlessGame, MAX_TURNS
+    from .modules.ai import AGENTS
+    from .modules.catalog import get_catalog
+else:
+    from headless import HeadlessGame, MAX_TURNS
+    from modules.ai import AGENTS
+    from modules.catalog import get_catalog
+
+import argparse
+import multiprocessing
+import os
+import time
+
+# Preset deck lists, card_index name -> copies
+DECKS = {
+    "green_red": {
+        "forest": 6, "mountain": 6,
+        "slime": 3, "forest_bear": 3, "alpha_wolf": 3, "goblin_raider": 3, "fire_elemental": 3, "berserker": 3
+    },
+    "blue_red": {
+        "island": 6, "mountain": 4, "volcanic_peak": 2,
+        "skeleton": 3, "skeleton_army": 3, "phantom_warrior": 3, "arcane_scholar": 3, "goblin_raider": 3, "dragon_whelp": 3
+    },
+    "green_blue": {
+        "forest": 5, "island": 5, "tropical_grove": 2,
+        "slime": 3, "bigger_slime": 2, "vine_elemental": 2, "forest_bear": 3, "skeleton": 3, "sea_serpent": 2, "arcane_scholar": 3
+    }
+}
+
+
+# ===================
+# DECKS
+# ===================
+
+def deck_list(spec):
+    """
+    Card names of a deck, from a preset name in DECKS, a {name: copies}
+    dict or a list of names.
+    """
+    if isinstance(spec, str):
+        try:
+            spec = DECKS[spec]
+        except KeyError:
+            raise ValueError(f"Unknown deck {spec!r}, choose from {sorted(DECKS)}") from None
+    if isinstance(spec, dict):
+        return [name for name, copies in spec.items() for _ in range(copies)]
+    return list(spec)
+
+
+def build_deck(names):
+    """Card prototypes from the card catalog for a list of card_index names."""
+    catalog = get_catalog()
+    deck = []
+    for name in names:
+        def_id = catalog.names.get(name)
+        if def_id is None:
+            raise ValueError(f"Unknown card {name!r} in deck list")
+        deck.append(catalog[def_id])
+    return deck
+
+
+# ===================
+# WORKERS
+# ===================
+
+# Set once per worker process by _init_worker
+_worker = {}
+
+
+def _init_worker(deck1, deck2, agents, max_turns, swap_seats):
+    _worker["decks"] = (build_deck(deck1), build_deck(deck2))
+    _worker["agents"] = agents
+    _worker["max_turns"] = max_turns
+    _worker["swap_seats"] = swap_seats
+
+
+def _play(task):
+    """Play one game, results are keyed "deck1"/"deck2" whichever seat the deck had."""
+    number, seed = task
+    deck1, deck2 = _worker["decks"]
+    agent1, agent2 = _worker["agents"]
+
+    swapped = _worker["swap_seats"] and number % 2 == 1
+    if swapped:
+        game = HeadlessGame(deck2, deck1, seed=seed, agents=(agent2, agent1))
+        labels = {game.player1: "deck2", game.player2: "deck1"}
+    else:
+        game = HeadlessGame(deck1, deck2, seed=seed, agents=(agent1, agent2))
+        labels = {game.player1: "deck1", game.player2: "deck2"}
+
+    game.play_game(_worker["max_turns"])
+    result = game.result()
+    return {
+        "game": number,
+        "seed": seed,
+        "winner": labels.get(result["winner"]),
+        "first": labels[game.player1],
+        "turns": result["turns"],
+        "actions": result["actions"],
+        "damage": {labels[player]: damage for player, damage in result["damage"].items()},
+        "cards_played": {labels[player]: played for player, played in result["cards_played"].items()}
+    }
+
+
+# ===================
+# AGGREGATION
+# ===================
+
+class BatchStats:
+    """Running totals over streamed game results."""
+
+    def __init__(self):
+        self.games = 0
+        self.wins = {"deck1": 0, "deck2": 0}
+        self.draws = 0
+        self.first_player_wins = 0
+        self.turns = 0
+        self.actions = 0
+        self.damage = {"deck1": 0, "deck2": 0}
+        self.cards_played = {"deck1": 0, "deck2": 0}
+        self.seconds = 0.0
+
+    def add(self, result):
+        self.games += 1
+        winner = result["winner"]
+        if winner is None:
+            self.draws += 1
+        else:
+            self.wins[winner] += 1
+            if winner == result["first"]:
+                self.first_player_wins += 1
+        self.turns += result["turns"]
+        self.actions += result["actions"]
+        for deck in ("deck1", "deck2"):
+            self.damage[deck] += result["damage"][deck]
+            self.cards_played[deck] += result["cards_played"][deck]
+
+    def win_rate(self, deck):
+        return self.wins[deck] / self.games if self.games else 0.0
+
+    @property
+    def games_per_sec(self):
+        return self.games / self.seconds if self.seconds else 0.0
+
+    @property
+    def actions_per_sec(self):
+        return self.actions / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        """Aggregated results as a plain dict."""
+        games = self.games or 1
+        return {
+            "games": self.games,
+            "win_rate": {deck: self.win_rate(deck) for deck in self.wins},
+            "draw_rate": self.draws / games,
+            "first_player_win_rate": self.first_player_wins / games,
+            "avg_turns": self.turns / games,
+            "avg_damage": {deck: total / games for deck, total in self.damage.items()},
+            "avg_cards_played": {deck: total / games for deck, total in self.cards_played.items()},
+            "seconds": self.seconds,
+            "games_per_sec": self.games_per_sec,
+            "actions_per_sec": self.actions_per_sec
+        }
+
+    def __repr__(self):
+        return (f"BatchStats({self.games} games, deck1 {self.win_rate('deck1'):.1%}, "
+                f"deck2 {self.win_rate('deck2'):.1%}, {self.games_per_sec:,.0f} games/sec)")
+
+
+def run_batch(deck1, deck2, games=1000, agents=("greedy", "greedy"), seed=0, workers=None,
+              chunksize=None, swap_seats=True, max_turns=MAX_TURNS, on_result=None):
+    """
+    Play games between deck1 and deck2 (anything deck_list() takes) over
+    workers processes, game i seeded with seed + i. agents are AGENTS
+    names (or picklable agent classes), agents[0] plays deck1.
+    on_result(result, stats) is called in the parent as each game comes in.
+    Returns the BatchStats.
+    """
+    for agent in agents:
+        if isinstance(agent, str) and agent not in AGENTS:
+            raise ValueError(f"Unknown agent {agent!r}, choose from {sorted(AGENTS)}")
+    initargs = (deck_list(deck1), deck_list(deck2), tuple(agents), max_turns, swap_seats)
+    tasks = ((number, seed + number) for number in range(games))
+    workers = workers or os.cpu_count() or 1
+    stats = BatchStats()
+
+    start = time.perf_counter()
+    if workers == 1:
+        # No pool to start or feed, play in this process
+        _init_worker(*initargs)
+        results = map(_play, tasks)
+        pool = None
+    else:
+        # Big enough chunks to keep IPC cheap, small enough to balance the load
+        chunksize = chunksize or max(1, games // (workers * 16))
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs)
+        results = pool.imap_unordered(_play, tasks, chunksize)
+
+    try:
+        for result in results:
+            stats.add(result)
+            if on_result is not None:
+                on_result(result, stats)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play headless games in bulk and report win rates.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--deck1", default="green_red", choices=sorted(DECKS))
+    parser.add_argument("--deck2", default="blue_red", choices=sorted(DECKS))
+    parser.add_argument("--agents", nargs=2, default=["greedy", "greedy"], choices=sorted(AGENTS), metavar="AGENT")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    args = parser.parse_args(argv)
+
+    stats = run_batch(args.deck1, args.deck2, games=args.games, agents=args.agents, seed=args.seed,
+                      workers=args.workers, max_turns=args.max_turns)
+    summary = stats.summary()
+    print(f"{summary['games']} games in {summary['seconds']:.2f} s "
+          f"({summary['games_per_sec']:,.0f} games/sec, {summary['actions_per_sec']:,.0f} actions/sec)")
+    for deck, name, agent in (("deck1", args.deck1, args.agents[0]), ("deck2", args.deck2, args.agents[1])):
+        print(f"  {name} ({agent}): win rate {summary['win_rate'][deck]:.1%}, "
+              f"avg damage {summary['avg_damage'][deck]:.1f}, avg cards played {summary['avg_cards_played'][deck]:.1f}")
+    print(f"  draws {summary['draw_rate']:.1%}, first player wins {summary['first_player_win_rate']:.1%}, "
+          f"avg turns {summary['avg_turns']:.1f}")
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Shared setup for the pytest suites: src on the path and preset decks."""
+
+import os
+import sys
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from selfplay import build_deck, deck_list
+
+
+@pytest.fixture(scope="session")
+def decks():
+    """The green/red and blue/red preset decks."""
+    return build_deck(deck_list("green_red")), build_deck(deck_list("blue_red"))
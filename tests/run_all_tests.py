@@ -3,14 +3,20 @@
 
 import sys
 import os
+import ast
+import glob
 import time
 import traceback
 
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'src'))
 
 def run_test_suite(test_file, description):
-    """Run a test suite and capture results."""
+    """Run a test suite with pytest and capture results."""
     print(f"\n{'=' * 60}")
     print(f"Running {description}")
     print(f"File: {test_file}")
@@ -19,16 +25,15 @@ def run_test_suite(test_file, description):
     try:
         start_time = time.time()
         
-        # Import and run the test module
-        module_name = test_file.replace('.py', '')
-        test_module = __import__(module_name)
-        
-        # If the module has a main section, it will run automatically
-        # when imported due to if __name__ == "__main__" checks
+        exit_code = pytest.main(["-q", os.path.join(TESTS_DIR, test_file)])
         
         end_time = time.time()
         duration = end_time - start_time
         
+        if exit_code != 0:
+            print(f"\n❌ {description} failed (pytest exit code {int(exit_code)})")
+            return False, duration
+        
         print(f"\n✅ {description} completed successfully in {duration:.2f}s")
         return True, duration
         
@@ -39,17 +44,22 @@ def run_test_suite(test_file, description):
         traceback.print_exc()
         return False, 0
 
+def find_test_suites():
+    """(file name, description) of every test_*.py suite, described by its docstring."""
+    suites = []
+    for path in sorted(glob.glob(os.path.join(TESTS_DIR, "test_*.py"))):
+        with open(path, "r") as f:
+            docstring = ast.get_docstring(ast.parse(f.read())) or ""
+        name = os.path.basename(path)
+        suites.append((name, docstring.splitlines()[0].rstrip(".") if docstring else name))
+    return suites
+
 def main():
     """Run all test suites."""
     print("🧪 WIZARD GAME - COMPREHENSIVE TEST SUITE")
     print("Testing all game systems and mechanics...")
     
-    test_suites = [
-        ('test_basic_gameplay', 'Basic Gameplay (turns, mana, cards)'),
-        ('test_combat_system', 'Combat System (attack, block, damage)'),
-        ('test_triggers_keywords', 'Triggers & Keywords (enter, attack, block)'),
-        ('test_edge_cases', 'Edge Cases & Error Handling')
-    ]
+    test_suites = find_test_suites()
     
     results = []
     total_time = 0
@@ -3,7 +3,6 @@
 
 import sys
 import os
-import random
 from typing import List, Dict, Any
 
 # Add src directory to path
@@ -35,9 +34,8 @@ class WizardCLI:
             mountain, mountain, tropical_grove, volcanic_peak
         ]
         
-        # Build balanced decks (20 cards each)
+        # Build balanced decks (20 cards each), ready() shuffles them with the game's seeded RNG
         deck = creature_pool * 2 + land_pool
-        random.shuffle(deck)
         
         self.game = GameEngine('Player1', 'Player2', deck, deck.copy())
         self.current_turn_drawn = False
@@ -86,7 +84,7 @@ class WizardCLI:
         player = state['active_player']
         
         # Find the other player
-        all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat']]
+        all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat', 'rng']]
         opponent = next((p for p in all_players if p != player), None)
         
         print(f"\nGAME STATUS")
@@ -121,7 +119,7 @@ class WizardCLI:
         if self.is_mulligan_available(player, turn):
             print("[MULLIGAN AVAILABLE] Use 'mulligan' to redraw your opening hand")
         
-        print(f"\nAvailable commands: land, play, tap, attack, block, end, mulligan, hand, board, state, graveyard, deck")
+        print(f"\nAvailable commands: land, play, tap, pay, attack, block, suggest, end, mulligan, hand, board, state, graveyard, deck")
         print(f"Admin commands: mana, admindraw")
         
     def is_mulligan_available(self, player: str, turn: int) -> bool:
@@ -139,33 +137,12 @@ class WizardCLI:
         
     def perform_mulligan(self, player: str):
         """Perform mulligan: shuffle hand back into deck and draw 7 new cards."""
-        state = self.game.get_game_state()
-        hand = state[player].get('hand', {})
-        deck = state[player].get('deck', [])
-        
-        # Move all hand cards back to deck
-        for card_id, card_data in hand.items():
-            deck.append(card_data)
-        
-        # Clear hand
-        state[player]['hand'] = {}
-        
-        # Shuffle deck
-        random.shuffle(deck)
-        state[player]['deck'] = deck
-        
-        # Draw 7 new cards
-        for _ in range(7):
-            if deck:
-                card_id = str(max([int(k) for k in state[player].get('hand', {}).keys()] + [0]) + 1)
-                state[player]['hand'][card_id] = deck.pop(0)
+        # Hand goes back into the deck, shuffled with the game's seeded RNG
+        self.game.mulligan(player, 7)
         
         # Mark mulligan as used for this player
         self.mulligan_available[player] = False
         
-        # Save state
-        self.game._save_state(state)
-        
         print(f"{player} mulliganed and drew 7 new cards")
         
     def is_dual_land(self, player: str, land_id: str) -> bool:
@@ -204,29 +181,13 @@ class WizardCLI:
         
     def tap_dual_land(self, player: str, land_id: str, chosen_color: str):
         """Tap a dual land for the chosen color of mana."""
-        state = self.game.get_game_state()
-        lands = state[player].get('lands', {})
-        
-        if land_id not in lands:
-            raise Exception(f"Land {land_id} not found")
-            
-        land = lands[land_id]
-        if land.get('tapped', 0) == 1:
-            raise Exception(f"Land {land_id} is already tapped")
-            
         # Validate color choice
         available_colors = self.get_dual_land_colors(player, land_id)
         if chosen_color not in available_colors:
             raise Exception(f"Invalid color '{chosen_color}' for this land. Choose from: {', '.join(available_colors)}")
             
-        # Tap the land
-        land['tapped'] = 1
-        
-        # Add the chosen mana
-        state[player][f'{chosen_color}_mana'] += 1
-        
-        # Save state
-        self.game._save_state(state)
+        if not self.game.tap_land(player, land_id, chosen_color):
+            raise Exception(f"Land {land_id} can't be tapped")
         
     def show_hand(self):
         """Display player's hand with IDs."""
@@ -238,6 +199,9 @@ class WizardCLI:
             print("Your hand is empty")
             return
             
+        # Whole hand in one query instead of a check_mana_cost per card
+        castable = self.game.castability(player)
+        
         print(f"\n{player}'s Hand:")
         print("-" * 50)
         for card_id, card_data in hand.items():
@@ -247,14 +211,21 @@ class WizardCLI:
             stats = ""
             if card_data.get('attack') is not None:
                 stats = f" [{card_data['attack']}/{card_data['defence']}]"
-            print(f"{card_type} {card_id}: {card_data['name']}{stats} - {cost}")
+            status = ""
+            if card_id in castable:
+                kind, taps = castable[card_id]
+                if kind == "now":
+                    status = " (castable)"
+                elif kind == "tap":
+                    status = f" (tap {', '.join(land_id for land_id, _ in taps)})"
+            print(f"{card_type} {card_id}: {card_data['name']}{stats} - {cost}{status}")
             
     def show_board(self):
         """Display battlefield state."""
         state = self.game.get_game_state()
         
         # Get all player names dynamically
-        all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat']]
+        all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat', 'rng']]
         
         for player_name in all_players:
             is_active = player_name == state['active_player']
@@ -339,7 +310,7 @@ class WizardCLI:
         print(f"Active Player: {state['active_player']}")
         
         # Get all player names dynamically
-        all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat']]
+        all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat', 'rng']]
         
         for player in all_players:
             print(f"\n{player}:")
@@ -382,7 +353,7 @@ class WizardCLI:
         self.game.clear_mana_pool(current_player)
         
         # End turn and switch - find the other player dynamically
-        all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat']]
+        all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat', 'rng']]
         next_player = next((p for p in all_players if p != current_player), current_player)
         # Mark end of current player's turn in engine
         self.game.end_turn(current_player)
@@ -420,6 +391,18 @@ class WizardCLI:
                 self.game.play_creature(player, args[0])
                 print(f"Played creature {args[0]}")
                 
+            elif cmd == 'pay':
+                # Tap the right lands and pay for every listed card
+                if not args:
+                    print("[!] Usage: pay <id1> <id2> ...")
+                    return True
+                plan = self.game.auto_pay(player, args)
+                if plan is None:
+                    print("[!] Not enough mana for those cards")
+                    return True
+                taps = [f"{land_id} for {color}" for land_id, color in plan.taps]
+                print(f"Tapped {', '.join(taps) if taps else 'nothing'}, paid for {', '.join(args)}")
+                
             elif cmd == 'tap':
                 if not args:
                     print("Error: Usage: tap <id> [color]")
@@ -471,7 +454,7 @@ class WizardCLI:
                     
                 # Find opponent dynamically
                 state = self.game.get_game_state()
-                all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat']]
+                all_players = [key for key in state.keys() if key not in ['active_player', 'turn', 'phase', 'turn_number', 'current_player', 'battlefield', 'lands_played_this_turn', 'combat', 'rng']]
                 opponent = next((p for p in all_players if p != player), player)
                 self.game.declare_blockers(opponent, block_assignments)
                 
@@ -487,6 +470,20 @@ class WizardCLI:
                     print(f"\nGAME OVER. {winner} wins.")
                     return False
                     
+            elif cmd == 'suggest':
+                # Best blocks for the defending player against the declared attackers
+                if not state['combat']['attackers']:
+                    print("[!] No attackers declared")
+                    return True
+                blocks, outcome = self.game.suggest_blocks()
+                if blocks:
+                    pairs = [f"{attacker_id} {blocker_id}" for attacker_id, blocker_ids in blocks.items() for blocker_id in blocker_ids]
+                    print(f"Suggested: block {' '.join(pairs)}")
+                else:
+                    print("Suggested: no blocks")
+                print(f"  Life loss: {outcome['life_loss']}, attackers dying: {int(outcome['attacker_deaths'].sum())}, "
+                      f"blockers dying: {int(outcome['blocker_deaths'].sum())}")
+                
             elif cmd == 'end':
                 return not self.end_turn()
                 
@@ -527,7 +524,7 @@ class WizardCLI:
                     amount = int(args[1])
                     if color in ['green', 'blue', 'red']:
                         state[player][f'{color}_mana'] += amount
-                        self.game._save_state(state)
+                        self.game.set_game_state(state)
                         print(f"Added {amount} {color} mana")
                     else:
                         print("[!] Invalid color. Use: green, blue, red")
@@ -548,7 +545,7 @@ class WizardCLI:
                             # Move card to hand
                             card_id = str(max([int(k) for k in state[player]['hand'].keys()] + [0]) + 1)
                             state[player]['hand'][card_id] = deck.pop(i)
-                            self.game._save_state(state)
+                            self.game.set_game_state(state)
                             print(f"Drew {card['name']} (ID: {card_id})")
                             return True
                     print(f"[!] Card '{target_name}' not found in deck")
@@ -559,7 +556,7 @@ class WizardCLI:
                     
             else:
                 print(f"[!] Unknown command: {cmd}")
-                print("Available: land, play, tap, attack, block, end, mulligan, hand, board, state, graveyard, deck")
+                print("Available: land, play, tap, pay, attack, block, suggest, end, mulligan, hand, board, state, graveyard, deck")
                 
         except Exception as e:
             print(f"Error: {str(e)}")
@@ -596,8 +593,10 @@ class WizardCLI:
                     print("  land <id>     - Play land")
                     print("  play <id>     - Play creature")
                     print("  tap <id> [color] - Tap for mana (dual lands need color)")
+                    print("  pay <ids>     - Tap lands and pay for cards")
                     print("  attack <ids>  - Declare attackers")
                     print("  block <pairs> - Declare blockers")
+                    print("  suggest       - Suggest blocks against the attackers")
                     print("  end           - End turn")
                     print("  mulligan      - Redraw opening hand (first turn only)")
                     print("  hand          - Show your hand")
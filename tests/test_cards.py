@@ -0,0 +1,96 @@
+"""Tests for card definitions and per-copy records (modules/cards.py, game.py)."""
+
+import copy
+
+from card_index import forest, island, mountain, skeleton, forest_bear, goblin_raider, dragon_whelp
+from game import CARD_RECORD_FIELDS, GameEngine
+
+
+def _engine():
+    """A readied game whose decks repeat the same card objects, like the CLI's creature_pool * 2."""
+    creature_pool = [skeleton, forest_bear, goblin_raider, dragon_whelp]
+    land_pool = [forest, forest, island, mountain]
+    deck = creature_pool * 2 + land_pool
+    engine = GameEngine("P1", "P2", deck, deck.copy(), store="memory", seed=4)
+    engine.logging = False
+    engine.ready()
+    for _ in range(4):
+        engine.draw_card("P1")
+    engine.commit()
+    return engine
+
+
+def _records(player_data):
+    yield from player_data["deck"]
+    yield from player_data["hand"].values()
+    yield from player_data["graveyard"]
+    for zone in ("creatures", "lands"):
+        for entry in player_data[zone].values():
+            yield entry["card"]
+
+
+def test_instances_share_the_definition():
+    first, second = forest_bear.instantiate(), forest_bear.instantiate()
+    assert first is not forest_bear and first.definition is second.definition is forest_bear.definition
+    second.attack += 1
+    assert first.attack == forest_bear.attack
+    assert second.to_record()["def_id"] == "forest_bear"
+
+
+def test_repeated_cards_get_unique_ids():
+    state = _engine()._load_state()
+    ids = [record["id"] for player in ("P1", "P2") for record in _records(state[player])]
+    assert len(ids) == 24
+    assert len(set(ids)) == len(ids)
+
+
+def test_state_holds_records_and_definitions():
+    state = _engine()._load_state()
+    assert set(state["definitions"]) == {"skeleton", "forest_bear", "goblin_raider", "dragon_whelp",
+                                         "forest", "island", "mountain"}
+    assert state["definitions"]["dragon_whelp"]["effect"] == "flying"
+    for record in _records(state["P1"]):
+        assert set(record) <= set(CARD_RECORD_FIELDS)
+        assert record["def_id"] in state["definitions"]
+
+
+def test_get_game_state_expands_records():
+    engine = _engine()
+    live = copy.deepcopy(engine._load_state())
+    view = engine.get_game_state()
+    assert "definitions" not in view
+    for card in _records(view["P1"]):
+        assert {"name", "type", "effect", "id", "def_id"} <= set(card)
+    # The live state still holds records
+    assert engine._load_state() == live
+
+
+def test_set_game_state_compacts_records():
+    engine = _engine()
+    live = copy.deepcopy(engine._load_state())
+    engine.set_game_state(engine.get_game_state())
+    engine.commit()
+    assert engine._load_state() == live
+
+    # An edited copy changes the record, not the shared definition
+    view = engine.get_game_state()
+    card_id, card = next((card_id, card) for card_id, card in view["P1"]["hand"].items() if card["type"] == "Creature")
+    card["attack"] += 5
+    engine.set_game_state(view)
+    state = engine._load_state()
+    record = state["P1"]["hand"][card_id]
+    assert set(record) <= set(CARD_RECORD_FIELDS)
+    assert record["attack"] == card["attack"]
+    assert state["definitions"] == live["definitions"]
+
+
+def test_full_card_dicts_are_compacted():
+    engine = _engine()
+    view = engine.get_game_state()
+    # An old save: full card dicts without def_id
+    card = view["P1"]["deck"][0]
+    view["P1"]["deck"][0] = {key: value for key, value in card.items() if key != "def_id"}
+    engine.set_game_state(view)
+    record = engine._load_state()["P1"]["deck"][0]
+    assert set(record) <= set(CARD_RECORD_FIELDS)
+    assert engine._load_state()["definitions"][record["def_id"]]["name"] == card["name"]
@@ -0,0 +1,35 @@
+"""Tests for the precompiled card catalog (modules/catalog.py)."""
+
+import pytest
+
+from modules.catalog import CatalogError, build_catalog, get_catalog, validate_effect
+from modules.cards import LandCards
+from selfplay import build_deck
+
+
+def test_validate_effect():
+    assert validate_effect("entertap; tap? gen red/green") == []
+    assert validate_effect("tap? gen purple") == ["unknown mana color 'purple' in 'tap? gen purple'"]
+    assert validate_effect("fly") == ["unknown action or keyword 'fly' in 'fly'"]
+
+
+def test_invalid_effect_fails_the_build():
+    card = LandCards(name="Swamp", generic_mana=0, sp_mana="", description="", effect="tap? gen black")
+    with pytest.raises(CatalogError) as error:
+        build_catalog([card])
+    assert error.value.problems == ["Swamp: unknown mana color 'black' in 'tap? gen black'"]
+
+
+def test_effect_data():
+    catalog = get_catalog()
+    assert set(catalog.effect_data("wild_highlands")["colors"]) == {"red", "green"}
+    assert catalog.effect_data("goblin_raider")["colors"] == []
+
+
+def test_decks_are_built_from_the_catalog():
+    catalog = get_catalog()
+    deck = build_deck(["forest", "forest", "goblin_raider"])
+    assert [card.def_id for card in deck] == ["forest", "forest", "goblin_raider"]
+    assert all(card is catalog[card.def_id] for card in deck)
+    with pytest.raises(ValueError):
+        build_deck(["black_lotus"])
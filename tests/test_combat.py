@@ -0,0 +1,116 @@
+"""Tests for the vectorized combat evaluation (modules/combat.py)."""
+
+import numpy as np
+
+from headless import HeadlessGame
+from modules import combat
+from modules.combat import CombatBoard, best_blocks, block_assignments, combat_board, evaluate_blocks
+from modules.moves import ATTACK, BLOCK, MAIN
+
+
+def _block_decisions(game):
+    """Play game with its seat agents, yielding at every block decision before the agent blocks."""
+    while game.decision is not None:
+        kind, player = game.decision
+        agent = game.agents[player]
+        if kind == MAIN:
+            agent.main_phase(game, player)
+            game.decision = game.end_main(player)
+        elif kind == ATTACK:
+            game.decision = game.attack(player, agent.choose_attackers(game, player))
+        else:
+            yield player
+            game.decision = game.block(player, agent.choose_blocks(game, player))
+
+
+def _fight(game, defender, blocks):
+    """Deaths and life loss of running blocks through the engine on a copy of game."""
+    sim = game.clone()
+    state = sim.state
+    attacker = state["current_player"]
+    before = {player: set(state[player]["creatures"]) for player in (attacker, defender)}
+    health = state[defender]["health"]
+    sim.declare_blockers(defender, blocks)
+    sim.calculate_combat_damage()
+    sim.resolve_damage_queue()
+    state = sim.state
+    dead = {player: before[player] - set(state[player]["creatures"]) for player in before}
+    return dead[attacker], dead[defender], health - state[defender]["health"]
+
+
+def test_outcomes_match_the_engine(decks):
+    checked = 0
+    for seed in range(6):
+        game = HeadlessGame(*decks, seed=seed)
+        game.setup()
+        for defender in _block_decisions(game):
+            state = game.state
+            board = combat_board(state, defender, game.zones(defender))
+            if not board.blocker_ids:
+                continue
+            assignments = block_assignments(board, max_blockers=2)
+            outcome = evaluate_blocks(board, assignments)
+            for row, assignment in enumerate(assignments[:40]):
+                attackers_dead, blockers_dead, life_loss = _fight(game, defender, board.blocks(assignment))
+                assert attackers_dead == {card_id for card_id, dead in
+                                          zip(board.attacker_ids, outcome["attacker_deaths"][row]) if dead}
+                assert blockers_dead == {card_id for card_id, dead in
+                                         zip(board.blocker_ids, outcome["blocker_deaths"][row]) if dead}
+                assert life_loss == outcome["life_loss"][row]
+                checked += 1
+    assert checked > 50
+
+
+def _board(attackers, blockers, health=20):
+    """CombatBoard from (attack, defence, keywords) rows."""
+    attackers = np.array(attackers, dtype=np.int64).reshape(-1, 3)
+    blockers = np.array(blockers, dtype=np.int64).reshape(-1, 3)
+    return CombatBoard([str(index) for index in range(len(attackers))],
+                       [str(100 + index) for index in range(len(blockers))],
+                       attackers, blockers, blockers[:, 0] + blockers[:, 1], health)
+
+
+def test_small_boards_are_enumerated():
+    board = _board([(2, 2, 0), (3, 3, 0)], [(1, 1, 0), (4, 4, 0)])
+    assignments = block_assignments(board, max_blockers=None)
+    assert len(assignments) == 9
+    assert assignments[0].tolist() == [-1, -1]
+    assert len(block_assignments(board, max_blockers=1)) == 7
+
+
+def test_wide_boards_are_pruned(monkeypatch):
+    monkeypatch.setattr(combat, "MAX_ASSIGNMENTS", 1 << 12)
+    monkeypatch.setattr(combat, "BEAM_WIDTH", 1 << 6)
+    board = _board([(attack, 3, 0) for attack in range(1, 9)], [(2, defence, 0) for defence in range(1, 9)], health=10)
+    assignments = block_assignments(board, max_blockers=1)
+    # 1,441,729 legal assignments, a bounded set of them is kept
+    assert 0 < len(assignments) <= combat.MAX_ASSIGNMENTS
+    assert assignments.shape[1] == 8
+    assert assignments[0].tolist() == [-1] * 8
+    for row in assignments:
+        blocked = row[row >= 0]
+        assert len(blocked) == len(set(blocked.tolist()))
+
+    # Unblocked the attackers deal 36, the kept assignments include ones that survive
+    outcome = evaluate_blocks(board, assignments)
+    assert outcome["life_loss"][outcome["score"].argmax()] < 10
+
+
+def test_best_blocks_on_a_wide_board(decks, monkeypatch):
+    monkeypatch.setattr(combat, "MAX_ASSIGNMENTS", 1 << 8)
+    monkeypatch.setattr(combat, "BEAM_WIDTH", 1 << 4)
+    for seed in range(3):
+        game = HeadlessGame(*decks, seed=seed)
+        game.setup()
+        for defender in _block_decisions(game):
+            blocks, outcome = best_blocks(game.state, defender, zones=game.zones(defender))
+            assert _fight(game, defender, blocks)[2] == outcome["life_loss"]
+
+
+def test_pruned_boards_keep_a_surviving_block():
+    # Double blocks that kill attackers score best one blocker at a time,
+    # only chump blocking all twelve keeps the defender alive
+    board = _board([(attack, 3, 0) for attack in range(1, 13)], [(2, 2, 0)] * 12, health=10)
+    assignments = block_assignments(board, max_blockers=None)
+    outcome = evaluate_blocks(board, assignments)
+    assert outcome["life_loss"][outcome["score"].argmax()] < 10
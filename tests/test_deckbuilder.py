@@ -0,0 +1,64 @@
+"""Tests for the genetic deck optimizer (deckbuilder.py)."""
+
+import pytest
+
+from deckbuilder import DeckOptimizer, DeckRules, deck_key, deck_size
+from selfplay import DECKS
+
+RULES = [
+    DeckRules(),
+    DeckRules(size=(20, 20), colors=("green", "red")),
+    DeckRules(size=(20, 24), max_colors=1, min_sources=6),
+    DeckRules(size=(24, 30), colors=("blue", "green"), max_copies=2, curve={3: 4, 4: 3}),
+]
+
+
+@pytest.mark.parametrize("rules", RULES)
+def test_repaired_decks_are_legal(rules):
+    optimizer = DeckOptimizer(rules=rules, seed=3, workers=1)
+    for deck in [dict(preset) for preset in DECKS.values()] + [{"dragon_whelp": 9}, {}]:
+        repaired = optimizer.repair(deck)
+        assert rules.check(repaired, optimizer.pool) == []
+        assert rules.size[0] <= deck_size(repaired) <= rules.size[1]
+
+
+@pytest.mark.parametrize("rules", RULES)
+def test_evolved_decks_are_legal(rules):
+    optimizer = DeckOptimizer(rules=rules, seed=5, workers=1)
+    decks = [optimizer.random_deck() for _ in range(4)]
+    decks += [optimizer.mutate(decks[0]), optimizer.crossover(decks[1], decks[2])]
+    for deck in decks:
+        assert rules.check(deck, optimizer.pool) == []
+
+
+def test_impossible_rules_fail_loudly():
+    # Three copies each of the five blue creatures can't fill half of 40 cards
+    optimizer = DeckOptimizer(rules=DeckRules(size=(40, 40), colors=("blue",)), seed=1, workers=1)
+    with pytest.raises(ValueError):
+        optimizer.repair(dict(DECKS["blue_red"]))
+
+
+def test_check_reports_problems():
+    optimizer = DeckOptimizer(seed=1, workers=1)
+    problems = DeckRules(size=(20, 20)).check({"dragon_whelp": 5, "island": 1}, optimizer.pool)
+    assert "6 cards, needs 20-20" in problems
+    assert "5 copies of dragon_whelp, at most 3" in problems
+
+
+def test_deck_key_ignores_order_and_empty_entries():
+    assert deck_key({"forest": 6, "slime": 3}) == deck_key({"slime": 3, "forest": 6, "island": 0})
+    assert deck_key({"forest": 6, "slime": 3}) != deck_key({"forest": 6, "slime": 2})
+
+
+def test_fitness_is_cached_by_deck_key():
+    optimizer = DeckOptimizer(gauntlet=["green_red"], games=2, seed=2, workers=1, max_turns=20)
+    deck = dict(DECKS["blue_red"])
+    first = optimizer.evaluate([deck])
+    played = optimizer.games_played
+    assert played == 2
+
+    # The same list in another order, twice in one batch, plays no new games
+    reordered = dict(reversed(list(deck.items())))
+    assert optimizer.evaluate([reordered, deck]) == first * 2
+    assert optimizer.games_played == played
+    assert list(optimizer.cache) == [deck_key(deck)]
@@ -0,0 +1,112 @@
+"""Tests for the effect compiler and interpreter (modules/effects.py)."""
+
+import pytest
+
+from modules.catalog import get_catalog
+from modules.cards import SummonCard
+from modules.effects import OP_INC, compile_effect, resolve_expression, run
+from modules.parser import EffectParser, effect_cache
+from modules.utils import execute_card
+
+FIELDS = {"att": "attack", "end": "defence"}
+
+SAMPLES = [
+    "attack? inc att 2; dec end 1",
+    "block? inc end 2",
+    "enter? inc att 1; inc end 1",
+    "enter? inc att 1; dec end 1",
+    "inc att (graveyard count Skeleton)",
+    "dec end 2; inc att 3",
+    "haste; flying",
+    "tap? gen green",
+]
+
+
+def _value(value, zones):
+    if isinstance(value, (tuple, list)):
+        return resolve_expression(tuple(value), zones)
+    return value
+
+
+def _apply(stats, inst, zones, actions=("inc", "dec")):
+    key = FIELDS.get(inst.get("field"), inst.get("field"))
+    if inst.get("action") not in actions or key not in stats:
+        return
+    value = _value(inst["value"], zones)
+    stats[key] += value if inst["action"] == "inc" else -value
+
+
+def reference_static(instructions, stats, zones):
+    """The trigger-less inc/dec instructions applied one by one, as execute_card did before compiling."""
+    for inst in instructions:
+        if not inst.get("trigger"):
+            _apply(stats, inst, zones)
+    return stats
+
+
+def reference_trigger(instructions, trigger, stats, zones):
+    """A trigger's instructions, then the increases grouped after it, as the engine applied them."""
+    for inst in instructions:
+        if inst.get("trigger") in (trigger, trigger.replace("?", "")):
+            _apply(stats, inst, zones)
+    last_trigger = None
+    for inst in instructions:
+        if inst.get("trigger"):
+            last_trigger = inst["trigger"]
+        elif last_trigger == trigger:
+            _apply(stats, inst, zones, actions=("inc",))
+    return stats
+
+
+def _effects():
+    catalog = get_catalog()
+    effects = {catalog[def_id].effect or "" for def_id in catalog.names.values()}
+    return sorted(effects | set(SAMPLES))
+
+
+ZONES = {"graveyard": [SummonCard(name="Skeleton", generic_mana=1, sp_mana="", description="",
+                                  att=1, end=1, effect="")] * 2, "deck": []}
+
+
+@pytest.mark.parametrize("effect", _effects())
+def test_program_matches_the_parsed_instructions(effect):
+    instructions = EffectParser().parse(effect)
+    program = compile_effect(instructions)
+
+    expected = reference_static(instructions, {"attack": 2, "defence": 3}, ZONES)
+    assert run(program.static, {"attack": 2, "defence": 3}, ZONES) == expected
+
+    for trigger in ("attack?", "block?", "enter?", "tap?"):
+        expected = reference_trigger(instructions, trigger, {"attack": 2, "defence": 3}, ZONES)
+        assert run(program.for_trigger(trigger), {"attack": 2, "defence": 3}, ZONES) == expected
+
+
+def test_graveyard_count_expression():
+    ops = effect_cache.get("inc att (graveyard count Skeleton)").program.static
+    assert run(ops, {"attack": 1, "defence": 1}, ZONES) == {"attack": 3, "defence": 1}
+    assert run(ops, {"attack": 1, "defence": 1}, {"graveyard": []}) == {"attack": 1, "defence": 1}
+    assert run(ops, {"attack": 1, "defence": 1}) == {"attack": 1, "defence": 1}
+
+
+def test_grouped_trigger_effects():
+    program = effect_cache.get("enter? inc att 1; inc end 1").program
+    # The follow-up has no trigger of its own, so it is static as well
+    assert [op[:3] for op in program.static] == [(OP_INC, "defence", 1)]
+    assert [op[0] for op in program.for_trigger("enter?")] == [OP_INC, OP_INC]
+    assert program.for_trigger("attack?") == ()
+
+
+def test_trace_reports_every_opcode():
+    seen = []
+    program = effect_cache.get("attack? inc att 2; dec end 1").program
+    run(program.for_trigger("attack?"), {"attack": 1, "defence": 4}, trace=lambda op, old, new: seen.append((old, new)))
+    # Only increases are grouped with a trigger, the decrease is reported unchanged
+    assert seen == [(1, 3), (None, None)]
+
+
+def test_execute_card_applies_static_effects():
+    card = SummonCard(name="Bone Pile", generic_mana=1, sp_mana="", description="",
+                      att=1, end=3, effect="inc att (graveyard count Skeleton); dec end 1")
+    executed = execute_card(card, ZONES)
+    assert (executed.attack, executed.defence) == (3, 2)
+    assert (card.attack, card.defence) == (1, 3)
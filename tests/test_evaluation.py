@@ -0,0 +1,69 @@
+"""Tests for the incremental board evaluation (modules/evaluation.py)."""
+
+from headless import HeadlessGame
+from modules.evaluation import Evaluation, evaluate
+from modules.moves import ATTACK, MAIN
+
+
+def _decisions(game):
+    """Play game to the end with its seat agents, yielding after every decision."""
+    while game.decision is not None:
+        kind, player = game.decision
+        agent = game.agents[player]
+        if kind == MAIN:
+            agent.main_phase(game, player)
+            game.decision = game.end_main(player)
+        elif kind == ATTACK:
+            game.decision = game.attack(player, agent.choose_attackers(game, player))
+        else:
+            game.decision = game.block(player, agent.choose_blocks(game, player))
+        yield
+
+
+def test_incremental_terms_match_fresh_ones(decks):
+    for seed in range(4):
+        game = HeadlessGame(*decks, seed=seed)
+        game.setup()
+        players = (game.player1, game.player2)
+        evaluation = game.evaluation()
+        for _ in _decisions(game):
+            terms = {player: dict(game.evaluation().terms[player]) for player in players}
+            game.commit()
+            assert terms == Evaluation(game.state, players).terms
+            assert game.evaluate(game.player1) == evaluate(game.state, players, game.player1)
+        # One evaluation followed the whole game
+        assert game.evaluation() is evaluation
+
+
+def _state():
+    definitions = {
+        "skeleton": {"name": "Skeleton", "type": "Creature", "effect": ""},
+        "army": {"name": "Skeleton Army", "type": "Creature", "effect": "inc att (graveyard count Skeleton)"},
+    }
+    player = {"deck": [], "graveyard": [], "hand": {}, "creatures": {}, "lands": {}, "health": 20}
+    return {"definitions": definitions, "P1": player, "P2": dict(player, graveyard=[], hand={})}
+
+
+def test_graveyard_synergy_follows_both_zones():
+    state = _state()
+    evaluation = Evaluation(state, ("P1", "P2"))
+
+    evaluation.card("P1", "graveyard", 0, {"def_id": "skeleton"})
+    evaluation.card("P1", "graveyard", 1, {"def_id": "skeleton"})
+    assert evaluation.terms["P1"]["graveyard_synergy"] == 0
+    evaluation.card("P1", "hand", "5", {"def_id": "army"})
+    assert evaluation.terms["P1"]["graveyard_synergy"] == 2
+    assert evaluation.terms["P1"]["hand"] == 1
+
+    # The army is cast, its hand slot empties
+    evaluation.card("P1", "hand", "5", None)
+    assert evaluation.terms["P1"]["graveyard_synergy"] == 0
+
+    state["P1"]["graveyard"] = [{"def_id": "skeleton"}, {"def_id": "skeleton"}]
+    assert evaluation.terms == Evaluation(state, ("P1", "P2")).terms
+
+
+def test_score_is_symmetric():
+    state = _state()
+    state["P2"]["health"] = 14
+    assert evaluate(state, ("P1", "P2"), "P1") == -evaluate(state, ("P1", "P2"), "P2") == 6
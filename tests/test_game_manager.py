@@ -0,0 +1,96 @@
+"""Tests for hosting many games in one process (game_manager.py)."""
+
+import copy
+
+import pytest
+
+from game_manager import GameManager
+from modules.storage import SQLiteStore
+
+
+def _manager(tmp_path, **options):
+    return GameManager(root=str(tmp_path), **options)
+
+
+def test_least_recently_used_game_is_evicted(decks, tmp_path):
+    manager = _manager(tmp_path, max_games=2)
+    for game_id in ("a", "b"):
+        manager.create_game(game_id, "P1", "P2", list(decks[0]), list(decks[1]), seed=1)
+    manager.get_game("a")
+    manager.create_game("c", "P1", "P2", list(decks[0]), list(decks[1]), seed=1)
+    assert manager.loaded_games() == ["a", "c"]
+    assert len(manager) == 3 and "b" in manager
+
+
+def test_evicted_game_reloads_its_state(decks, tmp_path):
+    manager = _manager(tmp_path, max_games=1)
+    engine = manager.create_game("a", "P1", "P2", list(decks[0]), list(decks[1]), seed=3)
+    engine.draw_card("P1")
+    # Folds the deck's top pointer into the state
+    engine.commit()
+    state = copy.deepcopy(engine._load_state())
+    rng_state = engine.rng.getstate()
+
+    manager.create_game("b", "P1", "P2", list(decks[0]), list(decks[1]), seed=3)
+    assert manager.loaded_games() == ["b"]
+    reloaded = manager["a"]
+    assert reloaded is not engine
+    assert reloaded._load_state() == state
+    assert reloaded.rng.getstate() == rng_state
+    # Same seed, same shuffle
+    assert manager["b"]._load_state()["P2"]["deck"] == state["P2"]["deck"]
+
+
+def test_idle_games_expire(decks, tmp_path):
+    manager = _manager(tmp_path, ttl=60)
+    manager.create_game("a", "P1", "P2", list(decks[0]), list(decks[1]))
+    assert manager.evict_idle() == []
+    assert manager.evict_idle(now=float("inf")) == ["a"]
+    assert manager.loaded_games() == [] and "a" in manager
+
+
+def test_index_survives_a_restart(decks, tmp_path):
+    manager = _manager(tmp_path)
+    manager.create_game("a", "P1", "Bob", list(decks[0]), list(decks[1]), seed=5)
+    manager.create_game("b", "P1", "P2", list(decks[0]), list(decks[1]), seed=5)
+    assert manager.remove_game("b")
+    manager.close()
+
+    restarted = _manager(tmp_path)
+    assert "a" in restarted and "b" not in restarted
+    assert restarted["a"].player2 == "Bob"
+    with pytest.raises(KeyError):
+        restarted.get_game("b")
+    with pytest.raises(ValueError):
+        restarted.create_game("a", "P1", "P2", [], [])
+    with pytest.raises(ValueError):
+        restarted.create_game("../x", "P1", "P2", [], [])
+
+
+def test_named_store(decks, tmp_path):
+    manager = _manager(tmp_path, max_games=1, store_factory="sqlite")
+    engine = manager.create_game("a", "P1", "P2", list(decks[0]), list(decks[1]), seed=6)
+    assert isinstance(engine.session.store, SQLiteStore)
+    state = copy.deepcopy(engine._load_state())
+    manager.create_game("b", "P1", "P2", list(decks[0]), list(decks[1]), seed=6)
+    assert manager["a"]._load_state() == state
+    manager.close()
+
+
+@pytest.mark.parametrize("store, suffix", [("json", ".json"), ("journal", ".json"), ("snapshot", ".wzs"),
+                                           ("sqlite", ".db")])
+def test_state_files_match_the_store(tmp_path, store, suffix):
+    manager = _manager(tmp_path, store_factory=store)
+    assert manager.store_path("a") == str(tmp_path / f"a{suffix}")
+    assert _manager(tmp_path, store_factory=store, suffix=".state").store_path("a").endswith("a.state")
+    with pytest.raises(ValueError):
+        _manager(tmp_path, store_factory="csv")
+
+
+def test_removed_games_drop_their_files(decks, tmp_path):
+    manager = _manager(tmp_path, store_factory="snapshot")
+    manager.create_game("a", "P1", "P2", list(decks[0]), list(decks[1]), seed=6)
+    manager.commit_all()
+    assert (tmp_path / "a.wzs").exists()
+    assert manager.remove_game("a")
+    assert not (tmp_path / "a.wzs").exists()
@@ -0,0 +1,44 @@
+"""Tests for headless self-play games (headless.py)."""
+
+from headless import HeadlessGame
+
+
+def test_seeded_games_repeat(decks):
+    first = HeadlessGame(*decks, seed=21)
+    second = HeadlessGame(*decks, seed=21)
+    first.play_game()
+    second.play_game()
+    assert first.result() == second.result()
+
+
+def test_clone_leaves_the_parent_rng_alone(decks):
+    game = HeadlessGame(*decks, seed=5)
+    game.setup()
+    state = game.rng.getstate()
+    clone = game.clone()
+    assert game.rng.getstate() == state
+    assert clone.rng is not game.rng
+    # Clones play out on their own copy of the state
+    clone.play_out()
+    assert game.rng.getstate() == state
+    assert game.decision is not None
+
+
+def test_clones_draw_differently(decks):
+    game = HeadlessGame(*decks, seed=5)
+    game.setup()
+    draws = {tuple(game.clone().rng.random() for _ in range(4)) for _ in range(8)}
+    assert len(draws) == 8
+    # The same clone sequence from the same seed repeats
+    again = HeadlessGame(*decks, seed=5)
+    again.setup()
+    assert {tuple(again.clone().rng.random() for _ in range(4)) for _ in range(8)} == draws
+
+
+def test_no_log_lines_are_built(decks, monkeypatch):
+    def fail(self, message):
+        raise AssertionError(f"logged {message!r}")
+
+    monkeypatch.setattr(HeadlessGame, "_log", fail)
+    game = HeadlessGame(*decks, seed=8)
+    assert game.play_game(max_turns=30) in (game.player1, game.player2, None)
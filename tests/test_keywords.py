@@ -0,0 +1,40 @@
+"""Tests for keyword bit masks (modules/keywords.py)."""
+
+import numpy as np
+
+from modules.keywords import (FLYING, HASTE, REACH, UNBLOCKABLE, VIGILANT, ENTERTAP, can_block_keywords, has_haste,
+                              has_reach, is_flying, is_unblockable, is_vigilant, keyword_names, mask_enters_tapped,
+                              status_mask)
+from modules.moves import card_keywords
+
+
+def test_status_mask():
+    assert status_mask("haste, Flying") == HASTE | FLYING
+    assert status_mask("notap") == VIGILANT
+    assert status_mask("") == 0
+    assert status_mask(None) == 0
+    assert keyword_names(FLYING | VIGILANT) == ["flying", "vigilant"]
+
+
+def test_predicates():
+    mask = FLYING | VIGILANT
+    assert is_flying(mask) and is_vigilant(mask)
+    assert not (has_reach(mask) or is_unblockable(mask) or has_haste(mask) or mask_enters_tapped(mask))
+    assert has_reach(REACH) and is_unblockable(UNBLOCKABLE) and has_haste(HASTE) and mask_enters_tapped(ENTERTAP)
+    # Masks in an array are answered one by one
+    assert is_flying(np.array([0, FLYING, FLYING | REACH])).tolist() == [False, True, True]
+
+
+def test_block_legality():
+    assert can_block_keywords(0, 0)
+    assert not can_block_keywords(FLYING, 0)
+    assert can_block_keywords(FLYING, REACH)
+    assert can_block_keywords(FLYING, FLYING)
+    assert not can_block_keywords(UNBLOCKABLE, FLYING | REACH)
+
+
+def test_card_keywords_add_status_to_the_definition():
+    definitions = {"dual": {"effect": "entertap; tap? gen red/blue"}, "bear": {"effect": ""}}
+    assert mask_enters_tapped(card_keywords(definitions, {"def_id": "dual"}))
+    assert card_keywords(definitions, {"def_id": "bear", "status": "haste"}) == HASTE
+    assert not card_keywords(definitions, {"def_id": "bear"}) & ENTERTAP
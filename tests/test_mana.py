@@ -0,0 +1,114 @@
+"""Tests for the mana payment solver (modules/mana.py)."""
+
+from game import GameEngine
+from modules import mana
+from modules.mana import (CAST_AFTER_TAPPING, CAST_NOW, LAND_COLORS, NOT_CASTABLE, castability, land_colors,
+                          solve_payment)
+from selfplay import build_deck
+
+
+def test_land_colors():
+    assert land_colors("tap? gen green") == ("green",)
+    assert land_colors("entertap; tap? gen red/green") == ("green", "red")
+    assert land_colors("haste") == ()
+    assert land_colors(None) == ()
+
+
+def test_colored_costs_take_the_lands_that_make_them():
+    lands = {"1": ("green", "red"), "2": ("green",)}
+    plan = solve_payment({}, lands, [(0, "red"), (0, "green")])
+    assert sorted(plan.taps) == [("1", "red"), ("2", "green")]
+    assert solve_payment({}, lands, [(0, "red"), (0, "red")]) is None
+
+
+def test_generic_costs_leave_dual_lands_untapped():
+    lands = {"1": ("blue", "red"), "2": ("green",), "3": ("green",)}
+    plan = solve_payment({}, lands, [(1, "green")])
+    assert sorted(land_id for land_id, _ in plan.taps) == ["2", "3"]
+
+
+def test_floating_mana_pays_first():
+    plan = solve_payment({"red": 1, "blue": 1}, {"1": ("green",)}, [(1, "red")])
+    assert plan.taps == []
+    assert plan.payments == [(1, "red", {"blue": 1})]
+
+
+def test_spend_covers_each_generic_cost():
+    lands = {"1": ("green",), "2": ("blue",), "3": ("red",)}
+    plan = solve_payment({}, lands, [(1, "red"), (1, None)])
+    assert len(plan.taps) == 3
+    for generic, _, spend in plan.payments:
+        assert sum(spend.values()) == generic
+        assert set(spend) <= set(LAND_COLORS)
+
+
+def test_auto_pay_taps_for_the_colors_needed():
+    deck = build_deck(["wild_highlands", "forest", "goblin_raider"])
+    engine = GameEngine("P1", "P2", list(deck), list(deck), store="memory", seed=2)
+    engine.ready()
+    for _ in range(3):
+        engine.draw_card("P1")
+    hand = {card["def_id"]: card_id for card_id, card in engine._load_state()["P1"]["hand"].items()}
+
+    engine.play_land("P1", hand["wild_highlands"])
+    engine.untap_step("P1")
+    # Goblin Raider costs one generic and one red
+    assert engine.castability("P1")[hand["goblin_raider"]][0] == NOT_CASTABLE
+    assert engine.auto_pay("P1", [hand["goblin_raider"]]) is None
+
+    engine.start_turn("P1")
+    engine.play_land("P1", hand["forest"])
+    assert engine.castability("P1")[hand["goblin_raider"]][0] == CAST_AFTER_TAPPING
+    plan = engine.auto_pay("P1", [hand["goblin_raider"]])
+    assert sorted(plan.taps) == sorted([(hand["wild_highlands"], "red"), (hand["forest"], "green")])
+    state = engine._load_state()
+    assert all(entry["card"]["tapped"] for entry in state["P1"]["lands"].values())
+    assert (state["P1"]["red_mana"], state["P1"]["green_mana"]) == (0, 0)
+
+
+def _state(hand, lands=(), pool=None):
+    """A one player game state with hand and lands given as def_ids."""
+    definitions = {
+        "forest": {"type": "Land", "generic_mana": 0, "sp_mana": "", "effect": "tap? gen green"},
+        "volcano": {"type": "Land", "generic_mana": 0, "sp_mana": "", "effect": "entertap; tap? gen red/blue"},
+        "bear": {"type": "Creature", "generic_mana": 1, "sp_mana": "green", "effect": ""},
+        "raider": {"type": "Creature", "generic_mana": 1, "sp_mana": "red", "effect": "haste"},
+        "giant": {"type": "Creature", "generic_mana": 5, "sp_mana": "green", "effect": ""},
+    }
+    player = {f"{color}_mana": (pool or {}).get(color, 0) for color in LAND_COLORS}
+    player["hand"] = {str(index): {"def_id": def_id} for index, def_id in enumerate(hand)}
+    player["lands"] = {f"L{index}": {"card": {"def_id": def_id, "tapped": False}} for index, def_id in enumerate(lands)}
+    return {"definitions": definitions, "P1": player}
+
+
+def test_castability_statuses():
+    state = _state(["bear", "raider", "giant", "forest"], lands=["forest", "volcano"], pool={"green": 2})
+    result = castability(state, "P1")
+    assert result["0"] == (CAST_NOW, [])
+    assert result["1"] == (CAST_AFTER_TAPPING, [("L1", "red")])
+    assert result["2"] == (NOT_CASTABLE, None)
+    # Lands in hand are played, not cast
+    assert "3" not in result
+
+
+def test_castability_solves_once_per_cost(monkeypatch):
+    calls = []
+
+    def counting(pool, lands, costs):
+        calls.append(costs)
+        return solve_payment(pool, lands, costs)
+
+    monkeypatch.setattr(mana, "solve_payment", counting)
+    state = _state(["bear", "bear", "bear", "raider", "raider"], lands=["forest", "forest"])
+    result = castability(state, "P1")
+    assert sorted(calls) == [[(1, "green")], [(1, "red")]]
+    assert [result[card_id][0] for card_id in "01234"] == [CAST_AFTER_TAPPING] * 3 + [NOT_CASTABLE] * 2
+    # Every card gets its own taps list
+    assert result["0"][1] is not result["1"][1]
+
+
+def test_castability_skips_tapped_lands():
+    state = _state(["bear"], lands=["forest", "forest"])
+    state["P1"]["lands"]["L0"]["card"]["tapped"] = True
+    assert castability(state, "P1")["0"] == (NOT_CASTABLE, None)
+    assert castability(state, "P1", availability=({"green": 1}, {"L1": ("green",)}))["0"][0] == CAST_AFTER_TAPPING
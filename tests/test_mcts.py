@@ -0,0 +1,42 @@
+"""Tests for the Monte Carlo tree search agent."""
+
+from headless import HeadlessGame
+from modules.ai import MCTSAgent, legal_moves, move_key
+
+
+def _game(decks, seed=3):
+    game = HeadlessGame(*decks, seed=seed)
+    game.setup()
+    return game
+
+
+def test_time_budget_runs_at_least_one_iteration(decks):
+    game = _game(decks)
+    agent = MCTSAgent(iterations=None, time_limit=1e-9, rollout_turns=2)
+    move = agent.search(game)
+    keys = {move_key(legal) for legal in legal_moves(game)}
+    assert move_key(move) in keys
+    assert agent.last_search is None or agent.last_search["iterations"] == 1
+
+
+def test_search_leaves_the_game_untouched(decks):
+    game = _game(decks)
+    before = (game.actions, game.state[game.player1]["health"], len(game.state[game.player1]["hand"]))
+    MCTSAgent(iterations=20, rollout_turns=2, seed=1).search(game)
+    assert (game.actions, game.state[game.player1]["health"], len(game.state[game.player1]["hand"])) == before
+
+
+def test_unseeded_agent_follows_the_game_rng(decks):
+    def play(seed):
+        game = HeadlessGame(*decks, seed=seed, agents=(MCTSAgent(iterations=10, rollout_turns=2), "greedy"))
+        game.max_turns = 6
+        game.play_game(max_turns=6)
+        return game.result()
+
+    assert play(5) == play(5)
+
+
+def test_seeded_searches_agree(decks):
+    first = MCTSAgent(iterations=30, rollout_turns=2, seed=9).search(_game(decks))
+    second = MCTSAgent(iterations=30, rollout_turns=2, seed=9).search(_game(decks))
+    assert move_key(first) == move_key(second)
@@ -0,0 +1,80 @@
+"""Tests for legal move generation (modules/moves.py)."""
+
+from itertools import islice
+
+from modules.moves import MAIN, ATTACK, PASS, attack_moves, cast_moves, legal_moves
+
+DEFINITIONS = {
+    "forest": {"name": "Forest", "type": "Land", "effect": "tap? gen green", "generic_mana": 0, "sp_mana": None},
+    "wild_highlands": {"name": "Wild Highlands", "type": "Land", "effect": "entertap; tap? gen red/green",
+                       "generic_mana": 0, "sp_mana": None},
+    "goblin_raider": {"name": "Goblin Raider", "type": "Creature", "effect": "", "generic_mana": 0, "sp_mana": "red"},
+    "forest_bear": {"name": "Forest Bear", "type": "Creature", "effect": "", "generic_mana": 1, "sp_mana": "green"},
+    "slime": {"name": "Slime", "type": "Creature", "effect": "", "generic_mana": 0, "sp_mana": None},
+}
+
+
+def _record(card_id, def_id, tapped=0):
+    return {"id": card_id, "def_id": def_id, "tapped": tapped, "status": "", "attack": 2, "defence": 2}
+
+
+def _state(hand=(), lands=(), creatures=()):
+    """P1 with these def_ids in hand, on the lands and as ready creatures."""
+    player = {"hand": {}, "lands": {}, "creatures": {}, "green_mana": 0, "blue_mana": 0, "red_mana": 0}
+    card_id = 0
+    for zone, def_ids in (("hand", hand), ("lands", lands), ("creatures", creatures)):
+        for def_id in def_ids:
+            card_id += 1
+            record = _record(str(card_id), def_id)
+            player[zone][str(card_id)] = record if zone == "hand" else {"card": record, "summoning_sickness": False}
+    return {"definitions": DEFINITIONS, "current_player": "P1", "lands_played_this_turn": 0, "P1": player}
+
+
+def test_dual_land_pays_either_color():
+    state = _state(hand=["goblin_raider"], lands=["wild_highlands"])
+    assert [move[2] for move in cast_moves(state, "P1")] == ["goblin_raider"]
+
+
+def test_one_land_pays_one_colored_cost():
+    state = _state(hand=["forest_bear", "goblin_raider"], lands=["forest"])
+    assert list(cast_moves(state, "P1")) == []
+    state = _state(hand=["forest_bear", "goblin_raider"], lands=["forest", "wild_highlands"])
+    assert [move[2] for move in cast_moves(state, "P1")] == ["forest_bear", "goblin_raider"]
+
+
+def test_tapped_lands_pay_nothing():
+    state = _state(hand=["goblin_raider"], lands=["wild_highlands"])
+    state["P1"]["lands"]["2"]["card"]["tapped"] = 1
+    assert list(cast_moves(state, "P1")) == []
+
+
+def test_main_moves_dedupe_copies_in_hand():
+    state = _state(hand=["forest", "forest", "slime", "slime"])
+    assert [move[0] for move in legal_moves(state, MAIN, "P1")] == ["land", "cast", "pass"]
+    assert len(list(legal_moves(state, MAIN, "P1", dedupe=False))) == 5
+    assert list(legal_moves(state, MAIN, "P1"))[-1] == PASS
+
+
+def test_attack_subsets_smallest_first():
+    state = _state(creatures=["slime", "forest_bear", "goblin_raider"])
+    subsets = [move[1] for move in attack_moves(state, "P1")]
+    assert len(subsets) == 8
+    assert len(set(subsets)) == 8
+    assert [len(subset) for subset in subsets] == sorted(len(subset) for subset in subsets)
+    assert subsets[0] == () and subsets[-1] == ("1", "2", "3")
+
+
+def test_identical_attackers_are_one_class():
+    state = _state(creatures=["slime", "slime", "slime", "forest_bear"])
+    subsets = [move[1] for move in legal_moves(state, ATTACK, "P1")]
+    # 0-3 slimes, with or without the bear
+    assert len(subsets) == 8
+    assert ("1", "4") in subsets and ("2", "4") not in subsets
+    assert len(list(attack_moves(state, "P1", dedupe=False))) == 16
+
+
+def test_attack_moves_are_lazy():
+    state = _state(creatures=["slime", "forest_bear", "goblin_raider"] * 10)
+    # Thirty distinct creatures would be 2^30 subsets if they were built up front
+    first = list(islice(attack_moves(state, "P1", dedupe=False), 31))
+    assert first[0][1] == () and all(len(move[1]) == 1 for move in first[1:])
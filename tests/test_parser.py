@@ -0,0 +1,57 @@
+"""Tests for the effect parser and its cache (modules/parser.py)."""
+
+import pytest
+
+from modules.parser import EffectCache, EffectParser
+
+
+def test_parse_triggers_and_statics():
+    instructions = EffectParser().parse("flying; attack? inc att 2")
+    assert instructions[0]["action"] == "static" and instructions[0]["status"] == "flying"
+    assert instructions[1]["trigger"] == "attack?" and instructions[1]["value"] == 2
+
+
+def test_hits_and_misses():
+    cache = EffectCache()
+    first = cache.get("haste")
+    assert cache.get("haste") is first
+    cache.get(None)
+    cache.get("")
+    assert cache.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5, "size": 2, "maxsize": 1024}
+
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == cache.misses == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = EffectCache(maxsize=2)
+    haste = cache.get("haste")
+    cache.get("flying")
+    # Using haste again makes flying the oldest entry
+    cache.get("haste")
+    cache.get("reach")
+    assert len(cache) == 2
+    assert cache.get("haste") is haste
+    misses = cache.misses
+    cache.get("flying")
+    assert cache.misses == misses + 1
+
+
+def test_preloaded_effects_skip_the_parser():
+    class Failing(EffectParser):
+        def parse(self, effect_string):
+            raise AssertionError(f"parsed {effect_string!r}")
+
+    cache = EffectCache(parser=Failing())
+    cache.preload({"haste": EffectParser().parse("haste")})
+    assert cache.get("haste").keywords
+    with pytest.raises(AssertionError):
+        cache.get("flying")
+
+
+def test_parsed_effects_are_read_only():
+    parsed = EffectCache().get("attack? inc att 2")
+    with pytest.raises(AttributeError):
+        parsed.source = "haste"
+    with pytest.raises(TypeError):
+        parsed.instructions[0]["value"] = 3
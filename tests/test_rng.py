@@ -0,0 +1,76 @@
+"""Tests for the seeded game RNG, shuffles and mulligans (game.py)."""
+
+from game import GameEngine
+
+
+def _engine(decks, seed, store="memory", path=None):
+    return GameEngine("P1", "P2", list(decks[0]), list(decks[1]), store=store, game_file=path, seed=seed)
+
+
+def _deck_ids(engine, player):
+    engine.commit()
+    return [int(card["id"]) for card in engine._load_state()[player]["deck"]]
+
+
+def _hand(engine, player):
+    return sorted(int(card_id) for card_id in engine._load_state()[player]["hand"])
+
+
+def test_shuffle_is_in_place():
+    engine = _engine(([], []), seed=3)
+    cards = list(range(20))
+    shuffled = engine.shuffle_deck(cards)
+    assert shuffled is cards
+    assert sorted(cards) == list(range(20))
+    assert cards != list(range(20))
+
+
+def test_equal_seeds_give_equal_games(decks):
+    first, second, other = _engine(decks, 11), _engine(decks, 11), _engine(decks, 12)
+    for engine in (first, second, other):
+        engine.ready()
+    for player in ("P1", "P2"):
+        assert _deck_ids(first, player) == _deck_ids(second, player)
+    assert _deck_ids(first, "P1") != _deck_ids(other, "P1")
+    first.mulligan("P1", 7)
+    second.mulligan("P1", 7)
+    assert _hand(first, "P1") == _hand(second, "P1")
+
+
+def test_reloaded_games_draw_the_same(decks, tmp_path):
+    path = str(tmp_path / "game_state.json")
+    kept = _engine(decks, 5)
+    stored = _engine(decks, 5, store="json", path=path)
+    for engine in (kept, stored):
+        engine.ready()
+        for _ in range(7):
+            engine.draw_card("P1")
+        engine.mulligan("P1")
+    stored.commit()
+
+    # A new engine on the same file continues with the saved RNG state
+    reloaded = _engine(([], []), None, store="json", path=path)
+    assert _hand(reloaded, "P1") == _hand(kept, "P1")
+    for engine in (kept, reloaded):
+        engine.mulligan("P1", 6)
+    assert _hand(reloaded, "P1") == _hand(kept, "P1")
+    assert _deck_ids(reloaded, "P1") == _deck_ids(kept, "P1")
+    assert reloaded.seed == 5
+
+
+def test_mulligan_keeps_the_cards(decks):
+    engine = _engine(decks, 2)
+    engine.ready()
+    for _ in range(7):
+        engine.draw_card("P1")
+    before = sorted(_deck_ids(engine, "P1") + _hand(engine, "P1"))
+    hand = _hand(engine, "P1")
+
+    engine.mulligan("P1")
+    assert len(_hand(engine, "P1")) == 7
+    assert _hand(engine, "P1") != hand
+    assert sorted(_deck_ids(engine, "P1") + _hand(engine, "P1")) == before
+
+    engine.mulligan("P1", 5)
+    assert len(_hand(engine, "P1")) == 5
+    assert sorted(_deck_ids(engine, "P1") + _hand(engine, "P1")) == before
@@ -0,0 +1,53 @@
+"""Tests for batch self-play (selfplay.py)."""
+
+import pytest
+
+from headless import HeadlessGame
+from selfplay import BatchStats, build_deck, deck_list, run_batch
+
+
+def test_deck_list():
+    assert deck_list({"forest": 2, "slime": 1}) == ["forest", "forest", "slime"]
+    assert len(deck_list("green_red")) == 30
+    with pytest.raises(ValueError):
+        deck_list("purple")
+
+
+def test_run_batch_counts_match_the_games():
+    results = []
+    stats = run_batch("green_red", "blue_red", games=12, seed=40, workers=1,
+                      on_result=lambda result, stats: results.append(result))
+    assert stats.games == len(results) == 12
+    assert stats.wins["deck1"] + stats.wins["deck2"] + stats.draws == 12
+    assert stats.turns == sum(result["turns"] for result in results)
+
+    # Game i is seeded with seed + i, the decks swap seats every other game
+    deck1, deck2 = build_deck(deck_list("green_red")), build_deck(deck_list("blue_red"))
+    wins = {"deck1": 0, "deck2": 0}
+    for number in range(12):
+        swapped = number % 2 == 1
+        game = HeadlessGame(deck2, deck1, seed=40 + number) if swapped else HeadlessGame(deck1, deck2, seed=40 + number)
+        winner = game.play_game()
+        if winner is not None:
+            wins["deck2" if (winner == game.player1) == swapped else "deck1"] += 1
+    assert stats.wins == wins
+
+    again = run_batch("green_red", "blue_red", games=12, seed=40, workers=1)
+    assert again.wins == stats.wins and again.turns == stats.turns
+
+
+def test_batch_stats_summary():
+    stats = BatchStats()
+    for winner, first in (("deck1", "deck1"), ("deck2", "deck1"), (None, "deck2")):
+        stats.add({"winner": winner, "first": first, "turns": 10, "actions": 50,
+                   "damage": {"deck1": 20, "deck2": 10}, "cards_played": {"deck1": 6, "deck2": 4}})
+    summary = stats.summary()
+    assert summary["games"] == 3
+    assert summary["win_rate"] == {"deck1": 1 / 3, "deck2": 1 / 3}
+    assert summary["draw_rate"] == summary["first_player_win_rate"] == 1 / 3
+    assert summary["avg_damage"] == {"deck1": 20, "deck2": 10}
+
+
+def test_unknown_agents_are_rejected():
+    with pytest.raises(ValueError):
+        run_batch("green_red", "blue_red", games=1, agents=("greedy", "oracle"), workers=1)
@@ -0,0 +1,86 @@
+"""Tests for GameSession commit points and rollback (modules/storage.py)."""
+
+import json
+
+import pytest
+
+from game import GameEngine
+from modules.storage import GameSession, JSONFileStore
+
+
+def _stored(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _session(tmp_path, durable=False):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"turn": 1, "log": []}))
+    return GameSession(JSONFileStore(str(path)), durable=durable), path
+
+
+def test_changes_stay_in_memory_until_commit(tmp_path):
+    session, path = _session(tmp_path)
+    state = session.load()
+    state["turn"] = 2
+    session.save(state)
+    assert session.dirty and _stored(path)["turn"] == 1
+
+    assert session.commit()
+    assert not session.dirty and _stored(path)["turn"] == 2
+    # Nothing left to write
+    assert not session.commit()
+
+
+def test_commit_inside_an_action_waits_for_its_end(tmp_path):
+    session, path = _session(tmp_path)
+    with session.transaction("advance"):
+        state = session.load()
+        state["turn"] = 3
+        session.save(state)
+        assert not session.commit()
+        assert _stored(path)["turn"] == 1
+    assert _stored(path)["turn"] == 3
+    assert session.actions == 1
+
+
+def test_durable_mode_writes_every_action(tmp_path):
+    session, path = _session(tmp_path, durable=True)
+    with session.transaction("advance"):
+        state = session.load()
+        state["turn"] = 4
+        session.save(state)
+    assert _stored(path)["turn"] == 4
+
+
+def test_durable_abort_drops_the_action(tmp_path):
+    session, path = _session(tmp_path, durable=True)
+    with pytest.raises(RuntimeError):
+        with session.transaction("broken"):
+            state = session.load()
+            state["turn"] = 5
+            session.save(state)
+            raise RuntimeError("rules error")
+    assert _stored(path)["turn"] == 1
+    assert session.load()["turn"] == 1
+
+
+def test_discard_rereads_the_store(tmp_path):
+    session, path = _session(tmp_path)
+    state = session.load()
+    state["turn"] = 6
+    session.save(state)
+    session.discard()
+    assert session.load()["turn"] == 1
+
+
+def test_engine_commits_at_turn_boundaries(decks, tmp_path):
+    path = tmp_path / "state.json"
+    engine = GameEngine("P1", "P2", list(decks[0]), list(decks[1]), game_file=str(path), seed=4)
+    engine.ready()
+    engine.draw_card("P1")
+    hand = len(engine._load_state()["P1"]["hand"])
+    assert len(_stored(path)["P1"]["hand"]) == 0
+
+    engine.start_turn("P1")
+    assert len(_stored(path)["P1"]["hand"]) == hand
@@ -0,0 +1,45 @@
+"""Tests for the binary game state snapshot codec (modules/snapshot.py)."""
+
+import json
+import os
+
+import pytest
+
+from headless import HeadlessGame
+from modules.snapshot import MAGIC, SNAPSHOT_VERSION, decode_state, encode_state, snapshot_version
+
+GAME_STATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "game_state.json")
+
+
+def test_round_trip_of_a_played_game(decks):
+    game = HeadlessGame(*decks, seed=13)
+    game.play_game(max_turns=12)
+    state = game.state
+    data = encode_state(state)
+    assert data[:3] == MAGIC and snapshot_version(data) == SNAPSHOT_VERSION
+    assert decode_state(data) == state
+    assert len(data) < len(json.dumps(state, separators=(",", ":")))
+
+
+def test_round_trip_of_full_card_dicts():
+    # The original save format, every card with all its fields
+    with open(GAME_STATE) as f:
+        state = json.load(f)
+    assert decode_state(encode_state(state)) == state
+
+
+def test_values_that_only_look_like_cards():
+    state = {
+        "cards": [{"id": "1", "def_id": "forest", "tapped": 2}, {"id": 7, "def_id": "bear", "tapped": 1, "status": ""}],
+        "numbers": [0, -1, 2 ** 40, -(2 ** 40), 1.5, True, False, None],
+        "ids": {"007": {"id": "007", "def_id": "x", "tapped": 0}},
+        "text": "é → ✓",
+    }
+    assert decode_state(encode_state(state)) == state
+
+
+def test_rejects_other_data():
+    with pytest.raises(ValueError):
+        decode_state(b"{}")
+    with pytest.raises(ValueError):
+        decode_state(MAGIC + bytes([SNAPSHOT_VERSION + 1]))
@@ -0,0 +1,175 @@
+"""Tests for the state stores and their selection (modules/storage.py)."""
+
+import copy
+
+import pytest
+
+from game import GameEngine
+from modules.storage import DEFAULT_FILES, JSONFileStore, JournalStore, MemoryStore, SQLiteStore, make_store
+
+
+def _game(decks, store, path, seed=7):
+    """A set up game with a few cards drawn and a land played."""
+    engine = GameEngine("P1", "P2", list(decks[0]), list(decks[1]), store=store, game_file=str(path), seed=seed)
+    engine.ready()
+    for _ in range(5):
+        engine.draw_card("P1")
+        engine.draw_card("P2")
+    hand = engine._load_state()["P1"]["hand"]
+    land = next(card_id for card_id, card in hand.items()
+                if engine._load_state()["definitions"][card["def_id"]]["type"] == "Land")
+    engine.play_land("P1", land)
+    engine.commit()
+    return engine
+
+
+def test_make_store():
+    assert isinstance(make_store("memory", None), MemoryStore)
+    with pytest.raises(ValueError):
+        make_store("csv", "state.csv")
+    assert DEFAULT_FILES["sqlite"] == "player_data.db"
+
+
+def test_sqlite_round_trip(decks, tmp_path):
+    engine = _game(decks, "sqlite", tmp_path / "player_data.db")
+    assert isinstance(engine.session.store, SQLiteStore)
+    state = copy.deepcopy(engine._load_state())
+    engine.session.store.close()
+
+    store = SQLiteStore(str(tmp_path / "player_data.db"))
+    assert store.load() == state
+    store.close()
+
+
+def test_sqlite_matches_json(decks, tmp_path):
+    sqlite_engine = _game(decks, "sqlite", tmp_path / "state.db")
+    json_engine = _game(decks, "json", tmp_path / "state.json")
+    assert sqlite_engine.session.store.load() == json_engine.session.store.load()
+    sqlite_engine.session.store.close()
+
+
+def test_sqlite_writes_only_changed_rows(tmp_path, decks):
+    engine = _game(decks, "sqlite", tmp_path / "state.db")
+    store = engine.session.store
+    state = copy.deepcopy(engine._load_state())
+    before = store.conn.total_changes
+
+    land = next(iter(state["P1"]["lands"]))
+    state["P1"]["lands"][land]["card"]["tapped"] = 1
+    state["P1"]["green_mana"] += 1
+    store.save(state)
+    # The tapped land's row and P1's mana pool
+    assert store.conn.total_changes - before == 2
+    store.close()
+
+    reread = SQLiteStore(str(tmp_path / "state.db"))
+    assert reread.load() == state
+    reread.close()
+
+
+def test_engine_reloads_from_sqlite(decks, tmp_path):
+    engine = _game(decks, "sqlite", tmp_path / "state.db")
+    state = copy.deepcopy(engine._load_state())
+    engine.session.store.close()
+
+    reloaded = GameEngine("P1", "P2", [], [], store="sqlite", game_file=str(tmp_path / "state.db"))
+    assert reloaded._load_state() == state
+    assert reloaded.rng.getstate() == engine.rng.getstate()
+
+
+def _journal_game(decks, path, compact_every=256):
+    engine = GameEngine("P1", "P2", list(decks[0]), list(decks[1]),
+                        store=JournalStore(str(path), compact_every=compact_every), seed=11)
+    engine.ready()
+    for _ in range(5):
+        engine.draw_card("P1")
+        engine.draw_card("P2")
+    engine.commit()
+    return engine
+
+
+def _turn(engine, player):
+    engine.start_turn(player)
+    engine.untap_step(player)
+    engine.draw_step(player)
+    engine.end_turn(player)
+
+
+def test_journal_is_selectable(tmp_path):
+    engine = GameEngine("P1", "P2", [], [], store="journal", game_file=str(tmp_path / "state.json"))
+    assert isinstance(engine.session.store, JournalStore)
+
+
+def test_journal_replay(decks, tmp_path):
+    engine = _journal_game(decks, tmp_path / "state.json")
+    _turn(engine, "P1")
+    _turn(engine, "P2")
+    engine.commit()
+    state = copy.deepcopy(engine._load_state())
+    engine.session.store.close()
+    # The turns went to the journal as action records, not as new snapshots
+    with open(tmp_path / "state.json.journal") as f:
+        assert len(f.readlines()) > 4
+
+    reloaded = GameEngine("P1", "P2", [], [], store="journal", game_file=str(tmp_path / "state.json"))
+    assert reloaded._load_state() == state
+    assert reloaded.rng.getstate() == engine.rng.getstate()
+    # Commits the replayed actions asked for don't carry over to the next action
+    assert not reloaded.session._commit_on_exit
+    assert not reloaded.session.dirty
+    reloaded.session.store.close()
+
+
+def test_journal_replays_a_mulligan(decks, tmp_path):
+    engine = _journal_game(decks, tmp_path / "state.json")
+    # The RNG is drawn from outside the journaled actions (an agent, a search) ...
+    engine.rng.random()
+    engine.mulligan("P1")
+    engine.commit()
+    state = copy.deepcopy(engine._load_state())
+    engine.session.store.close()
+
+    # ... and the mulligan went to the journal with the RNG state it started from
+    store = JournalStore(str(tmp_path / "state.json"))
+    store.load()
+    assert store.tail[-1]["action"] == "mulligan" and "rng" in store.tail[-1]
+    assert not any("rng" in record for record in store.tail[:-1])
+
+    reloaded = GameEngine("P1", "P2", [], [], store=store)
+    assert reloaded._load_state() == state
+    assert reloaded.rng.getstate() == engine.rng.getstate()
+    store.close()
+
+
+def test_journal_compaction(decks, tmp_path):
+    engine = _journal_game(decks, tmp_path / "state.json", compact_every=5)
+    _turn(engine, "P1")
+    _turn(engine, "P2")
+    engine.commit()
+    state = copy.deepcopy(engine._load_state())
+    engine.session.store.close()
+
+    # The journal was folded into a new snapshot whenever it reached five records
+    with open(tmp_path / "state.json.journal") as f:
+        assert len(f.readlines()) < 5
+    store = JournalStore(str(tmp_path / "state.json"))
+    snapshot = store.load()
+    assert len(store.tail) < 5 and snapshot != state
+
+    reloaded = GameEngine("P1", "P2", [], [], store=store)
+    assert reloaded._load_state() == state
+    store.close()
+
+
+def test_snapshot_format(decks, tmp_path):
+    engine = _game(decks, "snapshot", tmp_path / "state.wzs")
+    json_engine = _game(decks, "json", tmp_path / "state.json")
+    state = engine._load_state()
+    assert engine.session.store.format == "snapshot"
+    assert JSONFileStore(str(tmp_path / "state.wzs"), format="snapshot").load() == json_engine.session.store.load()
+    assert (tmp_path / "state.wzs").stat().st_size * 2 < (tmp_path / "state.json").stat().st_size
+
+    reloaded = GameEngine("P1", "P2", [], [], store="snapshot", game_file=str(tmp_path / "state.wzs"))
+    assert reloaded._load_state() == state
+    with pytest.raises(ValueError):
+        JSONFileStore(str(tmp_path / "state.bin"), format="pickle")
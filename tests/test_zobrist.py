@@ -0,0 +1,71 @@
+"""Tests for incremental Zobrist hashing (modules/zobrist.py)."""
+
+from headless import HeadlessGame
+from modules.moves import ATTACK, MAIN
+from modules.zobrist import StateHash, state_hash
+
+
+def _decisions(game):
+    """Play game to the end with its seat agents, yielding after every decision."""
+    while game.decision is not None:
+        kind, player = game.decision
+        agent = game.agents[player]
+        if kind == MAIN:
+            agent.main_phase(game, player)
+            game.decision = game.end_main(player)
+        elif kind == ATTACK:
+            game.decision = game.attack(player, agent.choose_attackers(game, player))
+        else:
+            game.decision = game.block(player, agent.choose_blocks(game, player))
+        yield
+
+
+def test_incremental_hash_matches_a_fresh_one(decks):
+    for seed in range(4):
+        game = HeadlessGame(*decks, seed=seed)
+        game.setup()
+        players = (game.player1, game.player2)
+        game.state_hash()
+        hasher = game._watchers.get("hash")
+        for _ in _decisions(game):
+            value = game.state_hash()
+            game.commit()
+            assert value == state_hash(game.state, players)
+        # One hasher followed the whole game
+        assert game._watchers.get("hash") is hasher
+
+
+def test_turn_number_is_not_hashed(decks):
+    game = HeadlessGame(*decks, seed=3)
+    game.setup()
+    game.commit()
+    state = game.state
+    before = state_hash(state, (game.player1, game.player2))
+    state["turn"] = state.get("turn", 0) + 10
+    assert state_hash(state, (game.player1, game.player2)) == before
+
+
+def test_changes_fold_in_and_out():
+    state = {"P1": {"deck": [], "graveyard": [], "hand": {}, "creatures": {}, "lands": {},
+                    "health": 20, "green_mana": 0, "blue_mana": 0, "red_mana": 0},
+             "phase": "main", "current_player": "P1", "lands_played_this_turn": 0}
+    hasher = StateHash(state, ("P1",))
+    empty = hasher.value
+
+    entry = {"card": {"id": "7", "def_id": "bear", "tapped": False, "attack": 2, "defence": 2}}
+    hasher.card("P1", "creatures", "7", entry)
+    state["P1"]["creatures"]["7"] = entry
+    assert hasher.value == state_hash(state, ("P1",)) != empty
+
+    entry["card"]["tapped"] = True
+    hasher.card("P1", "creatures", "7", entry)
+    assert hasher.value == state_hash(state, ("P1",))
+
+    hasher.scalar("P1", "health", 17)
+    state["P1"]["health"] = 17
+    assert hasher.value == state_hash(state, ("P1",))
+
+    del state["P1"]["creatures"]["7"]
+    hasher.card("P1", "creatures", "7", None)
+    hasher.scalar("P1", "health", 20)
+    assert hasher.value == empty
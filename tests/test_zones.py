@@ -0,0 +1,109 @@
+"""Tests for the zone views over a player's state (modules/zones.py)."""
+
+from headless import HeadlessGame
+from modules.parser import effect_cache
+from modules.zones import BattlefieldZone, Deck, IndexedZone, Pile, PlayerZones
+
+DEFINITIONS = {
+    "skeleton": {"name": "Skeleton", "effect": ""},
+    "berserker": {"name": "Berserker", "effect": "attack? inc att 2; dec end 1"},
+    "scout": {"name": "Scout", "effect": "enter? inc att 1; block? inc end 1"},
+}
+
+
+def _record(card_id, def_id):
+    return {"id": str(card_id), "def_id": def_id, "tapped": 0, "status": ""}
+
+
+def test_deck_draws_move_the_top_pointer():
+    cards = [_record(1, "skeleton"), _record(2, "berserker"), _record(3, "skeleton")]
+    deck = Deck(cards, DEFINITIONS)
+    assert deck.draw()["id"] == "1"
+    # The list is untouched until flushed
+    assert len(cards) == 3 and len(deck) == 2 and deck.top == 1
+    assert deck.count("Skeleton") == 1
+    assert [record["id"] for record in deck.records()] == ["2", "3"]
+    assert deck.peek(5) == cards[1:]
+
+    deck.flush()
+    assert [record["id"] for record in cards] == ["2", "3"] and deck.top == 0
+    assert deck.draw()["id"] == "2"
+    assert deck.draw()["id"] == "3"
+    assert deck.draw() is None and not deck
+
+
+def test_deck_replace_flushes_and_recounts():
+    cards = [_record(1, "skeleton"), _record(2, "berserker")]
+    deck = Deck(cards, DEFINITIONS)
+    deck.draw()
+    deck.replace([_record(5, "skeleton"), _record(6, "skeleton"), _record(2, "berserker")])
+    assert deck.top == 0 and len(cards) == 3
+    assert deck.count("Skeleton") == 2 and deck.count("Berserker") == 1
+    assert deck.draw()["id"] == "5"
+
+
+def test_deck_watch_reports_depths():
+    seen = []
+    deck = Deck([_record(1, "skeleton"), _record(2, "berserker")], DEFINITIONS)
+    deck.watch = lambda slot, item: seen.append((slot, item and item["id"]))
+    deck.draw()
+    deck.replace([_record(3, "skeleton")])
+    # Drawn from depth 1, then depth 0 holds the new card
+    assert seen == [(1, None), (0, "3")]
+
+
+def test_counters_follow_moves():
+    hand = IndexedZone({}, DEFINITIONS)
+    graveyard = Pile([], DEFINITIONS)
+    hand.add(4, _record(4, "skeleton"))
+    hand.add(5, _record(5, "skeleton"))
+    graveyard.add(hand.remove(4))
+    assert hand.count("Skeleton") == 1 and graveyard.count("Skeleton") == 1
+    assert hand.remove(4) is None and 4 not in hand
+
+
+def test_battlefield_subscribers():
+    creatures = BattlefieldZone({"1": {"card": _record(1, "berserker")}}, DEFINITIONS)
+    assert creatures.subscribed("attack?") == ["1"]
+
+    creatures.add(2, {"card": _record(2, "scout")})
+    creatures.add(3, {"card": _record(3, "berserker")})
+    creatures.add(4, {"card": _record(4, "skeleton")})
+    assert creatures.subscribed("attack?") == ["1", "3"]
+    assert creatures.subscribed("enter?") == creatures.subscribed("block?") == ["2"]
+
+    creatures.remove(1)
+    creatures.remove(2)
+    assert creatures.subscribed("attack?") == ["3"]
+    assert creatures.subscribed("enter?") == []
+
+    # Replacing a permanent in place swaps its subscriptions
+    creatures.add(3, {"card": _record(3, "scout")})
+    assert creatures.subscribed("attack?") == [] and creatures.subscribed("enter?") == ["3"]
+
+
+def test_engine_subscribers_follow_the_board(decks):
+    # Creatures enter and die over whole games, the index must match the final boards
+    subscribed = 0
+    for seed in range(8):
+        game = HeadlessGame(*decks, seed=seed)
+        game.play_game()
+        state = game.state
+        for player in (game.player1, game.player2):
+            creatures = game.zones(player).creatures
+            for trigger in ("enter?", "attack?", "block?"):
+                expected = [card_id for card_id, entry in state[player]["creatures"].items()
+                            if trigger in effect_cache.get(state["definitions"][entry["card"]["def_id"]]["effect"]).triggers]
+                assert creatures.subscribed(trigger) == expected
+                subscribed += len(expected)
+    assert subscribed
+
+
+def test_player_zones_count_the_battlefield():
+    player_data = {"deck": [], "hand": [_record(7, "skeleton")], "graveyard": [],
+                   "creatures": {"1": {"card": _record(1, "skeleton")}}, "lands": {}}
+    zones = PlayerZones(player_data, DEFINITIONS)
+    # A list hand is converted to the dict form
+    assert player_data["hand"] == {"7": _record(7, "skeleton")}
+    assert zones.count("battlefield", "Skeleton") == 1
+    assert zones.count("hand", "Skeleton") == 1